@@ -0,0 +1,395 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import app.config as config
+import app.requests as sync_rq
+import app.migrations as migrations
+from app.database import db_path
+
+logger = logging.getLogger(__name__)
+
+READER_POOL_SIZE = 4
+CACHED_STATEMENTS = 256
+BUSY_TIMEOUT = 10
+
+
+class AsyncDatabase:
+    """Доступ к SQLite без блокировки event loop.
+
+    Все записи идут через один поток-писатель с долгоживущим соединением,
+    чтения — через небольшой пул потоков, у каждого своё соединение.
+    Соединения живут всё время работы бота, поэтому sqlite3 переиспользует
+    подготовленные выражения из своего кэша.
+    """
+
+    def __init__(self, path, readers=READER_POOL_SIZE):
+        self.path = path
+        self.readers = readers
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._writer = None
+        self._reader_pool = None
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        migrations.configure_connection(conn)
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _executors(self):
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+            self._reader_pool = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="db-reader")
+        return self._writer, self._reader_pool
+
+    def _call(self, fn, args):
+        return fn(self._connection(), *args)
+
+    def _write(self, fn, args):
+        conn = self._connection()
+        try:
+            result = fn(conn, *args)
+            conn.commit()
+            return result
+        except BaseException:
+            conn.rollback()
+            raise
+
+    async def run_read(self, fn, *args):
+        _, readers = self._executors()
+        return await asyncio.get_running_loop().run_in_executor(readers, self._call, fn, args)
+
+    async def run_write(self, fn, *args):
+        writer, _ = self._executors()
+        return await asyncio.get_running_loop().run_in_executor(writer, self._write, fn, args)
+
+    async def fetchall(self, sql, params=()):
+        return await self.run_read(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql, params=()):
+        return await self.run_read(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def execute(self, sql, params=()):
+        return await self.run_write(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def insert(self, sql, params=()):
+        return await self.run_write(lambda conn: conn.execute(sql, params).lastrowid)
+
+    async def executemany(self, sql, seq_of_params):
+        return await self.run_write(lambda conn: conn.executemany(sql, seq_of_params).rowcount)
+
+    async def close(self):
+        writer, readers = self._writer, self._reader_pool
+        self._writer = self._reader_pool = None
+        for executor in (writer, readers):
+            if executor is not None:
+                await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+database = AsyncDatabase(db_path)
+
+
+async def add_user(user_id, username=None):
+    try:
+        await database.execute('''
+        INSERT OR IGNORE INTO users (user_id, username, country_code, language) VALUES (?, ?, ?, ?)
+        ''', (user_id, username, config.DEFAULT_COUNTRY, config.DEFAULT_LANGUAGE))
+        logger.info(f"Пользователь с ID {user_id} и именем {username} добавлен.")
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при добавлении пользователя с ID {user_id}: {e}")
+
+async def get_user_settings(user_id, default=None):
+    # (страна, язык) пользователя; для неизвестного пользователя — значения по умолчанию
+    default = default or (config.DEFAULT_COUNTRY, config.DEFAULT_LANGUAGE)
+    try:
+        row = await database.fetchone('''
+        SELECT country_code, language FROM users WHERE user_id = ?
+        ''', (user_id,))
+        return tuple(row) if row else default
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при получении настроек пользователя с ID {user_id}: {e}")
+        return default
+
+async def set_user_country(user_id, country_code):
+    try:
+        await database.execute('''
+        INSERT INTO users (user_id, country_code) VALUES (?, ?)
+        ON CONFLICT (user_id) DO UPDATE SET country_code = excluded.country_code
+        ''', (user_id, country_code))
+        logger.info(f"Пользователь с ID {user_id} выбрал страну {country_code}.")
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при сохранении страны пользователя с ID {user_id}: {e}")
+
+async def set_user_language(user_id, language):
+    try:
+        await database.execute('''
+        INSERT INTO users (user_id, language) VALUES (?, ?)
+        ON CONFLICT (user_id) DO UPDATE SET language = excluded.language
+        ''', (user_id, language))
+        logger.info(f"Пользователь с ID {user_id} выбрал язык {language}.")
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при сохранении языка пользователя с ID {user_id}: {e}")
+
+async def get_active_countries():
+    # Страны пользователей, начиная с самых популярных. Обходится индекс idx_users_country_user,
+    # сама таблица пользователей не читается
+    try:
+        rows = await database.fetchall('''
+        SELECT country_code FROM users GROUP BY country_code ORDER BY COUNT(*) DESC, country_code
+        ''')
+        return [row[0] for row in rows]
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при получении списка стран: {e}")
+        return []
+
+async def get_personal_holidays(user_id):
+    try:
+        holidays = await database.fetchall('''
+        SELECT holiday_name, holiday_date FROM personal_holidays WHERE user_id = ?
+        ''', (user_id,))
+        logger.info(f"Получены праздники для пользователя с ID {user_id}.")
+        return holidays
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при получении праздников для пользователя с ID {user_id}: {e}")
+        return []
+
+async def get_personal_holidays_page(user_id, after=None, before=None, start=None, limit=10):
+    # Keyset-пагинация по (holiday_date, id) через индекс (user_id, holiday_date):
+    # стоимость страницы не зависит от числа праздников. Берём limit + 1 строку,
+    # чтобы понять, есть ли ещё страница в направлении движения.
+    # start — включительная граница: перерисовка той же страницы после удаления.
+    # Возвращает (строки (id, название, дата), есть_предыдущая, есть_следующая)
+    try:
+        if before is not None:
+            rows = await database.fetchall('''
+            SELECT id, holiday_name, holiday_date FROM personal_holidays
+            WHERE user_id = ? AND (holiday_date, id) < (?, ?)
+            ORDER BY holiday_date DESC, id DESC LIMIT ?
+            ''', (user_id, *before, limit + 1))
+            has_prev = len(rows) > limit
+            return list(reversed(rows[:limit])), has_prev, True
+        if start is not None:
+            rows = await database.fetchall('''
+            SELECT id, holiday_name, holiday_date FROM personal_holidays
+            WHERE user_id = ? AND (holiday_date, id) >= (?, ?)
+            ORDER BY holiday_date, id LIMIT ?
+            ''', (user_id, *start, limit + 1))
+            return rows[:limit], True, len(rows) > limit
+        cursor = after if after is not None else ("", 0)
+        rows = await database.fetchall('''
+        SELECT id, holiday_name, holiday_date FROM personal_holidays
+        WHERE user_id = ? AND (holiday_date, id) > (?, ?)
+        ORDER BY holiday_date, id LIMIT ?
+        ''', (user_id, *cursor, limit + 1))
+        return rows[:limit], after is not None, len(rows) > limit
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при получении страницы праздников для пользователя с ID {user_id}: {e}")
+        return [], False, False
+
+async def add_personal_holiday(user_id, holiday_name, holiday_date):
+    # Возвращает id новой строки, чтобы in-memory индексы обновлялись без перечитывания
+    try:
+        holiday_id = await database.insert('''
+        INSERT INTO personal_holidays (user_id, holiday_name, holiday_date)
+        VALUES (?, ?, ?)
+        ''', (user_id, holiday_name, holiday_date))
+        logger.info(f"Добавлен личный праздник '{holiday_name}' для пользователя с ID {user_id}.")
+        return holiday_id
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при добавлении праздника '{holiday_name}' для пользователя с ID {user_id}: {e}")
+        return None
+
+async def delete_personal_holiday(user_id, holiday_name):
+    try:
+        await database.execute('''
+        DELETE FROM personal_holidays WHERE user_id = ? AND holiday_name = ?
+        ''', (user_id, holiday_name))
+        logger.info(f"Удалён праздник '{holiday_name}' для пользователя с ID {user_id}.")
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при удалении праздника '{holiday_name}' для пользователя с ID {user_id}: {e}")
+
+async def delete_personal_holiday_by_id(user_id, holiday_id):
+    # Удаление по первичному ключу; проверка владельца в том же запросе
+    try:
+        deleted = await database.execute('''
+        DELETE FROM personal_holidays WHERE id = ? AND user_id = ?
+        ''', (holiday_id, user_id))
+        logger.info(f"Удалено {deleted} праздников с ID {holiday_id} пользователя {user_id}.")
+        return deleted
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при удалении праздника с ID {holiday_id} пользователя {user_id}: {e}")
+        return 0
+
+async def delete_all_personal_holidays(user_id):
+    try:
+        await database.execute('''
+        DELETE FROM personal_holidays WHERE user_id = ?
+        ''', (user_id,))
+        logger.info(f"Удалены все праздники для пользователя с ID {user_id}.")
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при удалении всех праздников для пользователя с ID {user_id}: {e}")
+
+async def add_personal_holidays_bulk(user_id, holidays):
+    # Одна транзакция и один executemany на весь файл; holidays может быть ленивым генератором,
+    # тогда разбор идёт прямо в потоке-писателе
+    try:
+        count = await database.executemany('''
+        INSERT INTO personal_holidays (user_id, holiday_name, holiday_date)
+        VALUES (?, ?, ?)
+        ''', ((user_id, name, str(date)) for name, date in holidays))
+        logger.info(f"Импортировано {count} личных праздников для пользователя с ID {user_id}.")
+        return count
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при импорте праздников для пользователя с ID {user_id}: {e}")
+        return 0
+
+async def get_personal_holidays_version(user_id):
+    # id выдаются через AUTOINCREMENT и растут, поэтому (число строк, сумма id) меняется при любой правке:
+    # при равном числе добавленных и удалённых строк сумма новых id всегда больше суммы удалённых
+    row = await database.fetchone('''
+    SELECT COUNT(*), COALESCE(SUM(id), 0) FROM personal_holidays WHERE user_id = ?
+    ''', (user_id,))
+    return tuple(row)
+
+async def iter_personal_holidays(user_id, chunk_size=500):
+    # Keyset-пагинация по (holiday_date, id): память не зависит от размера календаря
+    after = ("", 0)
+    while True:
+        rows = await database.fetchall('''
+        SELECT id, holiday_name, holiday_date FROM personal_holidays
+        WHERE user_id = ? AND (holiday_date, id) > (?, ?)
+        ORDER BY holiday_date, id LIMIT ?
+        ''', (user_id, *after, chunk_size))
+        if not rows:
+            return
+        yield rows
+        after = (rows[-1][2], rows[-1][0])
+
+async def get_user_ids_after(after_user_id, limit):
+    # Keyset-пагинация по уникальному индексу users.user_id
+    rows = await database.fetchall('''
+    SELECT user_id FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?
+    ''', (after_user_id, limit))
+    return [row[0] for row in rows]
+
+async def iter_user_ids(after_user_id=0, chunk_size=500):
+    while True:
+        chunk = await get_user_ids_after(after_user_id, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+        after_user_id = chunk[-1]
+
+async def get_country_users_after(country_code, after_user_id, limit):
+    # Keyset-пагинация по индексу (country_code, user_id, language): [(user_id, язык)]
+    rows = await database.fetchall('''
+    SELECT user_id, language FROM users WHERE country_code = ? AND user_id > ? ORDER BY user_id LIMIT ?
+    ''', (country_code, after_user_id, limit))
+    return [tuple(row) for row in rows]
+
+async def iter_country_users(country_code, after_user_id=0, chunk_size=500):
+    while True:
+        chunk = await get_country_users_after(country_code, after_user_id, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+        after_user_id = chunk[-1][0]
+
+async def get_broadcast_cursor(broadcast_date, country_code):
+    row = await database.fetchone('''
+    SELECT last_user_id, sent, failed, finished FROM broadcasts WHERE broadcast_date = ? AND country_code = ?
+    ''', (broadcast_date, country_code))
+    if row is None:
+        return {"last_user_id": 0, "sent": 0, "failed": 0, "finished": False}
+    return {"last_user_id": row[0], "sent": row[1], "failed": row[2], "finished": bool(row[3])}
+
+async def save_broadcast_cursor(broadcast_date, country_code, last_user_id, sent, failed, finished=False):
+    await database.execute('''
+    INSERT OR REPLACE INTO broadcasts (broadcast_date, country_code, last_user_id, sent, failed, finished)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', (broadcast_date, country_code, last_user_id, sent, failed, int(finished)))
+
+async def get_personal_holidays_by_month_day(month_days, after_user_id=0, user_limit=-1):
+    # Выражение совпадает с индексом idx_personal_holidays_month_day, поэтому это один индексный поиск.
+    # Лимит считается в пользователях, чтобы праздники одного пользователя не делились между чанками.
+    month_days = list(month_days)
+    placeholders = ", ".join("?" * len(month_days))
+    return await database.fetchall(f'''
+    SELECT user_id, holiday_name, holiday_date FROM personal_holidays
+    WHERE substr(holiday_date, 6, 5) IN ({placeholders}) AND user_id IN (
+        SELECT DISTINCT user_id FROM personal_holidays
+        WHERE substr(holiday_date, 6, 5) IN ({placeholders}) AND user_id > ?
+        ORDER BY user_id LIMIT ?
+    )
+    ORDER BY user_id, holiday_date
+    ''', (*month_days, *month_days, after_user_id, user_limit))
+
+async def iter_personal_holidays_by_month_day(month_days, after_user_id=0, chunk_size=500):
+    month_days = list(month_days)
+    while True:
+        chunk = await get_personal_holidays_by_month_day(month_days, after_user_id, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+        after_user_id = chunk[-1][0]
+
+async def get_reminder_cursor(reminder_date, lead_days):
+    row = await database.fetchone('''
+    SELECT last_user_id, sent, failed, finished FROM reminders WHERE reminder_date = ? AND lead_days = ?
+    ''', (reminder_date, lead_days))
+    if row is None:
+        return {"last_user_id": 0, "sent": 0, "failed": 0, "finished": False}
+    return {"last_user_id": row[0], "sent": row[1], "failed": row[2], "finished": bool(row[3])}
+
+async def save_reminder_cursor(reminder_date, lead_days, last_user_id, sent, failed, finished=False):
+    await database.execute('''
+    INSERT OR REPLACE INTO reminders (reminder_date, lead_days, last_user_id, sent, failed, finished)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', (reminder_date, lead_days, last_user_id, sent, failed, int(finished)))
+
+async def get_holiday_year(country_code, year):
+    try:
+        return await database.run_read(sync_rq.select_holiday_year, country_code, year)
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при чтении праздников {country_code} за {year} год: {e}")
+        return None
+
+async def save_holiday_year(country_code, year, holidays, fetched_at=None):
+    try:
+        count = await database.run_write(sync_rq.replace_holiday_year, country_code, year, holidays, fetched_at)
+        logger.info(f"Сохранено {count} праздников {country_code} за {year} год.")
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при сохранении праздников {country_code} за {year} год: {e}")
+
+async def get_translations(texts, target_lang):
+    try:
+        return await database.run_read(sync_rq.select_translations, list(texts), target_lang)
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при чтении переводов на '{target_lang}': {e}")
+        return {}
+
+async def save_translations(pairs, target_lang):
+    try:
+        await database.run_write(sync_rq.upsert_translations, pairs, target_lang)
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при сохранении переводов на '{target_lang}': {e}")
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from aiogram import Dispatcher
+import app.config as config
+import app.database as db
+import app.calendarific as calendarific
+import app.async_requests as rq
+from app.handlers import create_router
+from app.middlewares import ConcurrencyLimitMiddleware
+from app.fsm_storage import create_storage
+from app.logging_config import flush_logging
+from app.report import generate_html_report
+
+logger = logging.getLogger(__name__)
+
+_background_tasks = []
+
+
+def start_background_jobs(bot):
+    if config.BROADCAST_ENABLED:
+        from app.broadcast import broadcast_scheduler
+        _background_tasks.append(asyncio.create_task(broadcast_scheduler(bot), name="broadcast"))
+    if config.PRELOAD_ENABLED:
+        # В шардированном режиме прогрев идёт в супервизоре и заполняет holiday_years в общей БД,
+        # откуда воркеры берут календари без обращения к API
+        from app.holiday_cache import calendar_preloader
+        _background_tasks.append(asyncio.create_task(calendar_preloader(), name="preload"))
+    if config.HOLIDAY_RULES_ENABLED:
+        from app.holiday_cache import rules_reconciler
+        _background_tasks.append(asyncio.create_task(rules_reconciler(), name="reconcile"))
+    if config.REMINDERS_ENABLED:
+        from app.reminders import ReminderScheduler
+        scheduler = ReminderScheduler(bot)
+        _background_tasks.append(asyncio.create_task(scheduler.run(), name="reminders"))
+    logger.info(f"Запущено фоновых задач: {len(_background_tasks)}")
+
+
+async def stop_background_jobs():
+    tasks = list(_background_tasks)
+    _background_tasks.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def on_startup(bot=None, background_jobs: bool = True):
+    # Схема и миграции применяются здесь, а не при импорте модулей
+    await asyncio.to_thread(db.create_db)
+    # В шардированном режиме фоновые задачи крутит супервизор, а не каждый воркер
+    if bot is not None and background_jobs:
+        start_background_jobs(bot)
+    logger.info("Инициализация приложения завершена")
+
+
+async def on_shutdown(final_report: bool = True):
+    await stop_background_jobs()
+    await calendarific.close_session()
+    await rq.database.close()
+    flush_logging()
+    # В шардированном режиме отчёт строит супервизор, а не каждый воркер
+    if final_report:
+        await asyncio.to_thread(generate_html_report)
+    logger.info("Ресурсы приложения освобождены")
+
+
+def create_dispatcher(max_concurrent_updates=None, **kwargs) -> Dispatcher:
+    kwargs.setdefault("storage", create_storage())
+    dp = Dispatcher(**kwargs)
+    dp.update.outer_middleware(ConcurrencyLimitMiddleware(max_concurrent_updates or config.MAX_CONCURRENT_UPDATES))
+    dp.include_router(create_router())
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import datetime
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramRetryAfter,
+    TelegramForbiddenError,
+    TelegramBadRequest,
+    TelegramNetworkError,
+    TelegramServerError,
+)
+import app.config as config
+import app.async_requests as rq
+from app.ratelimit import TokenBucket
+from app.handlers import get_holidays_by_date, format_holiday_names
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# Сколько сообщений одного чанка отправляется параллельно; темп всё равно задаёт token bucket
+SEND_CONCURRENCY = 10
+
+
+class HolidaysUnavailable(Exception):
+    """Праздники на дату не удалось получить: рассылка не отправляется и не считается завершённой."""
+
+
+async def send_with_retry(bot: Bot, user_id, text, bucket: TokenBucket, sleep=asyncio.sleep):
+    for attempt in range(MAX_RETRIES):
+        await bucket.acquire()
+        try:
+            await bot.send_message(user_id, text)
+            return True
+        except TelegramRetryAfter as e:
+            logger.warning(f"Лимит Telegram, пауза {e.retry_after} с перед отправкой пользователю {user_id}")
+            await sleep(e.retry_after)
+        except (TelegramForbiddenError, TelegramBadRequest) as e:
+            # бот заблокирован или чат недоступен — повтор не поможет
+            logger.info(f"Рассылка пропускает пользователя {user_id}: {e}")
+            return False
+        except (TelegramNetworkError, TelegramServerError) as e:
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+            logger.warning(f"Ошибка сети при отправке пользователю {user_id}, повтор через {delay} с: {e}")
+            await sleep(delay)
+    logger.error(f"Не удалось отправить рассылку пользователю {user_id} за {MAX_RETRIES} попыток")
+    return False
+
+
+async def fetch_broadcast_holidays(date: datetime.date, country_code='KZ'):
+    holidays = await get_holidays_by_date(date, country_code)
+    if holidays is None:
+        raise HolidaysUnavailable(f"нет данных о праздниках {country_code} на {date.isoformat()}")
+    return holidays
+
+
+async def build_broadcast_text(date: datetime.date, holidays, language='ru'):
+    return f"Доброе утро! Сегодня ({date.strftime('%d.%m.%Y')}) отмечаются:\n\n" + await format_holiday_names(holidays, language)
+
+
+async def run_broadcast(bot: Bot, date: datetime.date, country_code='KZ', bucket=None, chunk_size=None):
+    key = date.isoformat()
+    cursor = await rq.get_broadcast_cursor(key, country_code)
+    if cursor["finished"]:
+        logger.info(f"Рассылка за {key} ({country_code}) уже завершена")
+        return cursor
+
+    holidays = await fetch_broadcast_holidays(date, country_code)
+    if not holidays:
+        logger.info(f"На {key} ({country_code}) праздников нет, рассылка пропущена")
+        await rq.save_broadcast_cursor(key, country_code, cursor["last_user_id"], cursor["sent"], cursor["failed"], True)
+        return {**cursor, "finished": True}
+
+    bucket = bucket or TokenBucket(config.BROADCAST_RATE)
+    semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+    # Праздники запрашиваются один раз на страну, перевод и текст — один раз на язык
+    texts = {}
+
+    async def send(user_id, language):
+        async with semaphore:
+            return await send_with_retry(bot, user_id, texts[language], bucket)
+
+    if cursor["last_user_id"]:
+        logger.info(f"Рассылка за {key} ({country_code}) продолжается после пользователя {cursor['last_user_id']}")
+    async for chunk in rq.iter_country_users(country_code, cursor["last_user_id"], chunk_size or config.BROADCAST_CHUNK):
+        for language in {language for _, language in chunk} - texts.keys():
+            texts[language] = await build_broadcast_text(date, holidays, language)
+        results = await asyncio.gather(*(send(user_id, language) for user_id, language in chunk))
+        cursor["sent"] += sum(results)
+        cursor["failed"] += len(results) - sum(results)
+        cursor["last_user_id"] = chunk[-1][0]
+        # Курсор сохраняется после каждого чанка: при сбое повторно уйдёт не больше одного чанка
+        await rq.save_broadcast_cursor(key, country_code, cursor["last_user_id"], cursor["sent"], cursor["failed"])
+
+    cursor["finished"] = True
+    await rq.save_broadcast_cursor(key, country_code, cursor["last_user_id"], cursor["sent"], cursor["failed"], True)
+    logger.info(f"Рассылка за {key} ({country_code}) завершена: отправлено {cursor['sent']}, ошибок {cursor['failed']}")
+    return cursor
+
+
+async def run_daily_broadcast(bot: Bot, date: datetime.date, bucket=None, chunk_size=None):
+    # Отдельная рассылка и курсор на каждую страну пользователей; сбой одной страны не мешает остальным.
+    # Возвращает страны, рассылку по которым завершить не удалось.
+    bucket = bucket or TokenBucket(config.BROADCAST_RATE)
+    failed = []
+    for country_code in await rq.get_active_countries():
+        try:
+            await run_broadcast(bot, date, country_code, bucket=bucket, chunk_size=chunk_size)
+        except Exception:
+            logger.exception(f"Ошибка рассылки за {date.isoformat()} ({country_code})")
+            failed.append(country_code)
+    return failed
+
+
+def next_run_at(now: datetime.datetime, at: datetime.time) -> datetime.datetime:
+    run_at = datetime.datetime.combine(now.date(), at)
+    return run_at if run_at > now else run_at + datetime.timedelta(days=1)
+
+
+async def broadcast_scheduler(bot: Bot, now=datetime.datetime.now, sleep=asyncio.sleep):
+    at = datetime.time.fromisoformat(config.BROADCAST_TIME)
+    # Если бот перезапустился после времени рассылки, незавершённая сегодняшняя рассылка догоняется сразу
+    run_date = now().date() if now().time() >= at else None
+    while True:
+        if run_date is None:
+            current = now()
+            run_at = next_run_at(current, at)
+            await sleep((run_at - current).total_seconds())
+            run_date = run_at.date()
+        try:
+            failed = await run_daily_broadcast(bot, run_date)
+        except Exception:
+            logger.exception("Ошибка во время ежедневной рассылки")
+            failed = True
+        if failed:
+            # Курсоры незавершённых стран открыты, поэтому повтор продолжит их рассылку, пока не кончились сутки
+            await sleep(config.BROADCAST_RETRY_INTERVAL)
+            if now().date() == run_date:
+                continue
+            logger.error(f"Рассылка за {run_date.isoformat()} так и не была завершена")
+        run_date = None
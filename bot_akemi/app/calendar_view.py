@@ -0,0 +1,143 @@
+import logging
+from collections import OrderedDict
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+import app.keyboards as kb
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_TITLE = "Ваши личные праздники:"
+EMPTY_CALENDAR_TEXT = "Ваш календарь пуст. Вы можете добавить личные праздники."
+IMPORT_HINT = "Чтобы импортировать праздники, отправьте файл .ics или .csv."
+
+
+def create_delete_holiday_keyboard(holidays, has_prev=False, has_next=False):
+    # holidays — строки одной страницы: (id, название, дата)
+    buttons = []
+    # Токен страницы нужен только не для первой страницы: первая рисуется без курсора
+    page_date, page_id = (holidays[0][2], holidays[0][0]) if has_prev and holidays else (None, None)
+
+    for holiday in holidays:
+        buttons.append([
+            InlineKeyboardButton(
+                text=f"❌ {holiday[1]}",
+                callback_data=kb.DeleteHoliday(id=holiday[0], page_date=page_date, page_id=page_id).pack()
+            )
+        ])
+
+    navigation = []
+    if has_prev:
+        first = holidays[0]
+        navigation.append(InlineKeyboardButton(
+            text="◀", callback_data=kb.CalendarPage(direction="prev", date=first[2], id=first[0]).pack()
+        ))
+    if has_next:
+        last = holidays[-1]
+        navigation.append(InlineKeyboardButton(
+            text="▶", callback_data=kb.CalendarPage(direction="next", date=last[2], id=last[0]).pack()
+        ))
+    if navigation:
+        buttons.append(navigation)
+
+    buttons.append([
+        InlineKeyboardButton(text="➕ Добавить праздник", callback_data="add_personal_holiday"),
+        InlineKeyboardButton(text="🗑 Удалить все", callback_data="delete_all_holidays")
+    ])
+    buttons.append([InlineKeyboardButton(text="📤 Экспорт в .ics", callback_data="export_calendar")])
+
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+class CalendarView:
+    # Состояние одной отрисованной страницы календаря: строки и флаги навигации.
+    # Удаление применяется к нему локально, без повторного запроса к БД.
+    def __init__(self, user_id, holidays, has_prev=False, has_next=False, notice="", footer=""):
+        self.user_id = user_id
+        self.holidays = list(holidays)
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.notice = notice
+        self.footer = footer
+
+    def remove(self, holiday_id) -> bool:
+        for index, holiday in enumerate(self.holidays):
+            if holiday[0] == holiday_id:
+                del self.holidays[index]
+                return True
+        return False
+
+    @property
+    def exhausted(self) -> bool:
+        # Страница опустела, но соседние ещё есть — её нужно перечитать из БД
+        return not self.holidays and (self.has_prev or self.has_next)
+
+    def render(self):
+        parts = [self.notice] if self.notice else []
+        if self.holidays:
+            lines = "".join(f"🎉 {holiday[1]} — {holiday[2]}\n" for holiday in self.holidays)
+            parts.append(f"{CALENDAR_TITLE}\n\n{lines}")
+            keyboard = create_delete_holiday_keyboard(self.holidays, self.has_prev, self.has_next)
+        else:
+            parts.append(EMPTY_CALENDAR_TEXT)
+            keyboard = kb.personal_calendar_kb
+        if self.footer:
+            parts.append(self.footer)
+        return "\n".join(parts), keyboard
+
+
+class CalendarViewStore:
+    # Отрисованные страницы по (chat_id, message_id): по ним определяется, что именно
+    # изменилось, и в Telegram уходит не больше одного edit_* на действие
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._views = OrderedDict()
+        self.edits = 0
+        self.skipped = 0
+
+    def get(self, chat_id, message_id):
+        entry = self._views.get((chat_id, message_id))
+        if entry is None:
+            return None
+        self._views.move_to_end((chat_id, message_id))
+        return entry[0]
+
+    def remember(self, chat_id, message_id, view, rendered):
+        self._views[(chat_id, message_id)] = (view, *rendered)
+        self._views.move_to_end((chat_id, message_id))
+        while len(self._views) > self.max_size:
+            self._views.popitem(last=False)
+
+    def forget_user(self, user_id):
+        # После добавления или импорта сохранённые страницы пользователя устарели
+        stale = [key for key, entry in self._views.items() if entry[0].user_id == user_id]
+        for key in stale:
+            del self._views[key]
+
+    async def send(self, message, view):
+        rendered = view.render()
+        sent = await message.answer(rendered[0], reply_markup=rendered[1])
+        self.remember(sent.chat.id, sent.message_id, view, rendered)
+        return sent
+
+    async def show(self, message, view):
+        # Редактирует сообщение только если текст или клавиатура действительно изменились
+        key = (message.chat.id, message.message_id)
+        text, keyboard = view.render()
+        previous = self._views.get(key)
+        old_text, old_keyboard = previous[1:] if previous else (message.text, message.reply_markup)
+        if text != old_text:
+            await message.edit_text(text, reply_markup=keyboard)
+        elif keyboard != old_keyboard:
+            await message.edit_reply_markup(reply_markup=keyboard)
+        else:
+            self.skipped += 1
+            self.remember(*key, view, (text, keyboard))
+            return False
+        self.edits += 1
+        self.remember(*key, view, (text, keyboard))
+        return True
+
+    def stats(self):
+        return {"views": len(self._views), "edits": self.edits, "skipped": self.skipped}
+
+
+calendar_views = CalendarViewStore()
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import aiohttp
+from app.ratelimit import api_slots
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://calendarific.com/api/v2/holidays"
+API = "ijx15Q1EWw2iAn8lBuH6S2wdZRH5yLXE"
+
+# Параметры пула соединений: одна сессия на процесс, keep-alive между запросами
+REQUEST_TIMEOUT = 10
+CONNECT_TIMEOUT = 3
+POOL_LIMIT = 100
+KEEPALIVE_TIMEOUT = 30
+
+_session = None
+_session_lock = asyncio.Lock()
+
+
+async def get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is not None and not _session.closed:
+        return _session
+    async with _session_lock:
+        if _session is None or _session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=POOL_LIMIT,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300,
+            )
+            _session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+                raise_for_status=True,
+            )
+            logger.info("Создана общая HTTP-сессия для Calendarific")
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("HTTP-сессия Calendarific закрыта")
+    _session = None
+
+
+async def fetch_holidays(country_code, year, month=None, day=None, timeout=None):
+    params = {
+        "api_key": API,
+        "country": country_code,
+        "year": year,
+    }
+    if month is not None:
+        params["month"] = month
+    if day is not None:
+        params["day"] = day
+
+    session = await get_session()
+    request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+    async with api_slots():
+        async with session.get(API_URL, params=params, timeout=request_timeout) as response:
+            data = await response.json(content_type=None)
+    return data.get("response", {}).get("holidays", [])
@@ -0,0 +1,68 @@
+import os
+
+# Настройки читаются из переменных окружения; значения по умолчанию — для локального запуска
+BOT_TOKEN = os.getenv("BOT_TOKEN", "7245211358:AAGzWgl_D-OpRvTT1l5VBHE9_HJM8IOSbLs")
+
+# polling — long polling через getUpdates, webhook — aiohttp-сервер за балансировщиком
+RUN_MODE = os.getenv("BOT_MODE", "polling")
+
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+WEBAPP_HOST = os.getenv("WEBAPP_HOST", "0.0.0.0")
+WEBAPP_PORT = int(os.getenv("WEBAPP_PORT", "8080"))
+
+# memory — состояния FSM в памяти процесса, sqlite — в holidays.db (переживают рестарт, общие для воркеров)
+FSM_STORAGE = os.getenv("FSM_STORAGE", "sqlite")
+# Через сколько секунд брошенный диалог добавления праздника забывается
+FSM_STATE_TTL = int(os.getenv("FSM_STATE_TTL", str(24 * 60 * 60)))
+
+# Число процессов-воркеров; при WORKERS > 1 main.py запускает супервизор с шардированием по user_id
+WORKERS = int(os.getenv("WORKERS", "1"))
+
+# Ежедневная рассылка праздников всем пользователям
+BROADCAST_ENABLED = os.getenv("BROADCAST_ENABLED", "1") == "1"
+BROADCAST_TIME = os.getenv("BROADCAST_TIME", "09:00")
+# Telegram допускает около 30 сообщений в секунду на бота
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", "25"))
+BROADCAST_CHUNK = int(os.getenv("BROADCAST_CHUNK", "500"))
+# Через сколько секунд повторяется рассылка, прерванная ошибкой (например, недоступностью API)
+BROADCAST_RETRY_INTERVAL = int(os.getenv("BROADCAST_RETRY_INTERVAL", str(15 * 60)))
+
+# Напоминания о личных праздниках: в REMINDER_TIME за каждое число дней из REMINDER_LEAD_DAYS
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "1") == "1"
+REMINDER_TIME = os.getenv("REMINDER_TIME", "10:00")
+REMINDER_LEAD_DAYS = [int(days) for days in os.getenv("REMINDER_LEAD_DAYS", "0,1").split(",") if days.strip()]
+
+# Сколько апдейтов обрабатывается одновременно в одном процессе
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "100"))
+
+# Лимит запросов пользователя к «дорогим» хендлерам: THROTTLE_RATE в секунду, пачкой до THROTTLE_BURST
+THROTTLE_RATE = float(os.getenv("THROTTLE_RATE", "0.5"))
+THROTTLE_BURST = int(os.getenv("THROTTLE_BURST", "3"))
+# Сколько запросов к внешним API (Calendarific, переводчик) выполняется одновременно на процесс
+OUTBOUND_API_CONCURRENCY = int(os.getenv("OUTBOUND_API_CONCURRENCY", "8"))
+
+# Сколько личных праздников показывается на одной странице календаря
+CALENDAR_PAGE_SIZE = int(os.getenv("CALENDAR_PAGE_SIZE", "10"))
+
+# Страна и язык по умолчанию для новых пользователей
+DEFAULT_COUNTRY = os.getenv("DEFAULT_COUNTRY", "KZ")
+DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "ru")
+SUPPORTED_LANGUAGES = ("ru", "en", "kk")
+
+# Сколько лет (страна, год) держит в памяти кэш праздников. Прогрев занимает не больше трёх
+# четвертей кэша; страны, которые не поместились, загружаются по первому запросу
+HOLIDAY_CACHE_MAX_YEARS = int(os.getenv("HOLIDAY_CACHE_MAX_YEARS", "32"))
+
+# Фоновая предзагрузка календарей всех стран, выбранных пользователями
+PRELOAD_ENABLED = os.getenv("PRELOAD_ENABLED", "1") == "1"
+PRELOAD_INTERVAL = int(os.getenv("PRELOAD_INTERVAL", str(6 * 60 * 60)))
+
+# Локальные правила праздников (app/holiday_rules.py) — основной источник для поддерживаемых стран;
+# Calendarific лишь периодически сверяет и уточняет их
+HOLIDAY_RULES_ENABLED = os.getenv("HOLIDAY_RULES_ENABLED", "1") == "1"
+RECONCILE_INTERVAL = int(os.getenv("RECONCILE_INTERVAL", str(24 * 60 * 60)))
+
+# Сколько секунд Telegram может отдавать закэшированный ответ на inline-запрос
+SEARCH_CACHE_TIME = int(os.getenv("SEARCH_CACHE_TIME", "30"))
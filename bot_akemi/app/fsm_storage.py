@@ -0,0 +1,106 @@
+import json
+import time
+import logging
+import datetime
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+import app.async_requests as rq
+import app.config as config
+
+logger = logging.getLogger(__name__)
+
+# Просроченные записи чистятся не чаще, чем раз в PURGE_INTERVAL секунд
+PURGE_INTERVAL = 10 * 60
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$d": value.isoformat()}
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в состояние FSM")
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        if "$d" in obj:
+            return datetime.date.fromisoformat(obj["$d"])
+        if "$dt" in obj:
+            return datetime.datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def dumps_data(data):
+    # Компактный JSON: {"holiday_date":{"$d":"2025-01-01"}}
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_encode) if data else None
+
+
+def loads_data(raw):
+    return json.loads(raw, object_hook=_decode) if raw else {}
+
+
+def storage_key(key: StorageKey) -> str:
+    return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+
+class SQLiteStorage(BaseStorage):
+    """Хранилище FSM в holidays.db: состояние переживает рестарт и видно всем воркерам."""
+
+    def __init__(self, ttl=None, database=None, clock=time.time):
+        self.ttl = ttl if ttl is not None else config.FSM_STATE_TTL
+        self._database = database
+        self._clock = clock
+        self._last_purge = 0.0
+
+    @property
+    def database(self):
+        return self._database or rq.database
+
+    async def _upsert(self, key, column, value):
+        now = self._clock()
+        await self.database.execute(f'''
+        INSERT INTO fsm_states (storage_key, {column}, expires_at) VALUES (?, ?, ?)
+        ON CONFLICT (storage_key) DO UPDATE SET {column} = excluded.{column}, expires_at = excluded.expires_at
+        ''', (storage_key(key), value, now + self.ttl))
+        if now - self._last_purge >= PURGE_INTERVAL:
+            self._last_purge = now
+            await self.purge_expired()
+
+    async def _select(self, key, column):
+        row = await self.database.fetchone(f'''
+        SELECT {column} FROM fsm_states WHERE storage_key = ? AND expires_at > ?
+        ''', (storage_key(key), self._clock()))
+        return row[0] if row else None
+
+    async def set_state(self, key: StorageKey, state=None) -> None:
+        await self._upsert(key, "state", state.state if isinstance(state, State) else state)
+
+    async def get_state(self, key: StorageKey):
+        return await self._select(key, "state")
+
+    async def set_data(self, key: StorageKey, data) -> None:
+        await self._upsert(key, "data", dumps_data(data))
+
+    async def get_data(self, key: StorageKey):
+        return loads_data(await self._select(key, "data"))
+
+    async def purge_expired(self):
+        removed = await self.database.execute('''
+        DELETE FROM fsm_states WHERE expires_at <= ? OR (state IS NULL AND data IS NULL)
+        ''', (self._clock(),))
+        if removed:
+            logger.info(f"Удалено {removed} просроченных состояний FSM")
+        return removed
+
+    async def close(self) -> None:
+        pass
+
+
+def create_storage(kind=None):
+    kind = kind or config.FSM_STORAGE
+    if kind == "sqlite":
+        return SQLiteStorage()
+    if kind != "memory":
+        logger.warning(f"Неизвестное хранилище FSM '{kind}', используется память процесса")
+    return MemoryStorage()
@@ -1,100 +1,39 @@
-import os
 import logging
 import io
+import calendar
+import os
 import datetime
-import requests
-from aiogram import F, Router
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.filters import CommandStart
+import asyncio
+import tempfile
+import aiohttp
+from aiogram import F, Bot, Router
+from aiogram.types import (
+    Message, CallbackQuery, FSInputFile, InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+)
+from aiogram.filters import Command, CommandObject, CommandStart
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
-from deep_translator import GoogleTranslator
-import app.database as db
+import app.config as config
 import app.keyboards as kb
-import app.requests as rq
-
-log_dir = 'logs'
-report_dir = 'reports'
-os.makedirs(log_dir, exist_ok=True)
-os.makedirs(report_dir, exist_ok=True)
-
-log_file_path = os.path.join(log_dir, 'handlers.log')
-html_report_path = os.path.join(report_dir, 'report.html')
-final_html_report_path = os.path.join(report_dir, 'final_report.html')
-
-class HTMLHandler(logging.Handler):
-    def __init__(self, filename):
-        super().__init__()
-        self.filename = filename
-
-    def emit(self, record):
-        try:
-            log_entry = self.format(record)
-            with io.open(self.filename, 'a', encoding='utf-8') as f:
-                f.write(log_entry + "<br>\n")
-        except Exception:
-            self.handleError(record)
+import app.async_requests as rq
+from app.holiday_cache import holiday_cache
+from app.middlewares import ThrottlingMiddleware
+from app.translation import translation_memo, translate_many
+from app.range_index import personal_ranges
+from app.search import holiday_search
+from app.calendar_view import CalendarView, IMPORT_HINT, calendar_views
+from app.ical import MAX_IMPORT_BYTES, ICS_HEADER, ICS_FOOTER, CalendarParseError, parse_calendar, iter_events
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-log_handler = logging.FileHandler(log_file_path, encoding='utf-8')
-log_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
-logger.addHandler(log_handler)
+# Лимиты общие для всех роутеров процесса
+throttling = ThrottlingMiddleware()
 
-html_handler = HTMLHandler(html_report_path)
-html_handler.setFormatter(logging.Formatter('<b>%(asctime)s</b> [%(levelname)s] %(message)s'))
-logger.addHandler(html_handler)
+THROTTLED_TEXT = "⏳ Слишком много запросов. Попробуйте чуть позже."
+STALE_PICKER_TEXT = "Этот календарь уже неактуален. Откройте выбор даты заново."
 
-def generate_html_report():
-    try:
-        with io.open(html_report_path, 'r', encoding='utf-8') as log_file:
-            log_entries = log_file.readlines()
-
-        html_content = f"""<!DOCTYPE html>
-<html lang="ru">
-<head>
-    <meta charset="UTF-8">
-    <title>Итоговый отчёт логов</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            background-color: #f4f4f4;
-            padding: 20px;
-        }}
-        h1 {{
-            color: #333;
-        }}
-        .log {{
-            background-color: #fff;
-            border: 1px solid #ccc;
-            padding: 10px;
-            line-height: 1.6;
-        }}
-        .INFO {{ color: green; }}
-        .ERROR {{ color: red; }}
-        .WARNING {{ color: orange; }}
-        .DEBUG {{ color: gray; }}
-    </style>
-</head>
-<body>
-    <h1>Итоговый отчёт логов</h1>
-    <div class="log">
-        {''.join(log_entries)}
-    </div>
-</body>
-</html>"""
-
-        with io.open(final_html_report_path, 'w', encoding='utf-8') as html_file:
-            html_file.write(html_content)
-
-        logger.info(f"HTML-отчёт успешно сохранён: {final_html_report_path}")
-    except Exception as e:
-        logger.error(f"Ошибка при создании итогового HTML-отчёта: {e}")
-
-
-router = Router()
-API = "ijx15Q1EWw2iAn8lBuH6S2wdZRH5yLXE"
+UPCOMING_DEFAULT = 10
+UPCOMING_MAX = 50
 
 class HolidayDate(StatesGroup):
     waiting_for_date = State()
@@ -102,82 +41,148 @@ class HolidayDate(StatesGroup):
     waiting_for_custom_name = State()
 
 
-db.create_db()
-
-def get_holidays_by_date(date: datetime.date, country_code='KZ'):
-    url = "https://calendarific.com/api/v2/holidays"
-    params = {
-        "api_key": API,
-        "country": country_code,
-        "year": date.year,
-        "month": date.month,
-        "day": date.day
-    }
+async def get_holidays_by_date(date: datetime.date, country_code='KZ', cached_only=False):
+    if cached_only:
+        return holiday_cache.peek(date, country_code)
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("response", {}).get("holidays", [])
-    except (requests.RequestException, ValueError) as e:
+        return await holiday_cache.get(date, country_code)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
         logger.error(f"Ошибка получения праздников: {e}")
         return None
 
-def translate_to_russian(text: str) -> str:
-    try:
-        return GoogleTranslator(source='auto', target='ru').translate(text)
-    except Exception as e:
-        logger.warning(f"Ошибка перевода: {e}")
-        return text
-
-def create_delete_holiday_keyboard(holidays):
-    buttons = []
-
-    for holiday in holidays:
-        buttons.append([
-            InlineKeyboardButton(
-                text=f"❌ {holiday[0]}",
-                callback_data=f"delete_holiday_{holiday[0]}"
-            )
-        ])
-
-    buttons.append([
-        InlineKeyboardButton(text="➕ Добавить праздник", callback_data="add_personal_holiday"),
-        InlineKeyboardButton(text="🗑 Удалить все", callback_data="delete_all_holidays")
-    ])
-
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
+async def get_user_settings(user_id):
+    return await rq.get_user_settings(user_id, (config.DEFAULT_COUNTRY, config.DEFAULT_LANGUAGE))
 
+async def format_holiday_names(holidays, target='ru', cached_only=False) -> str:
+    if target == 'en':
+        # Calendarific отдаёт названия на английском — переводить нечего
+        names = [h['name'] for h in holidays]
+    elif cached_only:
+        names = [translation_memo.get(h['name'], target) or h['name'] for h in holidays]
+    else:
+        names = await translate_many((h['name'] for h in holidays), target)
+    return "".join(f"🎉 {name}\n" for name in names)
 
-@router.message(CommandStart())
 async def cmd_start(message: Message):
-    rq.add_user(message.from_user.id, message.from_user.username)
+    await rq.add_user(message.from_user.id, message.from_user.username)
     logger.info(f"Команда /start от пользователя {message.from_user.id} ({message.from_user.username})")
     await message.answer("Привет! Выбери пункт на клавиатуре", reply_markup=kb.main)
 
-@router.message(F.text == "Какой сегодня праздник?")
-async def cmd_today(message: Message):
+async def cmd_country(message: Message, command: CommandObject):
+    country_code = (command.args or "").strip().upper()
+    if len(country_code) != 2 or not country_code.isalpha():
+        current, _ = await get_user_settings(message.from_user.id)
+        await message.answer(f"Текущая страна: {current}. Чтобы сменить, отправьте /country и код страны, например /country KZ")
+        return
+    # Проверка заодно загружает календарь страны в кэш процесса
+    try:
+        known = await holiday_cache.has_country(country_code, datetime.date.today().year)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.error(f"Не удалось проверить страну {country_code}: {e}")
+        await message.answer("Не удалось проверить страну. Попробуйте позже.")
+        return
+    if not known:
+        logger.warning(f"Пользователь {message.from_user.id} указал неизвестную страну: {country_code}")
+        await message.answer(f"❌ Для страны {country_code} праздники не найдены. Проверьте двухбуквенный код ISO.")
+        return
+    await rq.set_user_country(message.from_user.id, country_code)
+    await message.answer(f"🌍 Страна изменена на {country_code}.")
+
+async def cmd_language(message: Message, command: CommandObject):
+    language = (command.args or "").strip().lower()
+    if language not in config.SUPPORTED_LANGUAGES:
+        languages = ", ".join(config.SUPPORTED_LANGUAGES)
+        await message.answer(f"Поддерживаемые языки: {languages}. Например: /language ru")
+        return
+    await rq.set_user_language(message.from_user.id, language)
+    await message.answer(f"🗣 Язык названий праздников изменён на {language}.")
+
+async def cmd_today(message: Message, throttled: bool = False):
     today = datetime.date.today()
     logger.info(f"Запрос на праздник на сегодня от {message.from_user.id} — {today}")
-    holidays = get_holidays_by_date(today)
-    if holidays is None:
+    country_code, language = await get_user_settings(message.from_user.id)
+    holidays = await get_holidays_by_date(today, country_code, cached_only=throttled)
+    if holidays is None and throttled:
+        text = THROTTLED_TEXT
+    elif holidays is None:
         text = "Не удалось получить данные. Попробуйте позже."
     elif holidays:
         text = f"Сегодня ({today.strftime('%d.%m.%Y')}) отмечаются:\n\n"
-        for h in holidays:
-            text += f"🎉 {translate_to_russian(h['name'])}\n"
+        text += await format_holiday_names(holidays, language, cached_only=throttled)
     else:
         text = f"Сегодня ({today.strftime('%d.%m.%Y')}) нет официальных праздников."
     await message.answer(text, reply_markup=kb.choose_date)
 
-@router.callback_query(F.data == "choose_another_date")
+async def holiday_marks(user_id, year, month):
+    # Дни месяца с публичными праздниками страны пользователя — отметки в календаре выбора даты.
+    # Берутся только из кэша: листание календаря не должно загружать годы из БД и API.
+    country_code, _ = await get_user_settings(user_id)
+    start = datetime.date(year, month, 1)
+    end = start.replace(day=calendar.monthrange(year, month)[1])
+    return frozenset(int(iso[8:10]) for iso, _ in holiday_cache.peek_range(start, end, country_code))
+
+def picked_date(callback_data: kb.DatePick):
+    # callback_data присылает клиент, поэтому дата проверяется до создания datetime.date
+    if not kb.picker_month_valid(callback_data.year, callback_data.month):
+        return None
+    try:
+        return datetime.date(callback_data.year, callback_data.month, callback_data.day)
+    except ValueError:
+        return None
+
+async def send_date_picker(message: Message, user_id: int, purpose: str, text: str):
+    today = datetime.date.today()
+    marks = await holiday_marks(user_id, today.year, today.month)
+    await message.answer(text, reply_markup=kb.date_picker(purpose, today.year, today.month, marks))
+
 async def cb_pick_another_date(callback: CallbackQuery, state: FSMContext):
     logger.info(f"Пользователь {callback.from_user.id} выбрал ввод другой даты")
-    await callback.message.answer("Введите дату в формате **дд.мм.гггг**:")
+    await send_date_picker(
+        callback.message, callback.from_user.id, "public",
+        "Выберите дату в календаре или введите её в формате дд.мм.гггг:",
+    )
     await state.set_state(HolidayDate.waiting_for_date)
     await callback.answer()
 
-@router.message(HolidayDate.waiting_for_date)
-async def process_custom_date(message: Message, state: FSMContext):
+async def cb_date_picker_nav(callback: CallbackQuery, callback_data: kb.DatePick):
+    # Листание месяцев меняет только клавиатуру, текст сообщения остаётся прежним
+    if not kb.picker_month_valid(callback_data.year, callback_data.month):
+        await callback.answer()
+        return
+    marks = await holiday_marks(callback.from_user.id, callback_data.year, callback_data.month)
+    keyboard = kb.date_picker(callback_data.purpose, callback_data.year, callback_data.month, marks)
+    await callback.message.edit_reply_markup(reply_markup=keyboard)
+    await callback.answer()
+
+async def cb_date_picker_noop(callback: CallbackQuery):
+    await callback.answer()
+
+async def cb_public_date_picked(callback: CallbackQuery, callback_data: kb.DatePick, state: FSMContext,
+                                throttled: bool = False):
+    date = picked_date(callback_data)
+    if date is None:
+        await callback.answer(STALE_PICKER_TEXT)
+        return
+    logger.info(f"Пользователь {callback.from_user.id} выбрал в календаре дату: {date}")
+    await callback.answer()
+    await answer_holidays_on(callback.message, callback.from_user.id, date, state, throttled)
+
+async def cb_personal_date_picked(callback: CallbackQuery, callback_data: kb.DatePick, state: FSMContext):
+    date = picked_date(callback_data)
+    if date is None:
+        await callback.answer(STALE_PICKER_TEXT)
+        return
+    logger.info(f"Пользователь {callback.from_user.id} выбрал в календаре дату личного праздника: {date}")
+    await callback.answer()
+    await remember_personal_date(callback.message, state, date)
+
+async def cb_date_picker_stale(callback: CallbackQuery):
+    # Календарь из истории чата: пользователь уже не выбирает дату или занят другим диалогом,
+    # который нажатие не должно сбрасывать
+    logger.info(f"Пользователь {callback.from_user.id} нажал на устаревший календарь выбора даты")
+    await callback.answer(STALE_PICKER_TEXT)
+
+async def process_custom_date(message: Message, state: FSMContext, throttled: bool = False):
     try:
         date = datetime.datetime.strptime(message.text, "%d.%m.%Y").date()
         logger.info(f"Пользователь {message.from_user.id} ввёл дату: {date}")
@@ -185,40 +190,136 @@ async def process_custom_date(message: Message, state: FSMContext):
         logger.warning(f"Пользователь {message.from_user.id} ввёл неверную дату: {message.text}")
         await message.reply("❌ Неверный формат даты. Попробуйте ещё раз: дд.мм.гггг")
         return
-    holidays = get_holidays_by_date(date)
+    await answer_holidays_on(message, message.from_user.id, date, state, throttled)
+
+async def answer_holidays_on(message: Message, user_id: int, date: datetime.date, state: FSMContext, throttled=False):
+    country_code, language = await get_user_settings(user_id)
+    holidays = await get_holidays_by_date(date, country_code, cached_only=throttled)
+    if holidays is None and throttled:
+        # Состояние не сбрасываем: пользователь сможет повторить ввод даты
+        await message.answer(THROTTLED_TEXT)
+        return
     if holidays is None:
         text = "Не удалось получить данные. Попробуйте позже."
     elif holidays:
         text = f"На {date.strftime('%d.%m.%Y')} отмечаются:\n\n"
-        for h in holidays:
-            text += f"🎉 {translate_to_russian(h['name'])}\n"
+        text += await format_holiday_names(holidays, language, cached_only=throttled)
     else:
         text = f"На {date.strftime('%d.%m.%Y')} нет официальных праздников."
     await message.answer(text, reply_markup=kb.choose_date)
     await state.clear()
 
-@router.message(F.text == "Посмотреть личный календарь")
+# In-memory индексы личных праздников обновляются на месте, а не перечитываются из БД
+def personal_holiday_added(user_id, row):
+    calendar_views.forget_user(user_id)
+    personal_ranges.add(user_id, row)
+    holiday_search.add_personal(user_id, *row)
+
+def personal_holiday_removed(user_id, holiday_id):
+    personal_ranges.remove(user_id, holiday_id)
+    holiday_search.remove_personal(user_id, holiday_id)
+
+def personal_holidays_reset(user_id):
+    calendar_views.forget_user(user_id)
+    personal_ranges.forget(user_id)
+    holiday_search.forget_user(user_id)
+
+async def collect_range(user_id, start, end=None, limit=None):
+    # Публичные праздники страны пользователя и его личные за период [start, end]
+    # или ближайшие limit, начиная со start. Возвращает [(дата, эмодзи, название)].
+    country_code, language = await get_user_settings(user_id)
+    try:
+        if end is not None:
+            public = await holiday_cache.get_range(start, end, country_code)
+        else:
+            public = await holiday_cache.upcoming(start, limit, country_code)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.error(f"Ошибка получения праздников за период: {e}")
+        public = []
+    if end is not None:
+        personal = await personal_ranges.between(user_id, start, end)
+    else:
+        personal = await personal_ranges.upcoming(user_id, start, limit)
+
+    if language == 'en':
+        names = [holiday['name'] for _, holiday in public]
+    else:
+        names = await translate_many((holiday['name'] for _, holiday in public), language)
+    items = [(datetime.date.fromisoformat(iso), "🎉", name) for (iso, _), name in zip(public, names)]
+    items += [(date, "⭐", row[1]) for date, row in personal]
+    items.sort(key=lambda item: item[0])
+    return items[:limit] if limit is not None else items
+
+def format_range(title, items) -> str:
+    if not items:
+        return f"{title}\n\nПраздников нет."
+    lines = "".join(f"{date.strftime('%d.%m')} {mark} {name}\n" for date, mark, name in items)
+    return f"{title}\n\n{lines}"
+
+async def answer_range(message: Message, user_id: int, period: str, argument=None):
+    today = datetime.date.today()
+    if period == "week":
+        end = today + datetime.timedelta(days=6)
+        items = await collect_range(user_id, today, end)
+        title = f"📆 Праздники на неделю ({today.strftime('%d.%m')}–{end.strftime('%d.%m')}):"
+    elif period == "month":
+        start = today.replace(day=1)
+        end = (start + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+        items = await collect_range(user_id, start, end)
+        title = f"🗓 Праздники в этом месяце ({start.strftime('%m.%Y')}):"
+    else:
+        limit = min(max(argument or UPCOMING_DEFAULT, 1), UPCOMING_MAX)
+        items = await collect_range(user_id, today, limit=limit)
+        title = f"⏭ Ближайшие праздники ({limit}):"
+    await message.answer(format_range(title, items), reply_markup=kb.choose_date)
+
+async def cmd_range(message: Message, command: CommandObject, throttled: bool = False):
+    if throttled:
+        await message.answer(THROTTLED_TEXT)
+        return
+    argument = int(command.args) if command.args and command.args.strip().isdigit() else None
+    logger.info(f"Пользователь {message.from_user.id} запросил праздники за период: {command.command}")
+    await answer_range(message, message.from_user.id, command.command, argument)
+
+async def cb_range(callback: CallbackQuery, throttled: bool = False):
+    if throttled:
+        await callback.answer(THROTTLED_TEXT)
+        return
+    await callback.answer()
+    await answer_range(callback.message, callback.from_user.id, callback.data.removeprefix("range_"))
+
+async def load_calendar_view(user_id, after=None, before=None, start=None, notice=""):
+    holidays, has_prev, has_next = await rq.get_personal_holidays_page(
+        user_id, after=after, before=before, start=start, limit=config.CALENDAR_PAGE_SIZE
+    )
+    if not holidays and (after is not None or before is not None or start is not None):
+        # Страница опустела после удалений — показываем начало календаря
+        holidays, has_prev, has_next = await rq.get_personal_holidays_page(user_id, limit=config.CALENDAR_PAGE_SIZE)
+    return CalendarView(user_id, holidays, has_prev, has_next, notice=notice, footer=IMPORT_HINT)
+
 async def cmd_personal_calendar(message: Message):
     logger.info(f"Пользователь {message.from_user.id} запросил личный календарь")
-    holidays = rq.get_personal_holidays(message.from_user.id)
-    if holidays:
-        text = "Ваши личные праздники:\n\n"
-        for holiday in holidays:
-            text += f"🎉 {holiday[0]} — {holiday[1]}\n"
-        keyboard = create_delete_holiday_keyboard(holidays)
+    view = await load_calendar_view(message.from_user.id)
+    await calendar_views.send(message, view)
+
+async def cb_calendar_page(callback: CallbackQuery, callback_data: kb.CalendarPage):
+    cursor = (callback_data.date, callback_data.id)
+    if callback_data.direction == "prev":
+        view = await load_calendar_view(callback.from_user.id, before=cursor)
     else:
-        text = "Ваш календарь пуст. Вы можете добавить личные праздники."
-        keyboard = kb.personal_calendar_kb
-    await message.answer(text, reply_markup=keyboard)
+        view = await load_calendar_view(callback.from_user.id, after=cursor)
+    await calendar_views.show(callback.message, view)
+    await callback.answer()
 
-@router.callback_query(F.data == "add_personal_holiday")
 async def add_personal_holiday(callback: CallbackQuery, state: FSMContext):
     logger.info(f"Пользователь {callback.from_user.id} начал добавление праздника")
-    await callback.message.answer("Введите дату праздника в формате дд.мм.гггг:")
+    await send_date_picker(
+        callback.message, callback.from_user.id, "personal",
+        "Выберите дату праздника в календаре или введите её в формате дд.мм.гггг:",
+    )
     await state.set_state(HolidayDate.waiting_for_custom_date)
     await callback.answer()
 
-@router.message(HolidayDate.waiting_for_custom_date)
 async def handle_personal_date(message: Message, state: FSMContext):
     try:
         date = datetime.datetime.strptime(message.text, "%d.%m.%Y").date()
@@ -227,44 +328,184 @@ async def handle_personal_date(message: Message, state: FSMContext):
         logger.warning(f"Пользователь {message.from_user.id} указал неверную дату: {message.text}")
         await message.reply("❌ Неверный формат даты. Попробуйте снова: дд.мм.гггг")
         return
+    await remember_personal_date(message, state, date)
+
+async def remember_personal_date(message: Message, state: FSMContext, date: datetime.date):
     await state.update_data(holiday_date=date)
     await state.set_state(HolidayDate.waiting_for_custom_name)
     await message.answer("Введите название праздника:")
 
-@router.message(HolidayDate.waiting_for_custom_name)
 async def handle_personal_name(message: Message, state: FSMContext):
     holiday_name = message.text
     user_data = await state.get_data()
     holiday_date = user_data['holiday_date']
-    rq.add_personal_holiday(message.from_user.id, holiday_name, holiday_date)
+    holiday_id = await rq.add_personal_holiday(message.from_user.id, holiday_name, holiday_date)
     logger.info(f"Пользователь {message.from_user.id} добавил праздник '{holiday_name}' ({holiday_date})")
+    if holiday_id is not None:
+        personal_holiday_added(message.from_user.id, (holiday_id, holiday_name, str(holiday_date)))
     await message.answer(f"🎉 Праздник '{holiday_name}' на {holiday_date.strftime('%d.%m.%Y')} успешно добавлен!")
     await state.clear()
 
-@router.callback_query(F.data.startswith("delete_holiday_"))
+async def delete_personal_holiday_by_id(callback: CallbackQuery, callback_data: kb.DeleteHoliday):
+    user_id = callback.from_user.id
+    deleted = await rq.delete_personal_holiday_by_id(user_id, callback_data.id)
+    logger.info(f"Пользователь {user_id} удалил личный праздник с ID {callback_data.id}")
+    if deleted:
+        personal_holiday_removed(user_id, callback_data.id)
+    notice = "Праздник удалён." if deleted else ""
+    view = calendar_views.get(callback.message.chat.id, callback.message.message_id)
+    if view is not None and view.user_id == user_id and view.remove(callback_data.id) and not view.exhausted:
+        # Удаление применено к отрисованной странице локально — без повторного чтения из БД
+        view.notice = notice
+    else:
+        page = (callback_data.page_date, callback_data.page_id)
+        start = page if None not in page else None
+        view = await load_calendar_view(user_id, start=start, notice=notice)
+    await calendar_views.show(callback.message, view)
+    await callback.answer()
+
+# Кнопки старого формата с названием в callback_data могут остаться в истории чатов
 async def delete_personal_holiday(callback: CallbackQuery):
     holiday_name = callback.data.split("_", 2)[2]
-    rq.delete_personal_holiday(callback.from_user.id, holiday_name)
+    await rq.delete_personal_holiday(callback.from_user.id, holiday_name)
     logger.info(f"Пользователь {callback.from_user.id} удалил личный праздник '{holiday_name}'")
+    personal_holidays_reset(callback.from_user.id)
+    view = await load_calendar_view(callback.from_user.id, notice="Праздник удалён.")
+    await calendar_views.show(callback.message, view)
+
+async def confirm_delete_all_personal_holidays(callback: CallbackQuery):
+    user_id = callback.from_user.id
+    await rq.delete_all_personal_holidays(user_id)
+    logger.info(f"Пользователь {user_id} удалил все личные праздники")
+    personal_holidays_reset(user_id)
+    # Пустой календарь известен без запроса к БД — достаточно одного редактирования
+    view = CalendarView(user_id, [], notice="Ваш календарь очищен.", footer=IMPORT_HINT)
+    await calendar_views.show(callback.message, view)
+    await callback.answer()
+
 
-    holidays = rq.get_personal_holidays(callback.from_user.id)
-    if holidays:
-        text = "Праздник удалён. Ваши оставшиеся личные праздники:\n\n"
-        for holiday in holidays:
-            text += f"🎉 {holiday[0]} — {holiday[1]}\n"
-        keyboard = create_delete_holiday_keyboard(holidays)
+async def import_personal_calendar(message: Message, bot: Bot):
+    document = message.document
+    file_name = document.file_name or ""
+    if not file_name.lower().endswith((".ics", ".csv")):
+        await message.reply("Поддерживаются только файлы .ics и .csv.")
+        return
+    if document.file_size and document.file_size > MAX_IMPORT_BYTES:
+        await message.reply("❌ Файл слишком большой.")
+        return
+    buffer = await bot.download(document, destination=io.BytesIO())
+    # Разбор ленивый: строки читаются и вставляются одним executemany в потоке-писателе БД
+    parsed = parse_calendar(buffer, file_name)
+    try:
+        count = await rq.add_personal_holidays_bulk(message.from_user.id, parsed)
+    except CalendarParseError as e:
+        # Транзакция импорта откатывается целиком, календарь пользователя не меняется
+        logger.warning(f"Пользователь {message.from_user.id} прислал некорректный файл '{file_name}': {e}")
+        await message.reply("❌ Не удалось разобрать файл. Нужен календарь .ics или таблица .csv в кодировке UTF-8.")
+        return
+    logger.info(f"Пользователь {message.from_user.id} импортировал {count} праздников из '{file_name}'")
+    personal_holidays_reset(message.from_user.id)
+    if count:
+        text = f"📥 Импортировано праздников: {count}"
+        if parsed.truncated:
+            text += f"\nВ файле больше {parsed.limit} праздников, остальные не импортированы."
+        await message.answer(text)
     else:
-        text = "Календарь пуст. Вы можете добавить личные праздники."
-        keyboard = kb.personal_calendar_kb
+        await message.answer("В файле не найдено праздников для импорта.")
 
-    await callback.message.edit_text(text, reply_markup=keyboard)
 
-@router.callback_query(F.data == "delete_all_holidays")
-async def confirm_delete_all_personal_holidays(callback: CallbackQuery):
-    rq.delete_all_personal_holidays(callback.from_user.id)
-    logger.info(f"Пользователь {callback.from_user.id} удалил все личные праздники")
-    await callback.message.answer("Ваш календарь очищен.")
-    await cmd_personal_calendar(callback.message)
+async def export_personal_calendar(message: Message, user_id: int):
+    fd, path = tempfile.mkstemp(suffix=".ics")
+    try:
+        # Календарь выгружается порциями прямо в файл, целиком в памяти он не держится
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+            await asyncio.to_thread(file.write, ICS_HEADER)
+            async for rows in rq.iter_personal_holidays(user_id):
+                await asyncio.to_thread(file.writelines, list(iter_events(rows)))
+            await asyncio.to_thread(file.write, ICS_FOOTER)
+        await message.answer_document(FSInputFile(path, filename="personal_holidays.ics"))
+        logger.info(f"Пользователь {user_id} выгрузил личный календарь")
+    finally:
+        os.remove(path)
+
 
+async def cmd_export(message: Message):
+    await export_personal_calendar(message, message.from_user.id)
 
-generate_html_report()
+
+async def cb_export(callback: CallbackQuery):
+    await callback.answer()
+    await export_personal_calendar(callback.message, callback.from_user.id)
+
+
+async def inline_search(inline_query: InlineQuery):
+    query = inline_query.query.strip()
+    if not query:
+        await inline_query.answer([], cache_time=config.SEARCH_CACHE_TIME, is_personal=True)
+        return
+    user_id = inline_query.from_user.id
+    country_code, language = await get_user_settings(user_id)
+    try:
+        matches = await holiday_search.search(user_id, query, country_code, language)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.error(f"Ошибка поиска праздников: {e}")
+        matches = []
+    results = []
+    for position, (mark, name, iso) in enumerate(matches):
+        date = datetime.date.fromisoformat(iso).strftime('%d.%m.%Y')
+        results.append(InlineQueryResultArticle(
+            id=str(position),
+            title=f"{mark} {name}",
+            description=date,
+            input_message_content=InputTextMessageContent(message_text=f"{mark} {name} — {date}"),
+        ))
+    logger.info(f"Поиск '{query}' от пользователя {user_id}: найдено {len(results)}")
+    await inline_query.answer(results, cache_time=config.SEARCH_CACHE_TIME, is_personal=True)
+
+
+def create_router() -> Router:
+    # Роутер может принадлежать только одному диспетчеру, поэтому каждый диспетчер получает свой
+    router = Router()
+    router.message.middleware(throttling)
+    router.callback_query.middleware(throttling)
+
+    router.message.register(cmd_start, CommandStart())
+    router.message.register(cmd_country, Command("country"))
+    router.message.register(cmd_language, Command("language"))
+    router.message.register(cmd_today, F.text == "Какой сегодня праздник?", flags={"throttling": "holidays"})
+    router.message.register(process_custom_date, HolidayDate.waiting_for_date, flags={"throttling": "holidays"})
+    router.message.register(cmd_range, Command("week", "month", "upcoming"), flags={"throttling": "holidays"})
+    router.message.register(cmd_personal_calendar, F.text == "Посмотреть личный календарь")
+    router.message.register(handle_personal_date, HolidayDate.waiting_for_custom_date)
+    router.message.register(handle_personal_name, HolidayDate.waiting_for_custom_name)
+    router.message.register(import_personal_calendar, F.document)
+    router.message.register(cmd_export, Command("export"))
+
+    router.callback_query.register(cb_pick_another_date, F.data == "choose_another_date")
+    router.callback_query.register(cb_date_picker_nav, kb.DatePick.filter(F.action == "nav"))
+    router.callback_query.register(cb_date_picker_noop, kb.DatePick.filter(F.action == "noop"))
+    # Выбор дня принимается только в тех же состояниях, что и ввод даты текстом
+    router.callback_query.register(
+        cb_public_date_picked,
+        HolidayDate.waiting_for_date,
+        kb.DatePick.filter((F.action == "day") & (F.purpose == "public")),
+        flags={"throttling": "holidays"},
+    )
+    router.callback_query.register(
+        cb_personal_date_picked,
+        HolidayDate.waiting_for_custom_date,
+        kb.DatePick.filter((F.action == "day") & (F.purpose == "personal")),
+    )
+    router.callback_query.register(cb_date_picker_stale, kb.DatePick.filter(F.action == "day"))
+    router.callback_query.register(
+        cb_range, F.data.in_({"range_week", "range_month", "range_upcoming"}), flags={"throttling": "holidays"}
+    )
+    router.callback_query.register(cb_calendar_page, kb.CalendarPage.filter())
+    router.callback_query.register(add_personal_holiday, F.data == "add_personal_holiday")
+    router.callback_query.register(delete_personal_holiday_by_id, kb.DeleteHoliday.filter())
+    router.callback_query.register(delete_personal_holiday, F.data.startswith("delete_holiday_"))
+    router.callback_query.register(confirm_delete_all_personal_holidays, F.data == "delete_all_holidays")
+    router.callback_query.register(cb_export, F.data == "export_calendar")
+
+    router.inline_query.register(inline_search)
+    return router
@@ -0,0 +1,296 @@
+import sys
+import time
+import asyncio
+import logging
+import datetime
+from collections import OrderedDict
+import aiohttp
+import app.config as config
+import app.calendarific as calendarific
+import app.async_requests as rq
+from app.singleflight import SingleFlight
+from app.holiday_rules import has_rules, compute_year
+from app.range_index import RangeIndex
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 24 * 60 * 60
+CACHE_MAX_YEARS = config.HOLIDAY_CACHE_MAX_YEARS
+# Сколько живёт год, сохранённый в holidays.db, прежде чем его перезапросить из API
+STORE_TTL = 7 * 24 * 60 * 60
+# Сверка принимает ответ API, только если в нём не меньше этой доли дат, вычисленных по правилам
+RECONCILE_MIN_SHARE = 0.5
+
+
+def holiday_iso_date(holiday) -> str:
+    # Calendarific отдаёт дату как "2024-03-21" или "2024-03-20T21:06:24+05:00"
+    return holiday["date"]["iso"][:10]
+
+
+def build_date_index(holidays):
+    index = {}
+    for holiday in holidays:
+        try:
+            index.setdefault(holiday_iso_date(holiday), []).append(holiday)
+        except (KeyError, TypeError):
+            logger.warning(f"Праздник без даты пропущен: {holiday!r}")
+    return index
+
+
+def _deep_sizeof(value, seen=None):
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(_deep_sizeof(item, seen) for item in value)
+    return size
+
+
+class HolidayCache:
+    """Кэш праздников с гранулярностью (страна, год): TTL + LRU-вытеснение."""
+
+    def __init__(self, fetch_year, ttl=CACHE_TTL, max_years=CACHE_MAX_YEARS, clock=time.monotonic):
+        self._fetch_year = fetch_year
+        self.ttl = ttl
+        self.max_years = max_years
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        loaded_at, index, ranges = entry
+        if self._clock() - loaded_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return index, ranges
+
+    def put(self, country_code, year, holidays):
+        key = (country_code, year)
+        index = build_date_index(holidays)
+        # Рядом с картой дата -> праздники держим отсортированный массив для запросов по диапазону
+        ranges = RangeIndex((iso, holiday) for iso, day in index.items() for holiday in day)
+        self._entries[key] = (self._clock(), index, ranges)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_years:
+            evicted, _ = self._entries.popitem(last=False)
+            logger.info(f"Год {evicted} вытеснен из кэша праздников")
+        return index
+
+    async def _year_entry(self, country_code, year):
+        key = (country_code, year)
+        entry = self._lookup(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        # Одновременные промахи по одному году (например, всплеск /today после полуночи) ждут одну загрузку
+        return await self._flights.do(key, lambda: self._load_year(country_code, year))
+
+    async def get_year(self, country_code, year):
+        index, _ = await self._year_entry(country_code, year)
+        return index
+
+    async def _load_year(self, country_code, year):
+        holidays = await self._fetch_year(country_code, year)
+        logger.info(f"Загружено {len(holidays)} праздников для {country_code} за {year} год")
+        self.put(country_code, year, holidays)
+        return self._entries[(country_code, year)][1:]
+
+    async def get_range(self, start: datetime.date, end: datetime.date, country_code='KZ'):
+        # [(дата ISO, праздник)] за период; каждый год — один bisect по готовому массиву
+        result = []
+        for year in range(start.year, end.year + 1):
+            _, ranges = await self._year_entry(country_code, year)
+            result += ranges.range(start.isoformat(), end.isoformat())
+        return result
+
+    def peek_range(self, start: datetime.date, end: datetime.date, country_code='KZ'):
+        # Как get_range, но только по годам, уже лежащим в памяти; БД и API не трогаются
+        result = []
+        for year in range(start.year, end.year + 1):
+            entry = self._lookup((country_code, year))
+            if entry is not None:
+                result += entry[1].range(start.isoformat(), end.isoformat())
+        return result
+
+    async def upcoming(self, start: datetime.date, limit, country_code='KZ'):
+        _, ranges = await self._year_entry(country_code, start.year)
+        result = ranges.after(start.isoformat(), limit)
+        if len(result) < limit:
+            _, ranges = await self._year_entry(country_code, start.year + 1)
+            result += ranges.after("", limit - len(result))
+        return result
+
+    async def get(self, date: datetime.date, country_code='KZ'):
+        index = await self.get_year(country_code, date.year)
+        return list(index.get(date.isoformat(), []))
+
+    def peek(self, date: datetime.date, country_code='KZ'):
+        # Только то, что уже лежит в памяти, без обращения к БД и API; None — если года нет в кэше
+        entry = self._lookup((country_code, date.year))
+        if entry is None:
+            return None
+        return list(entry[0].get(date.isoformat(), []))
+
+    async def has_country(self, country_code, year):
+        # Страна считается известной, если для неё есть правила или API вернуло непустой год.
+        # Ошибки сети пробрасываются: по ним нельзя отличить опечатку от недоступного API.
+        if config.HOLIDAY_RULES_ENABLED and has_rules(country_code):
+            return True
+        if await self.get_year(country_code, year):
+            return True
+        self.invalidate(country_code, year)
+        return False
+
+    def invalidate(self, country_code=None, year=None):
+        for key in list(self._entries):
+            if (country_code is None or key[0] == country_code) and (year is None or key[1] == year):
+                del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def preload_capacity(self, years_per_country):
+        # Сколько стран можно прогреть, не вытесняя их же; четверть кэша остаётся под годы,
+        # которые запрашивают пользователи (другие годы, страны вне прогрева)
+        return (self.max_years - self.max_years // 4) // max(years_per_country, 1)
+
+    async def preload(self, countries, years):
+        # Прогрев календарей заранее: запрос пользователя из любой активной страны
+        # отвечается из готового индекса дата -> праздники без обращения к API.
+        # Страны идут в порядке приоритета; не поместившиеся в кэш пропускаются.
+        countries = list(countries)
+        capacity = self.preload_capacity(len(years))
+        if len(countries) > capacity:
+            skipped = countries[capacity:]
+            logger.warning(
+                f"Кэш праздников ({self.max_years} лет) вмещает прогрев только {capacity} стран, "
+                f"пропущено {len(skipped)}: {', '.join(skipped)}"
+            )
+            countries = countries[:capacity]
+        loaded = 0
+        for country_code in countries:
+            for year in years:
+                try:
+                    await self.get_year(country_code, year)
+                    loaded += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    logger.warning(f"Не удалось предзагрузить праздники {country_code} за {year} год: {e}")
+        return loaded
+
+    def memory_by_country(self):
+        # Примерный объём индексов в памяти по странам, в байтах
+        report = {}
+        for (country_code, year), (_, index, ranges) in self._entries.items():
+            entry = report.setdefault(country_code, {"years": 0, "holidays": 0, "bytes": 0})
+            entry["years"] += 1
+            entry["holidays"] += sum(len(holidays) for holidays in index.values())
+            entry["bytes"] += _deep_sizeof(index) + _deep_sizeof(ranges.keys())
+        return report
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_years": self.max_years,
+            "shared": self._flights.shared,
+        }
+
+
+async def _fetch_year(country_code, year):
+    stored = await rq.get_holiday_year(country_code, year)
+    if config.HOLIDAY_RULES_ENABLED and has_rules(country_code):
+        # Для стран с правилами API на горячем пути не нужен: берём сверенные данные, если
+        # они уже сохранены, иначе календарь, вычисленный локально
+        return stored[1] if stored is not None else compute_year(country_code, year)
+    if stored is not None and time.time() - stored[0] <= STORE_TTL:
+        return stored[1]
+
+    try:
+        holidays = await calendarific.fetch_holidays(country_code, year)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        if stored is None:
+            raise
+        logger.warning(f"API недоступно, используем устаревшие данные {country_code} за {year} год: {e}")
+        return stored[1]
+
+    if holidays:
+        # Пустой ответ (например, на неизвестный код страны) в holiday_years не сохраняется
+        await rq.save_holiday_year(country_code, year, holidays)
+    return holidays
+
+
+holiday_cache = HolidayCache(_fetch_year)
+
+
+async def reconcile_year(country_code, year):
+    # Сверка вычисленного календаря с Calendarific: данные API сохраняются и
+    # с этого момента заменяют правила (например, уточняют дату Курбан айта)
+    try:
+        holidays = await calendarific.fetch_holidays(country_code, year)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.warning(f"Сверка праздников {country_code} за {year} год не удалась: {e}")
+        return False
+    remote_dates = set(build_date_index(holidays))
+    computed = compute_year(country_code, year)
+    computed_dates = {holiday_iso_date(holiday) for holiday in computed}
+    # Пустой или урезанный ответ не должен затирать корректный вычисленный календарь
+    if len(remote_dates) < len(computed_dates) * RECONCILE_MIN_SHARE:
+        logger.warning(
+            f"Сверка {country_code} за {year} год пропущена: API вернуло {len(remote_dates)} дат "
+            f"праздников против {len(computed_dates)} по правилам"
+        )
+        return False
+    missing = [holiday for holiday in computed if holiday_iso_date(holiday) not in remote_dates]
+    for holiday in missing:
+        logger.warning(f"Правило '{holiday['name']}' ({holiday_iso_date(holiday)}) для {country_code} не подтверждено API")
+    await rq.save_holiday_year(country_code, year, holidays)
+    holiday_cache.invalidate(country_code, year)
+    logger.info(f"Календарь {country_code} за {year} год сверен с API, расхождений: {len(missing)}")
+    return True
+
+
+async def rules_reconciler(interval=None, now=datetime.date.today, sleep=asyncio.sleep):
+    interval = interval or config.RECONCILE_INTERVAL
+    while True:
+        try:
+            countries = [country for country in await rq.get_active_countries() or [config.DEFAULT_COUNTRY] if has_rules(country)]
+            year = now().year
+            for country_code in countries:
+                for target_year in (year, year + 1):
+                    await reconcile_year(country_code, target_year)
+        except Exception:
+            logger.exception("Ошибка во время сверки праздников с API")
+        await sleep(interval)
+
+
+async def calendar_preloader(interval=None, now=datetime.date.today, sleep=asyncio.sleep):
+    # Раз в interval секунд прогревает текущий и следующий год для всех стран пользователей
+    interval = interval or config.PRELOAD_INTERVAL
+    while True:
+        try:
+            countries = await rq.get_active_countries() or [config.DEFAULT_COUNTRY]
+            year = now().year
+            loaded = await holiday_cache.preload(countries, (year, year + 1))
+            for country_code, usage in holiday_cache.memory_by_country().items():
+                logger.info(
+                    f"Календарь {country_code}: лет {usage['years']}, праздников {usage['holidays']}, "
+                    f"около {usage['bytes'] // 1024} КБ"
+                )
+            logger.info(f"Предзагружено календарей: {loaded} для {len(countries)} стран")
+        except Exception:
+            logger.exception("Ошибка во время предзагрузки календарей")
+        await sleep(interval)
@@ -0,0 +1,154 @@
+import datetime
+import functools
+import math
+
+# Правила праздников по странам. Формат результата совпадает с Calendarific,
+# поэтому вычисленный календарь подставляется в holiday_cache без изменений.
+# Виды правил:
+#   ("fixed", месяц, день, название)
+#   ("easter", смещение в днях, "western" | "orthodox", название)
+#   ("hijri", месяц, день, название) — официально объявленные даты из OBSERVED_DATES,
+#     вне таблицы — табличный исламский календарь; он может ошибаться на день,
+#     такую дату уточняет сверка с API
+RULES = {
+    "KZ": [
+        ("fixed", 1, 1, "New Year's Day"),
+        ("fixed", 1, 2, "New Year Holiday"),
+        ("fixed", 1, 7, "Orthodox Christmas Day"),
+        ("fixed", 3, 8, "International Women's Day"),
+        ("fixed", 3, 21, "Nauryz"),
+        ("fixed", 3, 22, "Nauryz Holiday"),
+        ("fixed", 3, 23, "Nauryz Holiday"),
+        ("fixed", 5, 1, "Kazakhstan People's Unity Day"),
+        ("fixed", 5, 7, "Defender of the Fatherland Day"),
+        ("fixed", 5, 9, "Victory Day"),
+        ("fixed", 7, 6, "Capital City Day"),
+        ("fixed", 8, 30, "Constitution Day"),
+        ("fixed", 10, 25, "Republic Day"),
+        ("fixed", 12, 16, "Independence Day"),
+        ("hijri", 12, 10, "Kurban Ait"),
+    ],
+    "RU": [
+        ("fixed", 1, 1, "New Year's Day"),
+        ("fixed", 1, 7, "Orthodox Christmas Day"),
+        ("fixed", 2, 23, "Defender of the Fatherland Day"),
+        ("fixed", 3, 8, "International Women's Day"),
+        ("fixed", 5, 1, "Spring and Labor Day"),
+        ("fixed", 5, 9, "Victory Day"),
+        ("fixed", 6, 12, "Russia Day"),
+        ("fixed", 11, 4, "Unity Day"),
+        ("easter", 0, "orthodox", "Orthodox Easter Day"),
+    ],
+    "DE": [
+        ("fixed", 1, 1, "New Year's Day"),
+        ("easter", -2, "western", "Good Friday"),
+        ("easter", 0, "western", "Easter Sunday"),
+        ("easter", 1, "western", "Easter Monday"),
+        ("fixed", 5, 1, "Labor Day"),
+        ("easter", 39, "western", "Ascension Day"),
+        ("easter", 50, "western", "Whit Monday"),
+        ("fixed", 10, 3, "Day of German Unity"),
+        ("fixed", 12, 25, "Christmas Day"),
+        ("fixed", 12, 26, "Second Day of Christmas"),
+    ],
+}
+
+# Даты, объявленные в стране официально; наблюдаемое начало месяца часто на день раньше табличного
+OBSERVED_DATES = {
+    ("KZ", "Kurban Ait"): {
+        2015: datetime.date(2015, 9, 24),
+        2016: datetime.date(2016, 9, 12),
+        2017: datetime.date(2017, 9, 1),
+        2018: datetime.date(2018, 8, 21),
+        2019: datetime.date(2019, 8, 11),
+        2020: datetime.date(2020, 7, 31),
+        2021: datetime.date(2021, 7, 20),
+        2022: datetime.date(2022, 7, 9),
+        2023: datetime.date(2023, 6, 28),
+        2024: datetime.date(2024, 6, 16),
+        2025: datetime.date(2025, 6, 6),
+        2026: datetime.date(2026, 5, 27),
+    },
+}
+
+# 1 мухаррама 1 года хиджры (16.07.622 по юлианскому календарю) в пролептическом григорианском
+HIJRI_EPOCH = datetime.date(622, 7, 19).toordinal()
+
+
+def western_easter(year) -> datetime.date:
+    # Алгоритм Мееуса/Джонса/Бутчера для григорианской Пасхи
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def orthodox_easter(year) -> datetime.date:
+    # Юлианская Пасха (алгоритм Мееуса), переведённая в григорианский календарь
+    a, b, c = year % 4, year % 7, year % 19
+    d = (19 * c + 15) % 30
+    e = (2 * a + 4 * b - d + 34) % 7
+    month, day = divmod(d + e + 114, 31)
+    julian = datetime.date(year, month, day + 1)
+    return julian + datetime.timedelta(days=year // 100 - year // 400 - 2)
+
+
+def hijri_to_gregorian(year, month, day) -> datetime.date:
+    # Табличный (арифметический) исламский календарь с циклом 30 лет
+    days = day + math.ceil(29.5 * (month - 1)) + (year - 1) * 354 + (3 + 11 * year) // 30 - 1
+    return datetime.date.fromordinal(HIJRI_EPOCH + days)
+
+
+def hijri_dates_in_year(year, month, day):
+    # Исламский год короче григорианского, поэтому дата может выпасть в году дважды или ни разу
+    approx = int((year - 622) * 33 / 32)
+    for hijri_year in range(approx - 1, approx + 3):
+        date = hijri_to_gregorian(hijri_year, month, day)
+        if date.year == year:
+            yield date
+
+
+def observed_hijri_dates(country_code, name, year, month, day):
+    observed = OBSERVED_DATES.get((country_code, name), {})
+    if year in observed:
+        return [observed[year]]
+    return list(hijri_dates_in_year(year, month, day))
+
+
+def has_rules(country_code) -> bool:
+    return country_code in RULES
+
+
+def _holiday(name, date):
+    return {"name": name, "date": {"iso": date.isoformat()}, "source": "rules"}
+
+
+@functools.lru_cache(maxsize=256)
+def _compute_year(country_code, year):
+    holidays = []
+    for rule in RULES.get(country_code, ()):
+        kind = rule[0]
+        if kind == "fixed":
+            _, month, day, name = rule
+            holidays.append(_holiday(name, datetime.date(year, month, day)))
+        elif kind == "easter":
+            _, offset, church, name = rule
+            easter = western_easter(year) if church == "western" else orthodox_easter(year)
+            holidays.append(_holiday(name, easter + datetime.timedelta(days=offset)))
+        elif kind == "hijri":
+            _, month, day, name = rule
+            holidays.extend(_holiday(name, date) for date in observed_hijri_dates(country_code, name, year, month, day))
+    holidays.sort(key=lambda holiday: holiday["date"]["iso"])
+    return tuple(holidays)
+
+
+def compute_year(country_code, year):
+    # Календарь года по правилам; результат кэшируется, отдаётся копия списка
+    return list(_compute_year(country_code, year))
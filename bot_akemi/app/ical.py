@@ -0,0 +1,170 @@
+import io
+import csv
+import datetime
+import itertools
+
+MAX_IMPORT_ROWS = 10_000
+MAX_IMPORT_BYTES = 5 * 1024 * 1024
+MAX_NAME_LENGTH = 200
+CSV_DATE_FORMATS = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y")
+
+
+def unfold_lines(lines):
+    # RFC 5545: длинные строки переносятся, продолжение начинается с пробела или табуляции
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _unescape(value):
+    return (value.replace("\\n", " ").replace("\\N", " ")
+            .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _parse_ics_date(value):
+    # DTSTART;VALUE=DATE:20250101 или DTSTART:20250101T090000Z — берём только дату
+    return datetime.datetime.strptime(value[:8], "%Y%m%d").date()
+
+
+def parse_ics(lines):
+    name = date = None
+    in_event = False
+    for line in unfold_lines(lines):
+        key, _, value = line.partition(":")
+        prop = key.split(";", 1)[0].upper()
+        if prop == "BEGIN" and value.upper() == "VEVENT":
+            in_event, name, date = True, None, None
+        elif prop == "END" and value.upper() == "VEVENT":
+            if in_event and name and date:
+                yield name, date
+            in_event = False
+        elif in_event and prop == "SUMMARY":
+            name = _unescape(value).strip()[:MAX_NAME_LENGTH]
+        elif in_event and prop == "DTSTART":
+            try:
+                date = _parse_ics_date(value)
+            except ValueError:
+                date = None
+
+
+def _parse_csv_date(value):
+    for fmt in CSV_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_csv(lines):
+    # Строки вида "название,дата" или "дата,название"; заголовок и мусор пропускаются
+    sample = ""
+    lines = iter(lines)
+    head = list(itertools.islice(lines, 1))
+    if head:
+        sample = head[0]
+    delimiter = ";" if sample.count(";") > sample.count(",") else ","
+    for row in csv.reader(itertools.chain(head, lines), delimiter=delimiter):
+        if len(row) < 2:
+            continue
+        first, second = row[0].strip(), row[1].strip()
+        date = _parse_csv_date(second)
+        name = first
+        if date is None:
+            date, name = _parse_csv_date(first), second
+        if date is not None and name:
+            yield name[:MAX_NAME_LENGTH], date
+
+
+class CalendarParseError(ValueError):
+    """Файл календаря не удалось разобрать."""
+
+
+class ParsedCalendar:
+    """Ленивый поток (название, дата) из файла не длиннее limit записей.
+
+    Разбор идёт во время итерации (в потоке-писателе БД), поэтому ошибки
+    формата приходят оттуда же и приводятся к CalendarParseError.
+    truncated становится True, если в файле были записи сверх лимита.
+    """
+
+    def __init__(self, rows, limit=MAX_IMPORT_ROWS):
+        self._rows = rows
+        self.limit = limit
+        self.truncated = False
+
+    def __iter__(self):
+        count = 0
+        try:
+            for row in self._rows:
+                if count == self.limit:
+                    self.truncated = True
+                    return
+                count += 1
+                yield row
+        except (csv.Error, UnicodeDecodeError, ValueError) as e:
+            raise CalendarParseError(str(e)) from e
+
+
+def parse_calendar(stream, filename="", limit=MAX_IMPORT_ROWS):
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    lines = iter(text)
+    first = list(itertools.islice(lines, 1))
+    is_ics = filename.lower().endswith(".ics") or (first and first[0].strip().upper() == "BEGIN:VCALENDAR")
+    parser = parse_ics if is_ics else parse_csv
+    return ParsedCalendar(parser(itertools.chain(first, lines)), limit)
+
+
+def _fold(line):
+    # Строки длиннее 75 байт переносятся, не разрывая символы UTF-8
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, current, size, limit = [], "", 0, 75
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > limit:
+            parts.append(current)
+            current, size, limit = "", 0, 74
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+ICS_HEADER = "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Akemi Holidays Bot//RU\r\nCALSCALE:GREGORIAN\r\n"
+ICS_FOOTER = "END:VCALENDAR\r\n"
+
+
+def iter_events(rows, stamp=None):
+    # rows: (id, название, дата в формате ГГГГ-ММ-ДД); праздники повторяются ежегодно
+    stamp = (stamp or datetime.datetime.now(datetime.timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    for holiday_id, name, holiday_date in rows:
+        day = str(holiday_date).replace("-", "")
+        yield (
+            "BEGIN:VEVENT\r\n"
+            f"UID:holiday-{holiday_id}@akemi-bot\r\n"
+            f"DTSTAMP:{stamp}\r\n"
+            f"DTSTART;VALUE=DATE:{day}\r\n"
+            "RRULE:FREQ=YEARLY\r\n"
+            + _fold(f"SUMMARY:{_escape(name)}")
+            + "END:VEVENT\r\n"
+        )
+
+
+def iter_ics(rows, stamp=None):
+    yield ICS_HEADER
+    yield from iter_events(rows, stamp)
+    yield ICS_FOOTER
@@ -1,61 +1,143 @@
 import logging
-import os
-import io
+import calendar
+import functools
+from typing import Optional
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.filters.callback_data import CallbackData
 
-log_dir = 'logs'
-os.makedirs(log_dir, exist_ok=True)
-log_file_path = os.path.join(log_dir, 'keyboards.log')
+logger = logging.getLogger(__name__)
 
-report_dir = 'reports'
-os.makedirs(report_dir, exist_ok=True)
-html_report_path = os.path.join(report_dir, 'report.html')
 
-class HTMLHandler(logging.Handler):
-    def __init__(self, filename):
-        super().__init__()
-        self.filename = filename
+class CalendarPage(CallbackData, prefix="cal"):
+    # Курсор страницы: направление ("next"/"prev") и граница (дата, id) текущей страницы
+    direction: str
+    date: str
+    id: int
 
-    def emit(self, record):
-        try:
-            log_entry = self.format(record)
-            with io.open(self.filename, 'a', encoding='utf-8') as f:
-                f.write(log_entry + "<br>\n")
-        except Exception:
-            self.handleError(record)
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-
-file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
-file_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
-logger.addHandler(file_handler)
-
-html_handler = HTMLHandler(html_report_path)
-html_handler.setFormatter(logging.Formatter('<b>%(asctime)s</b> [%(levelname)s] %(message)s'))
-logger.addHandler(html_handler)
-
-logger.info("Создание главной клавиатуры")
-main = ReplyKeyboardMarkup(
-    keyboard=[
-        [KeyboardButton(text="Какой сегодня праздник?")],
-        [KeyboardButton(text="Посмотреть личный календарь")]
-    ],
-    resize_keyboard=True
-)
-
-logger.info("Создание клавиатуры выбора даты")
-choose_date = InlineKeyboardMarkup(
-    inline_keyboard=[
-        [InlineKeyboardButton(text="📅 Выбрать другую дату", callback_data="choose_another_date")]
-    ]
-)
+class DeleteHoliday(CallbackData, prefix="del"):
+    # id строки и необязательный токен страницы — первая строка (дата, id), с которой её перерисовать.
+    # На первой странице токена нет: пустые поля aiogram распаковывает как None
+    id: int
+    page_date: Optional[str] = None
+    page_id: Optional[int] = None
+
+
+class DatePick(CallbackData, prefix="dp"):
+    # action: "nav" — листание месяцев, "day" — выбор дня, "noop" — заголовки и пустые клетки;
+    # purpose: "public" — праздники на дату, "personal" — дата нового личного праздника
+    action: str
+    purpose: str
+    year: int
+    month: int
+    day: int = 0
+
+
+MONTH_NAMES = [
+    "", "Январь", "Февраль", "Март", "Апрель", "Май", "Июнь",
+    "Июль", "Август", "Сентябрь", "Октябрь", "Ноябрь", "Декабрь",
+]
+WEEKDAY_NAMES = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+# Листание календаря ограничено этими годами; callback_data за их пределами отклоняются
+PICKER_MIN_YEAR = 1900
+PICKER_MAX_YEAR = 2100
+
+
+@functools.lru_cache(maxsize=64)
+def _month_layout(year, month):
+    # Сетка месяца по неделям (0 — клетка вне месяца); не зависит от пользователя
+    return tuple(tuple(week) for week in calendar.monthcalendar(year, month))
+
+
+def _shift_month(year, month, delta):
+    index = year * 12 + month - 1 + delta
+    return index // 12, index % 12 + 1
+
+
+def picker_month_valid(year, month) -> bool:
+    return PICKER_MIN_YEAR <= year <= PICKER_MAX_YEAR and 1 <= month <= 12
 
-logger.info("Создание клавиатуры для личного календаря")
-personal_calendar_kb = InlineKeyboardMarkup(
-    inline_keyboard=[
-        [InlineKeyboardButton(text="➕ Добавить праздник", callback_data="add_personal_holiday")]
+
+def _nav_button(text, purpose, year, month, noop):
+    # На краю окна лет кнопка листания превращается в пустую клетку
+    if not picker_month_valid(year, month):
+        return InlineKeyboardButton(text=" ", callback_data=noop)
+    callback_data = DatePick(action="nav", purpose=purpose, year=year, month=month).pack()
+    return InlineKeyboardButton(text=text, callback_data=callback_data)
+
+
+@functools.lru_cache(maxsize=512)
+def date_picker(purpose, year, month, marked=frozenset()):
+    # Готовая клавиатура месяца; marked — дни с праздниками, помечаются точкой.
+    # Одинаковые (purpose, месяц, отметки) отдаются из кэша без пересборки
+    noop = DatePick(action="noop", purpose=purpose, year=year, month=month).pack()
+    prev_year, prev_month = _shift_month(year, month, -1)
+    next_year, next_month = _shift_month(year, month, 1)
+    rows = [
+        [
+            _nav_button("«", purpose, prev_year, prev_month, noop),
+            InlineKeyboardButton(text=f"{MONTH_NAMES[month]} {year}", callback_data=noop),
+            _nav_button("»", purpose, next_year, next_month, noop),
+        ],
+        [InlineKeyboardButton(text=name, callback_data=noop) for name in WEEKDAY_NAMES],
     ]
-)
+    for week in _month_layout(year, month):
+        rows.append([
+            InlineKeyboardButton(
+                text=(f"{day}•" if day in marked else str(day)) if day else " ",
+                callback_data=DatePick(action="day", purpose=purpose, year=year, month=month, day=day).pack()
+                if day else noop,
+            )
+            for day in week
+        ])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def _build_main():
+    logger.info("Создание главной клавиатуры")
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text="Какой сегодня праздник?")],
+            [KeyboardButton(text="Посмотреть личный календарь")]
+        ],
+        resize_keyboard=True
+    )
+
+
+def _build_choose_date():
+    logger.info("Создание клавиатуры выбора даты")
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="📅 Выбрать другую дату", callback_data="choose_another_date")],
+            [
+                InlineKeyboardButton(text="📆 Неделя", callback_data="range_week"),
+                InlineKeyboardButton(text="🗓 Месяц", callback_data="range_month"),
+                InlineKeyboardButton(text="⏭ Ближайшие", callback_data="range_upcoming"),
+            ],
+        ]
+    )
+
+
+def _build_personal_calendar_kb():
+    logger.info("Создание клавиатуры для личного календаря")
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="➕ Добавить праздник", callback_data="add_personal_holiday")]
+        ]
+    )
+
+
+_BUILDERS = {
+    "main": _build_main,
+    "choose_date": _build_choose_date,
+    "personal_calendar_kb": _build_personal_calendar_kb,
+}
+
 
-logger.info("Все клавиатуры успешно созданы")
+# Клавиатуры создаются при первом обращении (kb.main и т.д.) и дальше берутся из модуля
+def __getattr__(name):
+    builder = _BUILDERS.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    keyboard = globals()[name] = builder()
+    return keyboard
@@ -0,0 +1,176 @@
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+import traceback
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_DIR = 'logs'
+REPORT_DIR = 'reports'
+MAIN_LOG_FILE = 'main.log'
+HTML_REPORT_FILE = 'report.html'
+
+# Модули, которые дополнительно пишут в собственный лог-файл
+MODULE_LOG_FILES = {
+    'app.database': 'database.log',
+    'app.requests': 'requests.log',
+    'app.async_requests': 'requests.log',
+    'app.handlers': 'handlers.log',
+    'app.keyboards': 'keyboards.log',
+}
+
+MAIN_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+MODULE_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+HTML_FORMAT = '<b>%(asctime)s</b> [%(levelname)s] <i>%(name)s</i>: %(message)s'
+
+FLUSH_CAPACITY = 200
+FLUSH_INTERVAL = 1.0
+
+_queue = None
+_listener = None
+
+
+class BufferedFileHandler(logging.Handler):
+    """Копит отформатированные записи и пишет их в файл пачкой — по размеру буфера или по времени."""
+
+    def __init__(self, filename, terminator="\n", capacity=FLUSH_CAPACITY, flush_interval=FLUSH_INTERVAL):
+        super().__init__()
+        self.filename = filename
+        self.terminator = terminator
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._stream = None
+        self._last_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= self.capacity or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer:
+                if self._stream is None:
+                    self._stream = open(self.filename, 'a', encoding='utf-8')
+                self._stream.write(''.join(self._buffer))
+                self._stream.flush()
+                self._buffer.clear()
+            self._last_flush = time.monotonic()
+        except Exception:
+            self._buffer.clear()
+            if logging.raiseExceptions:
+                traceback.print_exc()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        self.acquire()
+        try:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+        finally:
+            self.release()
+        super().close()
+
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BatchingQueueListener(QueueListener):
+    """Фоновый поток логирования: если очередь простаивает, сбрасывает буферы по таймеру."""
+
+    def __init__(self, log_queue, *handlers, flush_interval=FLUSH_INTERVAL):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block=block, timeout=self.flush_interval)
+            except queue.Empty:
+                self.flush()
+
+    def handle(self, record):
+        if isinstance(record, _FlushRequest):
+            self.flush()
+            record.done.set()
+            return
+        super().handle(record)
+
+    def flush(self):
+        for handler in self.handlers:
+            handler.flush()
+
+
+def _module_handler(path, logger_name):
+    handler = BufferedFileHandler(path)
+    handler.setFormatter(logging.Formatter(MODULE_FORMAT))
+    handler.addFilter(logging.Filter(logger_name))
+    return handler
+
+
+def setup_logging(level=logging.INFO, log_dir=LOG_DIR, report_dir=REPORT_DIR, console=True):
+    global _queue, _listener
+    if _listener is not None:
+        return _listener
+
+    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(report_dir, exist_ok=True)
+
+    main_handler = BufferedFileHandler(os.path.join(log_dir, MAIN_LOG_FILE))
+    main_handler.setFormatter(logging.Formatter(MAIN_FORMAT))
+
+    html_handler = BufferedFileHandler(os.path.join(report_dir, HTML_REPORT_FILE), terminator="<br>\n")
+    html_handler.setFormatter(logging.Formatter(HTML_FORMAT))
+
+    handlers = [main_handler, html_handler]
+    handlers += [_module_handler(os.path.join(log_dir, filename), name) for name, filename in MODULE_LOG_FILES.items()]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(MAIN_FORMAT))
+        handlers.append(console_handler)
+
+    _queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(_queue)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    _listener = BatchingQueueListener(_queue, *handlers)
+    _listener.queue_handler = queue_handler
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def flush_logging(timeout=5.0):
+    # Запрос на сброс встаёт в конец очереди, поэтому все более ранние записи уже будут на диске
+    if _listener is None:
+        return
+    request = _FlushRequest()
+    _queue.put(request)
+    request.done.wait(timeout)
+
+
+def shutdown_logging():
+    global _queue, _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    logging.getLogger().removeHandler(listener.queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    _queue = None
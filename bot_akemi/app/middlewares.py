@@ -0,0 +1,86 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+import app.config as config
+from app.ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimitMiddleware(BaseMiddleware):
+    """Ограничивает число апдейтов, которые обрабатываются одновременно."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, handler, event, data):
+        async with self._semaphore:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            try:
+                return await handler(event, data)
+            finally:
+                self.in_flight -= 1
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Лимит на пользователя для хендлеров с флагом throttling.
+
+    Сверх token bucket, а также при повторном нажатии, пока предыдущий запрос
+    того же пользователя ещё обрабатывается, хендлер получает throttled=True
+    и должен ответить дёшево: из кэша или THROTTLED_TEXT, не обращаясь к сети.
+    """
+
+    def __init__(self, rate=None, burst=None, max_users=10_000, clock=time.monotonic):
+        self.rate = rate or config.THROTTLE_RATE
+        self.burst = burst or config.THROTTLE_BURST
+        self.max_users = max_users
+        self._clock = clock
+        self._buckets = OrderedDict()
+        self._in_flight = set()
+        self.throttled = 0
+        self.coalesced = 0
+
+    def _bucket(self, user_id):
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.rate, self.burst, clock=self._clock)
+            while len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user_id)
+        return bucket
+
+    async def __call__(self, handler, event, data):
+        key = get_flag(data, "throttling")
+        user = data.get("event_from_user")
+        if key is None or user is None:
+            return await handler(event, data)
+
+        slot = (user.id, key)
+        if slot in self._in_flight:
+            # Повтор не тратит токен и не ждёт: ответ только из кэша
+            self.coalesced += 1
+            logger.info(f"Повторный запрос {key} от пользователя {user.id} обслужен из кэша: предыдущий ещё выполняется")
+            data["throttled"] = True
+            return await handler(event, data)
+
+        throttled = not self._bucket(user.id).try_acquire()
+        if throttled:
+            self.throttled += 1
+            logger.warning(f"Пользователь {user.id} превысил лимит запросов {key}")
+        data["throttled"] = throttled
+        self._in_flight.add(slot)
+        try:
+            return await handler(event, data)
+        finally:
+            self._in_flight.discard(slot)
+
+    def stats(self):
+        return {"users": len(self._buckets), "throttled": self.throttled, "coalesced": self.coalesced}
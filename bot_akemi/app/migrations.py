@@ -0,0 +1,107 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Версия схемы хранится в PRAGMA user_version: миграция с номером N
+# (позиция в списке, начиная с 1) применяется, если user_version < N.
+# Новые миграции добавляются только в конец списка.
+MIGRATIONS = [
+    # 1: индексы для выборок и удалений личных праздников
+    [
+        "CREATE INDEX IF NOT EXISTS idx_personal_holidays_user_name ON personal_holidays (user_id, holiday_name)",
+        "CREATE INDEX IF NOT EXISTS idx_personal_holidays_user_date ON personal_holidays (user_id, holiday_date)",
+        "CREATE INDEX IF NOT EXISTS idx_personal_holidays_date ON personal_holidays (holiday_date)",
+    ],
+    # 2: хранилище состояний FSM, общее для всех процессов бота
+    [
+        """
+        CREATE TABLE IF NOT EXISTS fsm_states (
+            storage_key TEXT PRIMARY KEY,
+            state TEXT,
+            data TEXT,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_fsm_states_expires ON fsm_states (expires_at)",
+    ],
+    # 3: курсор ежедневной рассылки, чтобы после сбоя продолжить, а не начать заново
+    [
+        """
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            broadcast_date TEXT NOT NULL,
+            country_code TEXT NOT NULL,
+            last_user_id INTEGER NOT NULL DEFAULT 0,
+            sent INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            finished INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (broadcast_date, country_code)
+        )
+        """,
+    ],
+    # 4: индекс по "ММ-ДД" даты личного праздника для ежегодных напоминаний
+    [
+        "CREATE INDEX IF NOT EXISTS idx_personal_holidays_month_day "
+        "ON personal_holidays (substr(holiday_date, 6, 5), user_id)",
+    ],
+    # 5: страна и язык пользователя. Значения для новых пользователей задаёт add_user из config;
+    # рассылка обходит пользователей страны по user_id, язык берётся из того же индекса
+    [
+        "ALTER TABLE users ADD COLUMN country_code TEXT NOT NULL DEFAULT 'KZ'",
+        "ALTER TABLE users ADD COLUMN language TEXT NOT NULL DEFAULT 'ru'",
+        "CREATE INDEX IF NOT EXISTS idx_users_country_user ON users (country_code, user_id, language)",
+    ],
+    # 6: курсор напоминаний на каждую дату и срок, чтобы не слать повторно и догнать пропущенное
+    [
+        """
+        CREATE TABLE IF NOT EXISTS reminders (
+            reminder_date TEXT NOT NULL,
+            lead_days INTEGER NOT NULL,
+            last_user_id INTEGER NOT NULL DEFAULT 0,
+            sent INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            finished INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (reminder_date, lead_days)
+        )
+        """,
+    ],
+]
+
+# Настройки соединения, которые не сохраняются в файле базы
+CONNECTION_PRAGMAS = [
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+]
+
+
+def configure_connection(conn):
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+def enable_wal(conn):
+    mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+    if mode.lower() != "wal":
+        logger.warning(f"Не удалось включить WAL, режим журнала: {mode}")
+    return mode
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    version = schema_version(conn)
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception(f"Ошибка при применении миграции {number}")
+            raise
+        logger.info(f"Применена миграция схемы {number}")
+    return schema_version(conn)
@@ -0,0 +1,201 @@
+import time
+import calendar
+import datetime
+import logging
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+import app.async_requests as rq
+
+logger = logging.getLogger(__name__)
+
+# Как часто кэш личных праздников сверяется с БД: правки из других процессов видны не позже этого срока
+PERSONAL_RECHECK_INTERVAL = 5
+
+
+class RangeIndex:
+    """Отсортированный массив (ключ, значение): диапазон ищется через bisect за O(log n + k)."""
+
+    def __init__(self, items=()):
+        pairs = sorted(items, key=lambda item: item[0])
+        self._keys = [key for key, _ in pairs]
+        self._values = [value for _, value in pairs]
+
+    def add(self, key, value):
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._values.insert(position, value)
+
+    def remove(self, key, value) -> bool:
+        for position in range(bisect_left(self._keys, key), bisect_right(self._keys, key)):
+            if self._values[position] == value:
+                del self._keys[position]
+                del self._values[position]
+                return True
+        return False
+
+    def range(self, start, end):
+        # Все пары с start <= ключ <= end в порядке возрастания ключа
+        lo, hi = bisect_left(self._keys, start), bisect_right(self._keys, end)
+        return list(zip(self._keys[lo:hi], self._values[lo:hi]))
+
+    def after(self, start, limit):
+        # Первые limit пар с ключом >= start
+        lo = bisect_left(self._keys, start)
+        return list(zip(self._keys[lo:lo + limit], self._values[lo:lo + limit]))
+
+    def keys(self):
+        return self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def _month_day(date: datetime.date) -> str:
+    return date.strftime("%m-%d")
+
+
+def _on_year(month_day, year):
+    # Личный праздник 29 февраля в невисокосный год отмечается 28-го, как и в напоминаниях
+    month, day = int(month_day[:2]), int(month_day[3:])
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return datetime.date(year, month, day - 1)
+
+
+class PersonalVersions:
+    """Версии личных праздников пользователей, под которые построены кэши процесса.
+
+    Версия — (число строк, сумма id) из БД. Она сверяется не чаще раза в interval
+    секунд, поэтому добавление, удаление и импорт в другом воркере или инстансе
+    сбрасывают устаревший кэш, не добавляя запроса на каждое обращение.
+    """
+
+    def __init__(self, interval=PERSONAL_RECHECK_INTERVAL, clock=time.monotonic):
+        self.interval = interval
+        self._clock = clock
+        self._seen = {}
+
+    async def load(self, user_id):
+        # Вызывается перед чтением строк: запись между двумя запросами лишь вызовет ещё одну перезагрузку
+        self._seen[user_id] = (await rq.get_personal_holidays_version(user_id), self._clock())
+
+    async def changed(self, user_id) -> bool:
+        version, checked_at = self._seen.get(user_id, (None, None))
+        if version is not None and self._clock() - checked_at < self.interval:
+            return False
+        current = await rq.get_personal_holidays_version(user_id)
+        self._seen[user_id] = (current, self._clock())
+        return current != version
+
+    def added(self, user_id, holiday_id):
+        version, checked_at = self._seen.get(user_id, (None, None))
+        if version is not None:
+            self._seen[user_id] = ((version[0] + 1, version[1] + holiday_id), checked_at)
+
+    def removed(self, user_id, holiday_id):
+        version, checked_at = self._seen.get(user_id, (None, None))
+        if version is not None:
+            self._seen[user_id] = ((version[0] - 1, version[1] - holiday_id), checked_at)
+
+    def forget(self, user_id):
+        self._seen.pop(user_id, None)
+
+
+class PersonalRanges:
+    """Личные праздники пользователей, проиндексированные по "ММ-ДД".
+
+    Праздники повторяются ежегодно, поэтому ключом служит месяц и день.
+    Индекс пользователя загружается из БД один раз и дальше обновляется
+    на месте при добавлении и удалении; изменения из других процессов
+    замечаются по версии в БД.
+    """
+
+    def __init__(self, max_users=10_000, versions=None):
+        self.max_users = max_users
+        self._indexes = OrderedDict()
+        self._versions = versions or PersonalVersions()
+
+    async def _index(self, user_id):
+        entry = self._indexes.get(user_id)
+        if entry is not None and await self._versions.changed(user_id):
+            logger.info(f"Личные праздники пользователя {user_id} изменены другим процессом, индекс перечитывается")
+            del self._indexes[user_id]
+            entry = None
+        if entry is None:
+            await self._versions.load(user_id)
+            keys, items = {}, []
+            async for rows in rq.iter_personal_holidays(user_id):
+                for row in rows:
+                    keys[row[0]] = row[2][5:10]
+                    items.append((keys[row[0]], tuple(row)))
+            index = RangeIndex(items)
+            entry = self._indexes[user_id] = (index, keys)
+            while len(self._indexes) > self.max_users:
+                self._versions.forget(self._indexes.popitem(last=False)[0])
+        else:
+            self._indexes.move_to_end(user_id)
+        return entry[0]
+
+    def add(self, user_id, row):
+        # row — (id, название, дата "ГГГГ-ММ-ДД"); если индекс ещё не загружен, он прочитается целиком позже
+        entry = self._indexes.get(user_id)
+        if entry is not None:
+            index, keys = entry
+            keys[row[0]] = row[2][5:10]
+            index.add(keys[row[0]], tuple(row))
+            self._versions.added(user_id, row[0])
+
+    def remove(self, user_id, holiday_id):
+        entry = self._indexes.get(user_id)
+        if entry is None:
+            return
+        index, keys = entry
+        month_day = keys.pop(holiday_id, None)
+        if month_day is None:
+            return
+        self._versions.removed(user_id, holiday_id)
+        for _, row in index.range(month_day, month_day):
+            if row[0] == holiday_id:
+                index.remove(month_day, row)
+                return
+
+    def forget(self, user_id):
+        self._indexes.pop(user_id, None)
+        self._versions.forget(user_id)
+
+    async def between(self, user_id, start: datetime.date, end: datetime.date):
+        # Возвращает [(дата в диапазоне, строка)]; диапазон через Новый год делится на части по годам
+        index = await self._index(user_id)
+        result = []
+        year = start.year
+        while year <= end.year:
+            segment_start = start if year == start.year else datetime.date(year, 1, 1)
+            segment_end = end if year == end.year else datetime.date(year, 12, 31)
+            end_key = _month_day(segment_end)
+            if end_key == "02-28" and not calendar.isleap(year):
+                # 29 февраля в этом году попадает на 28-е, поэтому ключ "02-29" тоже входит в диапазон
+                end_key = "02-29"
+            for month_day, row in index.range(_month_day(segment_start), end_key):
+                date = _on_year(month_day, year)
+                if segment_start <= date <= segment_end:
+                    result.append((date, row))
+            year += 1
+        return result
+
+    async def upcoming(self, user_id, start: datetime.date, limit):
+        # Ближайшие limit праздников начиная со start, с переходом на следующий год
+        index = await self._index(user_id)
+        result = [(_on_year(month_day, start.year), row) for month_day, row in index.after(_month_day(start), limit)]
+        if len(result) < limit:
+            result += [
+                (_on_year(month_day, start.year + 1), row)
+                for month_day, row in index.after("", limit - len(result))
+            ]
+        return result
+
+    def stats(self):
+        return {"users": len(self._indexes), "holidays": sum(len(index) for index, _ in self._indexes.values())}
+
+
+personal_ranges = PersonalRanges()
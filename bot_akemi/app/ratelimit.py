@@ -0,0 +1,48 @@
+import time
+import asyncio
+import app.config as config
+
+
+class TokenBucket:
+    """Классический token bucket: rate токенов в секунду, не больше capacity про запас."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def delay(self, tokens=1):
+        # Сколько секунд ждать, пока накопится нужное число токенов
+        self._refill()
+        return max(0.0, (tokens - self._tokens) / self.rate)
+
+    async def acquire(self, tokens=1):
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep(self.delay(tokens))
+
+
+_api_semaphore = None
+
+
+def api_slots() -> asyncio.Semaphore:
+    # Общий на процесс лимит одновременных запросов к внешним API
+    global _api_semaphore
+    if _api_semaphore is None:
+        _api_semaphore = asyncio.Semaphore(config.OUTBOUND_API_CONCURRENCY)
+    return _api_semaphore
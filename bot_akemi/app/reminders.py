@@ -0,0 +1,118 @@
+import heapq
+import asyncio
+import logging
+import datetime
+import itertools
+from aiogram import Bot
+import app.config as config
+import app.async_requests as rq
+from app.ratelimit import TokenBucket
+from app.broadcast import send_with_retry, SEND_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+def month_days_for(date: datetime.date):
+    # Праздник 29 февраля в невисокосный год напоминается 28 февраля
+    month_days = [date.strftime("%m-%d")]
+    if date.month == 2 and date.day == 28 and (date + datetime.timedelta(days=1)).month == 3:
+        month_days.append("02-29")
+    return month_days
+
+
+def reminder_text(holidays, lead_days):
+    names = ", ".join(f"«{name}»" for name in holidays)
+    if lead_days == 0:
+        return f"🔔 Сегодня ваш праздник: {names}"
+    if lead_days == 1:
+        return f"🔔 Завтра ваш праздник: {names}"
+    return f"🔔 Через {lead_days} дн. ваш праздник: {names}"
+
+
+async def send_due_reminders(bot: Bot, target_date: datetime.date, lead_days, bucket=None, chunk_size=None):
+    key = target_date.isoformat()
+    cursor = await rq.get_reminder_cursor(key, lead_days)
+    if cursor["finished"]:
+        logger.info(f"Напоминания на {key} (за {lead_days} дн.) уже отправлены")
+        return cursor["sent"]
+
+    bucket = bucket or TokenBucket(config.BROADCAST_RATE)
+    semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+
+    async def send(user_id, names):
+        async with semaphore:
+            return await send_with_retry(bot, user_id, reminder_text(names, lead_days), bucket)
+
+    if cursor["last_user_id"]:
+        logger.info(f"Напоминания на {key} (за {lead_days} дн.) продолжаются после пользователя {cursor['last_user_id']}")
+    chunks = rq.iter_personal_holidays_by_month_day(
+        month_days_for(target_date), cursor["last_user_id"], chunk_size or config.BROADCAST_CHUNK
+    )
+    async for chunk in chunks:
+        # Одно сообщение на пользователя, даже если у него несколько праздников в этот день
+        results = await asyncio.gather(*(
+            send(user_id, [name for _, name, _ in group])
+            for user_id, group in itertools.groupby(chunk, key=lambda row: row[0])
+        ))
+        cursor["sent"] += sum(results)
+        cursor["failed"] += len(results) - sum(results)
+        cursor["last_user_id"] = chunk[-1][0]
+        await rq.save_reminder_cursor(key, lead_days, cursor["last_user_id"], cursor["sent"], cursor["failed"])
+
+    await rq.save_reminder_cursor(key, lead_days, cursor["last_user_id"], cursor["sent"], cursor["failed"], True)
+    logger.info(f"Напоминания на {key} (за {lead_days} дн.): отправлено {cursor['sent']}, ошибок {cursor['failed']}")
+    return cursor["sent"]
+
+
+class ReminderScheduler:
+    """Мин-куча моментов срабатывания: по одной записи на каждое значение lead_days.
+
+    Размер кучи не зависит от числа пользователей — каждое срабатывание
+    выбирает тех, кому пора напомнить, индексными запросами по чанкам.
+    """
+
+    def __init__(self, bot: Bot, at=None, lead_days=None, now=datetime.datetime.now, sleep=asyncio.sleep):
+        self.bot = bot
+        self.at = at or datetime.time.fromisoformat(config.REMINDER_TIME)
+        self.lead_days = lead_days if lead_days is not None else config.REMINDER_LEAD_DAYS
+        self._now = now
+        self._sleep = sleep
+        self._heap = []
+        self._seq = itertools.count()
+
+    def _schedule(self, lead_days, after: datetime.datetime):
+        fire_at = datetime.datetime.combine(after.date(), self.at)
+        if fire_at <= after:
+            fire_at += datetime.timedelta(days=1)
+        heapq.heappush(self._heap, (fire_at, next(self._seq), lead_days))
+
+    def start(self):
+        # Если бот перезапустился после времени напоминаний, сегодняшние догоняются сразу;
+        # уже отправленные отсекает курсор
+        today = datetime.datetime.combine(self._now().date(), self.at)
+        for lead_days in self.lead_days:
+            heapq.heappush(self._heap, (today, next(self._seq), lead_days))
+
+    async def run_pending(self):
+        # Срабатывают все записи, чьё время уже наступило
+        now = self._now()
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, _, lead_days = heapq.heappop(self._heap)
+            try:
+                await send_due_reminders(self.bot, fire_at.date() + datetime.timedelta(days=lead_days), lead_days)
+            except Exception:
+                logger.exception(f"Ошибка при отправке напоминаний за {lead_days} дн.")
+                # Курсор открыт: повтор в тот же день продолжит с места сбоя
+                retry_at = now + datetime.timedelta(seconds=config.BROADCAST_RETRY_INTERVAL)
+                if retry_at.date() == fire_at.date():
+                    heapq.heappush(self._heap, (retry_at, next(self._seq), lead_days))
+                    continue
+            self._schedule(lead_days, fire_at)
+
+    async def run(self):
+        self.start()
+        while self._heap:
+            delay = (self._heap[0][0] - self._now()).total_seconds()
+            if delay > 0:
+                await self._sleep(delay)
+            await self.run_pending()
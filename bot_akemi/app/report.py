@@ -0,0 +1,137 @@
+import os
+import re
+import json
+import html
+import logging
+from app.logging_config import LOG_DIR, REPORT_DIR, MAIN_LOG_FILE
+
+logger = logging.getLogger(__name__)
+
+MAIN_LOG_PATH = os.path.join(LOG_DIR, MAIN_LOG_FILE)
+FINAL_REPORT_PATH = os.path.join(REPORT_DIR, 'final_report.html')
+
+LINE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:,\d+)?) \[(\w+)\] (.*)$')
+
+HEADER = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <title>Лог-отчёт</title>
+    <style>
+        body { font-family: Arial, sans-serif; background-color: #f4f4f4; margin: 20px; }
+        h1 { text-align: center; }
+        table { width: 100%; border-collapse: collapse; background-color: #fff; }
+        th, td { padding: 10px; border: 1px solid #ccc; }
+        th { background-color: #f2f2f2; }
+        tr:nth-child(even) { background-color: #f9f9f9; }
+        .INFO { color: green; }
+        .ERROR { color: red; }
+        .WARNING { color: orange; }
+        .DEBUG { color: gray; }
+        .CRITICAL { color: darkred; }
+    </style>
+</head>
+<body>
+    <h1>Финальный отчёт логов</h1>
+    <table>
+        <tr><th>Время</th><th>Уровень</th><th>Сообщение</th></tr>
+"""
+# Отчёт всегда заканчивается этим хвостом: при дозаписи он срезается и пишется заново
+FOOTER = """    </table>
+</body>
+</html>
+"""
+FOOTER_BYTES = FOOTER.encode('utf-8')
+
+
+def iter_log_lines(log_path, offset=0):
+    # Отдаёт (строка, смещение после неё); недописанная последняя строка
+    # остаётся на следующий запуск
+    with open(log_path, 'rb') as log_file:
+        log_file.seek(offset)
+        for raw in log_file:
+            if not raw.endswith(b'\n'):
+                break
+            offset += len(raw)
+            yield raw.decode('utf-8', errors='replace').rstrip('\r\n'), offset
+
+
+def render_row(line):
+    match = LINE_RE.match(line)
+    if match is None:
+        # продолжение многострочной записи, например трассировки
+        return f"<tr><td></td><td></td><td><pre>{html.escape(line)}</pre></td></tr>\n" if line.strip() else ""
+    time, level, message = match.groups()
+    return f"<tr><td>{time}</td><td class='{level}'>{level}</td><td>{html.escape(message)}</td></tr>\n"
+
+
+def _load_checkpoint(checkpoint_path):
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_checkpoint(checkpoint_path, checkpoint):
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _open_for_append(output_path):
+    # Открывает готовый отчёт и срезает хвост; None — если отчёт надо строить заново
+    try:
+        report = open(output_path, 'r+b')
+    except OSError:
+        return None
+    size = report.seek(0, os.SEEK_END)
+    if size >= len(FOOTER_BYTES):
+        report.seek(size - len(FOOTER_BYTES))
+        if report.read() == FOOTER_BYTES:
+            report.seek(size - len(FOOTER_BYTES))
+            report.truncate()
+            return report
+    report.close()
+    return None
+
+
+def generate_html_report(log_path=MAIN_LOG_PATH, output_path=FINAL_REPORT_PATH, checkpoint_path=None):
+    checkpoint_path = checkpoint_path or output_path + '.offset'
+    if not os.path.exists(log_path):
+        logger.warning("Лог файл не найден для отчета.")
+        return
+
+    stat = os.stat(log_path)
+    checkpoint = _load_checkpoint(checkpoint_path)
+    report = None
+    offset = 0
+    # Если лог ротировали или обрезали, строим отчёт с нуля
+    if checkpoint and checkpoint.get('log_path') == os.path.abspath(log_path) \
+            and checkpoint.get('inode') == stat.st_ino and checkpoint.get('offset', 0) <= stat.st_size:
+        report = _open_for_append(output_path)
+        if report is not None:
+            offset = checkpoint['offset']
+
+    if report is None:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        report = open(output_path, 'wb')
+        report.write(HEADER.encode('utf-8'))
+
+    rows = 0
+    with report:
+        for line, offset_after in iter_log_lines(log_path, offset):
+            row = render_row(line)
+            if row:
+                report.write(row.encode('utf-8'))
+                rows += 1
+            offset = offset_after
+        report.write(FOOTER_BYTES)
+
+    _save_checkpoint(checkpoint_path, {
+        'log_path': os.path.abspath(log_path),
+        'inode': stat.st_ino,
+        'offset': offset,
+    })
+    logger.info(f"Финальный HTML-отчёт обновлён ({rows} новых строк): {output_path}")
@@ -1,91 +1,10 @@
 import sqlite3
 import logging
-import os
+import time
 from app.database import db_path
-
-log_dir = "logs"
-report_dir = "reports"
-
-os.makedirs(log_dir, exist_ok=True)
-os.makedirs(report_dir, exist_ok=True)
-
-log_file_path = os.path.join(log_dir, "requests.log")
-html_log_path = os.path.join(report_dir, "report.html")
-html_final_report_path = os.path.join(report_dir, "final_report.html")
-
-class HTMLHandler(logging.Handler):
-    def __init__(self, filename):
-        super().__init__()
-        self.filename = filename
-
-    def emit(self, record):
-        log_entry = self.format(record)
-        with open(self.filename, 'a', encoding='utf-8') as f:
-            f.write("<div style='margin-bottom: 10px; padding: 10px; border: 1px solid #ddd; background-color: #f9f9f9;'>")
-            f.write(log_entry + "</div>\n")
-
+from app.report import generate_html_report
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-
-log_handler = logging.FileHandler(log_file_path, encoding='utf-8')
-log_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
-logger.addHandler(log_handler)
-
-html_handler = HTMLHandler(html_log_path)
-html_handler.setFormatter(logging.Formatter('<b>%(asctime)s</b> [%(levelname)s] %(message)s'))
-logger.addHandler(html_handler)
-
-def generate_html_report():
-    if not os.path.exists(log_file_path):
-        logger.warning("Файл логов не найден для отчета.")
-        return
-
-    with open(log_file_path, 'r', encoding='utf-8') as log_file:
-        lines = log_file.readlines()
-
-    html_content = """
-    <!DOCTYPE html>
-    <html lang="ru">
-    <head>
-        <meta charset="UTF-8">
-        <title>Лог-отчёт</title>
-        <style>
-            body { font-family: Arial, sans-serif; background-color: #f4f4f4; margin: 20px; }
-            h1 { text-align: center; }
-            table { width: 100%; border-collapse: collapse; background-color: #fff; }
-            th, td { padding: 10px; border: 1px solid #ccc; }
-            th { background-color: #f2f2f2; }
-            tr:nth-child(even) { background-color: #f9f9f9; }
-            .INFO { color: green; }
-            .ERROR { color: red; }
-            .WARNING { color: orange; }
-        </style>
-    </head>
-    <body>
-        <h1>Финальный отчёт логов</h1>
-        <table>
-            <tr><th>Время</th><th>Уровень</th><th>Сообщение</th></tr>
-    """
-
-    for line in lines:
-        try:
-            parts = line.strip().split(' ', 2)
-            time, level, message = parts[0], parts[1].strip('[]'), parts[2]
-            html_content += f"<tr><td>{time}</td><td class='{level}'>{level}</td><td>{message}</td></tr>"
-        except Exception:
-            continue
-
-    html_content += """
-        </table>
-    </body>
-    </html>
-    """
-
-    with open(html_final_report_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-
-    logger.info(f"Финальный HTML-отчёт создан: {html_final_report_path}")
 
 def add_user(user_id, username=None):
     try:
@@ -150,5 +69,108 @@ def delete_all_personal_holidays(user_id):
     except sqlite3.Error as e:
         logger.error(f"Ошибка при удалении всех праздников для пользователя с ID {user_id}: {e}")
 
+def select_holiday_year(conn, country_code, year):
+    cursor = conn.cursor()
+    cursor.execute('''
+    SELECT fetched_at FROM holiday_years WHERE country_code = ? AND year = ?
+    ''', (country_code, year))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    cursor.execute('''
+    SELECT holiday_name, holiday_date, description, holiday_type FROM public_holidays
+    WHERE country_code = ? AND holiday_date BETWEEN ? AND ?
+    ORDER BY holiday_date
+    ''', (country_code, f"{year}-01-01", f"{year}-12-31"))
+    holidays = [
+        {
+            "name": name,
+            "description": description,
+            "date": {"iso": holiday_date},
+            "type": holiday_type.split(", ") if holiday_type else [],
+        }
+        for name, holiday_date, description, holiday_type in cursor.fetchall()
+    ]
+    return row[0], holidays
+
+def replace_holiday_year(conn, country_code, year, holidays, fetched_at=None):
+    rows = []
+    for holiday in holidays:
+        try:
+            rows.append((
+                country_code,
+                holiday["date"]["iso"][:10],
+                holiday["name"],
+                holiday.get("description"),
+                ", ".join(holiday.get("type") or []),
+            ))
+        except (KeyError, TypeError):
+            continue
+    cursor = conn.cursor()
+    cursor.execute('''
+    DELETE FROM public_holidays WHERE country_code = ? AND holiday_date BETWEEN ? AND ?
+    ''', (country_code, f"{year}-01-01", f"{year}-12-31"))
+    cursor.executemany('''
+    INSERT OR IGNORE INTO public_holidays (country_code, holiday_date, holiday_name, description, holiday_type)
+    VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+    cursor.execute('''
+    INSERT OR REPLACE INTO holiday_years (country_code, year, fetched_at) VALUES (?, ?, ?)
+    ''', (country_code, year, fetched_at if fetched_at is not None else time.time()))
+    return len(rows)
+
+def select_translations(conn, texts, target_lang):
+    translations = {}
+    cursor = conn.cursor()
+    # Ограничение SQLite на число параметров в одном запросе
+    for start in range(0, len(texts), 500):
+        chunk = texts[start:start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(f'''
+        SELECT source_text, translated_text FROM translations
+        WHERE target_lang = ? AND source_text IN ({placeholders})
+        ''', (target_lang, *chunk))
+        translations.update(cursor.fetchall())
+    return translations
+
+def upsert_translations(conn, pairs, target_lang):
+    conn.executemany('''
+    INSERT OR REPLACE INTO translations (source_text, target_lang, translated_text)
+    VALUES (?, ?, ?)
+    ''', [(text, target_lang, translated) for text, translated in pairs])
+
+def get_holiday_year(country_code, year):
+    try:
+        with sqlite3.connect(db_path) as conn:
+            return select_holiday_year(conn, country_code, year)
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при чтении праздников {country_code} за {year} год: {e}")
+        return None
+
+def save_holiday_year(country_code, year, holidays, fetched_at=None):
+    try:
+        with sqlite3.connect(db_path) as conn:
+            count = replace_holiday_year(conn, country_code, year, holidays, fetched_at)
+            conn.commit()
+        logger.info(f"Сохранено {count} праздников {country_code} за {year} год.")
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при сохранении праздников {country_code} за {year} год: {e}")
+
+def get_translations(texts, target_lang):
+    try:
+        with sqlite3.connect(db_path) as conn:
+            return select_translations(conn, list(texts), target_lang)
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при чтении переводов на '{target_lang}': {e}")
+        return {}
+
+def save_translations(pairs, target_lang):
+    try:
+        with sqlite3.connect(db_path) as conn:
+            upsert_translations(conn, pairs, target_lang)
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при сохранении переводов на '{target_lang}': {e}")
+
 if __name__ == "__main__":
     generate_html_report()
@@ -0,0 +1,187 @@
+import re
+import time
+import logging
+import datetime
+from collections import OrderedDict
+import app.async_requests as rq
+from app.holiday_cache import holiday_cache
+from app.range_index import PersonalVersions
+from app.translation import translate_many
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_INDEX_TTL = 6 * 60 * 60
+ANSWER_CACHE_SIZE = 4096
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text) -> str:
+    return " ".join(_WORD.findall(text.casefold().replace("ё", "е")))
+
+
+def trigrams(text, prefix_only=False):
+    # Каждое слово дополняется пробелами слева, поэтому триграммы начала слова
+    # находят и запросы из одной-двух букв ("но" -> "  н", " но")
+    result = set()
+    for word in text.split():
+        padded = f"  {word}" if prefix_only else f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class TrigramIndex:
+    """Инвертированный индекс триграмма -> документы с точечным добавлением и удалением."""
+
+    def __init__(self):
+        self._postings = {}
+        self._docs = {}
+
+    def add(self, doc_id, text, payload):
+        self.remove(doc_id)
+        normalized = normalize(text)
+        self._docs[doc_id] = (normalized, payload)
+        for gram in trigrams(normalized):
+            self._postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        for gram in trigrams(doc[0]):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+        return True
+
+    def search(self, query, limit=20):
+        normalized = normalize(query)
+        grams = trigrams(normalized, prefix_only=True)
+        if not grams:
+            return []
+        # Пересечение начинаем с самого короткого списка
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        words = normalized.split()
+        matches = []
+        for doc_id in candidates:
+            text, payload = self._docs[doc_id]
+            doc_words = text.split()
+            # Каждое слово запроса должно быть началом какого-то слова документа
+            if all(any(word.startswith(part) for word in doc_words) for part in words):
+                matches.append((not text.startswith(normalized), len(text), payload))
+        matches.sort(key=lambda match: match[:2])
+        return [payload for _, _, payload in matches[:limit]]
+
+    def __len__(self):
+        return len(self._docs)
+
+
+class HolidaySearch:
+    """Поиск по названиям: публичные праздники страны и личные праздники пользователя."""
+
+    def __init__(self, max_users=10_000, answer_cache_size=ANSWER_CACHE_SIZE, clock=time.monotonic, versions=None):
+        self.max_users = max_users
+        self.answer_cache_size = answer_cache_size
+        self._clock = clock
+        self._personal = OrderedDict()
+        self._personal_versions = versions or PersonalVersions(clock=clock)
+        self._public = {}
+        self._answers = OrderedDict()
+        self._versions = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _personal_index(self, user_id):
+        index = self._personal.get(user_id)
+        if index is not None and await self._personal_versions.changed(user_id):
+            logger.info(f"Личные праздники пользователя {user_id} изменены другим процессом, поисковый индекс перечитывается")
+            del self._personal[user_id]
+            self._touch(user_id)
+            index = None
+        if index is None:
+            await self._personal_versions.load(user_id)
+            index = TrigramIndex()
+            async for rows in rq.iter_personal_holidays(user_id):
+                for holiday_id, name, date in rows:
+                    index.add(holiday_id, name, ("⭐", name, date))
+            self._personal[user_id] = index
+            while len(self._personal) > self.max_users:
+                self._personal_versions.forget(self._personal.popitem(last=False)[0])
+        else:
+            self._personal.move_to_end(user_id)
+        return index
+
+    async def _public_index(self, country_code, language, year):
+        key = (country_code, language, year)
+        entry = self._public.get(key)
+        if entry is not None and self._clock() - entry[0] <= PUBLIC_INDEX_TTL:
+            return entry[1]
+        holidays = [holiday for day in (await holiday_cache.get_year(country_code, year)).values() for holiday in day]
+        if language == 'en':
+            names = [holiday['name'] for holiday in holidays]
+        else:
+            names = await translate_many((holiday['name'] for holiday in holidays), language)
+        index = TrigramIndex()
+        for position, (holiday, name) in enumerate(zip(holidays, names)):
+            # Ищем и по переводу, и по оригинальному названию
+            index.add(position, f"{name} {holiday['name']}", ("🎉", name, holiday['date']['iso'][:10]))
+        self._public[key] = (self._clock(), index)
+        logger.info(f"Построен поисковый индекс праздников {country_code}/{language} за {year} год: {len(index)}")
+        return index
+
+    def _touch(self, user_id):
+        # Новая версия делает недействительными кэшированные ответы пользователя
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def add_personal(self, user_id, holiday_id, name, date):
+        index = self._personal.get(user_id)
+        if index is not None:
+            index.add(holiday_id, name, ("⭐", name, str(date)))
+            self._personal_versions.added(user_id, holiday_id)
+        self._touch(user_id)
+
+    def remove_personal(self, user_id, holiday_id):
+        index = self._personal.get(user_id)
+        if index is not None:
+            index.remove(holiday_id)
+            self._personal_versions.removed(user_id, holiday_id)
+        self._touch(user_id)
+
+    def forget_user(self, user_id):
+        self._personal.pop(user_id, None)
+        self._personal_versions.forget(user_id)
+        self._touch(user_id)
+
+    async def search(self, user_id, query, country_code='KZ', language='ru', limit=20, today=None):
+        year = (today or datetime.date.today()).year
+        # Индекс сверяется с БД до поиска в кэше ответов: перечитанный индекс меняет версию ответов
+        personal_index = await self._personal_index(user_id)
+        key = (user_id, self._versions.get(user_id, 0), country_code, language, year, normalize(query), limit)
+        cached = self._answers.get(key)
+        if cached is not None:
+            self._answers.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        personal = personal_index.search(query, limit)
+        public = (await self._public_index(country_code, language, year)).search(query, limit)
+        result = (personal + public)[:limit]
+        self._answers[key] = result
+        while len(self._answers) > self.answer_cache_size:
+            self._answers.popitem(last=False)
+        return result
+
+    def stats(self):
+        return {
+            "users": len(self._personal),
+            "public_indexes": len(self._public),
+            "answers": len(self._answers),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+holiday_search = HolidaySearch()
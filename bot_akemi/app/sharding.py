@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import multiprocessing
+from aiogram import Bot
+from aiogram.exceptions import TelegramNetworkError, TelegramServerError, TelegramRetryAfter
+from aiogram.types import Update
+import app.config as config
+import app.database as db
+from app.logging_config import setup_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+# Типы апдейтов, у которых есть отправитель (поле "from")
+USER_UPDATE_FIELDS = (
+    "message", "edited_message", "callback_query", "inline_query",
+    "chosen_inline_result", "shipping_query", "pre_checkout_query", "poll_answer",
+)
+POLLING_TIMEOUT = 30
+# Повторы getUpdates после сетевых ошибок и ошибок сервера, как у dp.start_polling
+POLLING_BACKOFF_MIN = 1.0
+POLLING_BACKOFF_MAX = 5.0
+
+
+def update_user_id(update: dict) -> int:
+    for field in USER_UPDATE_FIELDS:
+        event = update.get(field)
+        if event:
+            sender = event.get("from") or event.get("user")
+            if sender:
+                return sender["id"]
+            chat = event.get("chat")
+            if chat:
+                return chat["id"]
+    return 0
+
+
+def shard_for(user_id: int, workers: int) -> int:
+    return user_id % workers
+
+
+class UserOrderedExecutor:
+    """Обрабатывает апдейты конкурентно, но апдейты одного пользователя — строго по очереди."""
+
+    def __init__(self):
+        self._locks = {}
+        self._pending = {}
+        self._tasks = set()
+
+    def submit(self, user_id, coro_factory):
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        self._pending[user_id] = self._pending.get(user_id, 0) + 1
+        task = asyncio.create_task(self._run(user_id, lock, coro_factory))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, user_id, lock, coro_factory):
+        try:
+            async with lock:
+                await coro_factory()
+        except Exception:
+            logger.exception(f"Ошибка обработки апдейта пользователя {user_id}")
+        finally:
+            self._pending[user_id] -= 1
+            if not self._pending[user_id]:
+                del self._pending[user_id]
+                del self._locks[user_id]
+
+    async def drain(self):
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+async def _worker_loop(index, update_queue, done_queue, bot_factory):
+    from app.bootstrap import create_dispatcher
+
+    bot = bot_factory() if bot_factory else Bot(token=config.BOT_TOKEN)
+    dp = create_dispatcher(final_report=False, background_jobs=False)
+    workflow_data = {"dispatcher": dp, "bots": [bot], "bot": bot, **dp.workflow_data}
+    await dp.emit_startup(**workflow_data)
+    logger.info(f"Воркер {index} готов к работе")
+
+    executor = UserOrderedExecutor()
+    loop = asyncio.get_running_loop()
+    processed = 0
+
+    async def handle(raw):
+        nonlocal processed
+        update = Update.model_validate(raw, context={"bot": bot})
+        await dp.feed_update(bot, update)
+        processed += 1
+        if done_queue is not None:
+            done_queue.put(index)
+
+    try:
+        while True:
+            raw = await loop.run_in_executor(None, update_queue.get)
+            if raw is None:
+                break
+            executor.submit(update_user_id(raw), lambda raw=raw: handle(raw))
+        await executor.drain()
+    finally:
+        await dp.emit_shutdown(**workflow_data)
+        await bot.session.close()
+        logger.info(f"Воркер {index} остановлен, обработано апдейтов: {processed}")
+
+
+def worker_main(index, update_queue, done_queue=None, bot_factory=None):
+    setup_logging(console=False)
+    try:
+        asyncio.run(_worker_loop(index, update_queue, done_queue, bot_factory))
+    finally:
+        shutdown_logging()
+
+
+class Supervisor:
+    """Запускает N процессов-воркеров и раскладывает апдейты по ним по хешу user_id."""
+
+    def __init__(self, workers, bot_factory=None, done_queue=None):
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self.queues = [self._context.Queue() for _ in range(workers)]
+        self.bot_factory = bot_factory
+        self.done_queue = done_queue
+        self.processes = []
+
+    def start(self):
+        for index, update_queue in enumerate(self.queues):
+            process = self._context.Process(
+                target=worker_main,
+                args=(index, update_queue, self.done_queue, self.bot_factory),
+                name=f"bot-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(f"Запущено воркеров: {self.workers}")
+
+    def route(self, raw: dict):
+        self.queues[shard_for(update_user_id(raw), self.workers)].put(raw)
+
+    def stop(self, timeout=30):
+        for update_queue in self.queues:
+            update_queue.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Воркер {process.name} не завершился, принудительная остановка")
+                process.terminate()
+        self.processes.clear()
+
+
+async def poll_updates(bot: Bot, supervisor, sleep=asyncio.sleep):
+    offset = None
+    delay = POLLING_BACKOFF_MIN
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=POLLING_TIMEOUT)
+        except TelegramRetryAfter as e:
+            logger.warning(f"Лимит Telegram при получении апдейтов, пауза {e.retry_after} с")
+            await sleep(e.retry_after)
+            continue
+        except (TelegramNetworkError, TelegramServerError, asyncio.TimeoutError) as e:
+            logger.warning(f"Ошибка получения апдейтов, повтор через {delay} с: {e}")
+            await sleep(delay)
+            delay = min(delay * 2, POLLING_BACKOFF_MAX)
+            continue
+        delay = POLLING_BACKOFF_MIN
+        for update in updates:
+            supervisor.route(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+            offset = update.update_id + 1
+
+
+async def run_sharded_polling(bot: Bot, workers):
+    # Схему обновляет супервизор, чтобы воркеры не мигрировали базу наперегонки
+    await asyncio.to_thread(db.create_db)
+    from app.bootstrap import start_background_jobs, stop_background_jobs, on_shutdown
+
+    supervisor = Supervisor(workers)
+    supervisor.start()
+    start_background_jobs(bot)
+    try:
+        await bot.delete_webhook(drop_pending_updates=False)
+        await poll_updates(bot, supervisor)
+    finally:
+        await stop_background_jobs()
+        await asyncio.to_thread(supervisor.stop)
+        # Та же очистка, что и в однопроцессном режиме: сессия Calendarific, база, логи и отчёт
+        await on_shutdown()
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Склеивает одновременные одинаковые запросы в один.
+
+    Пока по ключу выполняется задача, остальные вызовы ждут её результат,
+    а не запускают свою. Задача отвязана от вызвавшего: отмена одного
+    ожидающего не отменяет запрос для остальных.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.calls = 0
+        self.shared = 0
+
+    def _start(self, keys, coro):
+        task = asyncio.ensure_future(coro)
+        for key in keys:
+            self._calls[key] = task
+
+        def _done(finished):
+            for key in keys:
+                if self._calls.get(key) is finished:
+                    del self._calls[key]
+            # Ошибку уже получили ожидающие; помечаем её прочитанной, если их не осталось
+            if not finished.cancelled():
+                finished.exception()
+
+        task.add_done_callback(_done)
+        self.calls += 1
+        return task
+
+    async def do(self, key, factory):
+        task = self._calls.get(key)
+        if task is None:
+            task = self._start((key,), factory())
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    async def do_many(self, keys, factory):
+        # factory(missing) получает ключи без активного запроса и возвращает словарь ключ -> значение;
+        # все они обслуживаются одной задачей (например, одним пакетом перевода)
+        tasks = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            task = self._calls.get(key)
+            if task is None:
+                missing.append(key)
+            else:
+                tasks[key] = task
+                self.shared += 1
+        if missing:
+            task = self._start(missing, factory(missing))
+            for key in missing:
+                tasks[key] = task
+        results = {}
+        for task in set(tasks.values()):
+            results.update(await asyncio.shield(task))
+        return {key: results[key] for key in tasks if key in results}
+
+    def in_flight(self) -> int:
+        return len(set(self._calls.values()))
+
+    def stats(self):
+        return {"calls": self.calls, "shared": self.shared, "in_flight": self.in_flight()}
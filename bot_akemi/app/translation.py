@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from collections import OrderedDict
+import app.async_requests as rq
+from app.ratelimit import api_slots
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+MEMO_MAX_SIZE = 4096
+# Ограничение Google Translate на длину одного запроса
+BATCH_MAX_CHARS = 4500
+
+_translators = {}
+
+
+def get_translator(target):
+    translator = _translators.get(target)
+    if translator is None:
+        # deep_translator тянет requests и bs4, поэтому импортируется при первом переводе
+        from deep_translator import GoogleTranslator
+        translator = GoogleTranslator(source='auto', target=target)
+        _translators[target] = translator
+    return translator
+
+
+def _chunks(texts, max_chars=BATCH_MAX_CHARS):
+    chunk, size = [], 0
+    for text in texts:
+        if chunk and size + len(text) + 1 > max_chars:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(text)
+        size += len(text) + 1
+    if chunk:
+        yield chunk
+
+
+def translate_batch(texts, target='ru'):
+    # Несколько строк уходят одним запросом через перевод строки;
+    # если переводчик склеил или разбил строки, переводим по одной.
+    translator = get_translator(target)
+    result = []
+    for chunk in _chunks(texts):
+        translated = translator.translate("\n".join(chunk))
+        parts = translated.split("\n") if translated else []
+        if len(parts) != len(chunk):
+            parts = translator.translate_batch(chunk)
+        result.extend(part.strip() for part in parts)
+    return result
+
+
+class TranslationMemo:
+    """Память переводов: LRU в процессе поверх таблицы translations в holidays.db."""
+
+    def __init__(self, max_size=MEMO_MAX_SIZE, translate=translate_batch):
+        self.max_size = max_size
+        self._translate = translate
+        self._entries = OrderedDict()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, target):
+        key = (text, target)
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, text, target, translated):
+        self._entries[(text, target)] = translated
+        self._entries.move_to_end((text, target))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def translate_many(self, texts, target='ru'):
+        result = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            cached = self.get(text, target)
+            if cached is not None:
+                result[text] = cached
+                self.hits += 1
+            else:
+                pending.append(text)
+
+        if pending:
+            # Тексты, которые уже переводятся для другого запроса, не отправляются повторно
+            loaded = await self._flights.do_many(
+                [(text, target) for text in pending], lambda keys: self._load([key[0] for key in keys], target)
+            )
+            for (text, _), translated in loaded.items():
+                result[text] = translated
+
+        return [result.get(text, text) for text in texts]
+
+    async def _load(self, pending, target):
+        result = {}
+        stored = await rq.get_translations(pending, target)
+        for text, translated in stored.items():
+            self.put(text, target, translated)
+            result[(text, target)] = translated
+        pending = [text for text in pending if text not in stored]
+
+        if pending:
+            self.misses += len(pending)
+            try:
+                async with api_slots():
+                    translated = await asyncio.to_thread(self._translate, pending, target)
+            except Exception as e:
+                logger.warning(f"Ошибка перевода: {e}")
+                translated = None
+            if translated is not None:
+                pairs = list(zip(pending, translated))
+                for text, value in pairs:
+                    self.put(text, target, value)
+                    result[(text, target)] = value
+                await rq.save_translations(pairs, target)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "shared": self._flights.shared}
+
+
+translation_memo = TranslationMemo()
+
+
+async def translate_many(texts, target='ru'):
+    return await translation_memo.translate_many(list(texts), target)
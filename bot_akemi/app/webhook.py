@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+import app.config as config
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(bot: Bot, dp: Dispatcher, path=None, secret_token=None) -> web.Application:
+    app = web.Application()
+    # Telegram получает ответ сразу, сам апдейт обрабатывается в фоне;
+    # число одновременных обработок ограничивает ConcurrencyLimitMiddleware
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=secret_token,
+        handle_in_background=True,
+    ).register(app, path=path or config.WEBHOOK_PATH)
+    # Связывает startup/shutdown диспетчера (в т.ч. финальный отчёт) с жизненным циклом aiohttp
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def set_webhook(bot: Bot):
+    if not config.WEBHOOK_BASE_URL:
+        logger.warning("WEBHOOK_BASE_URL не задан, вебхук не регистрируется в Telegram")
+        return
+    url = config.WEBHOOK_BASE_URL.rstrip("/") + config.WEBHOOK_PATH
+    await bot.set_webhook(url, secret_token=config.WEBHOOK_SECRET, drop_pending_updates=False)
+    logger.info(f"Вебхук зарегистрирован: {url}")
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher, host=None, port=None):
+    dp.startup.register(set_webhook)
+    app = create_app(bot, dp, secret_token=config.WEBHOOK_SECRET)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host or config.WEBAPP_HOST, port or config.WEBAPP_PORT)
+    await site.start()
+    logger.info(f"Webhook-сервер слушает {host or config.WEBAPP_HOST}:{port or config.WEBAPP_PORT}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,90 @@
+import asyncio
+import datetime
+import itertools
+from typing import get_args
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import GetMe
+from aiogram.types import Chat, Message, User
+
+FAKE_TOKEN = "42:FAKE-TOKEN-FOR-BENCHMARKS"
+BOT_USER = User(id=42, is_bot=True, first_name="Akemi", username="akemi_bot")
+
+
+class FakeTelegramSession(BaseSession):
+    """Сессия без сети: отвечает на методы Bot API заготовками и запоминает вызовы."""
+
+    def __init__(self, latency=0.0):
+        super().__init__()
+        self.latency = latency
+        self.requests = []
+        # chat_id -> список исключений, которые будут выброшены по очереди
+        self.failures = {}
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot, method, timeout=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        pending = self.failures.get(getattr(method, "chat_id", None))
+        if pending:
+            raise pending.pop(0)
+        self.requests.append(method)
+        if isinstance(method, GetMe):
+            return BOT_USER
+        returning = method.__returning__
+        if returning is Message or Message in get_args(returning):
+            chat_id = getattr(method, "chat_id", None) or 1
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.datetime.now(),
+                chat=Chat(id=chat_id, type="private"),
+                text=getattr(method, "text", None),
+            )
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
+
+    def sent(self, method_name):
+        return [m for m in self.requests if type(m).__name__ == method_name]
+
+
+def create_fake_bot(latency=0.0):
+    return Bot(token=FAKE_TOKEN, session=FakeTelegramSession(latency))
+
+
+_update_ids = itertools.count(1)
+
+
+def make_message_update(user_id, text, update_id=None):
+    return {
+        "update_id": update_id or next(_update_ids),
+        "message": {
+            "message_id": next(_update_ids),
+            "date": int(datetime.datetime.now().timestamp()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "username": f"user{user_id}"},
+            "text": text,
+        },
+    }
+
+
+def make_callback_update(user_id, data, update_id=None):
+    return {
+        "update_id": update_id or next(_update_ids),
+        "callback_query": {
+            "id": str(next(_update_ids)),
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "username": f"user{user_id}"},
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": next(_update_ids),
+                "date": int(datetime.datetime.now().timestamp()),
+                "chat": {"id": user_id, "type": "private"},
+                "text": "Сообщение с клавиатурой",
+            },
+        },
+    }
@@ -0,0 +1,26 @@
+import os
+import datetime
+import tempfile
+import app.database as db
+import app.async_requests as rq
+from app.async_requests import AsyncDatabase
+from app.holiday_cache import holiday_cache
+from app.translation import translation_memo
+
+
+def prepare_offline_app():
+    # Временная база и прогретые кэши: бенчмарк не ходит ни в Calendarific, ни в переводчик
+    tmp_dir = tempfile.mkdtemp(prefix="akemi-bench-")
+    db.db_path = os.path.join(tmp_dir, "holidays.db")
+    db.create_db()
+    rq.database = AsyncDatabase(db.db_path)
+
+    today = datetime.date.today()
+    holidays = [
+        {"name": "Benchmark Day", "date": {"iso": today.isoformat()}},
+        {"name": "Offline Day", "date": {"iso": today.isoformat()}},
+    ]
+    holiday_cache.put("KZ", today.year, holidays)
+    for holiday in holidays:
+        translation_memo.put(holiday["name"], "ru", holiday["name"])
+    return tmp_dir
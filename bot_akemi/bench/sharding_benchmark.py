@@ -0,0 +1,57 @@
+"""Сравнение пропускной способности: 1 воркер против N воркеров с шардированием по user_id.
+
+Запуск из каталога bot_akemi:  python -m bench.sharding_benchmark --updates 4000 --workers 4
+"""
+import time
+import argparse
+import multiprocessing
+from app.sharding import Supervisor
+from bench.fake_telegram import create_fake_bot, make_message_update
+from bench.offline import prepare_offline_app
+
+TEXTS = ["Какой сегодня праздник?", "Посмотреть личный календарь", "/start"]
+
+
+def offline_bot():
+    # Выполняется внутри воркера: своя временная база, прогретые кэши, фейковый Bot API
+    prepare_offline_app()
+    return create_fake_bot()
+
+
+def measure(workers, updates, users):
+    done = multiprocessing.get_context("spawn").Queue()
+    supervisor = Supervisor(workers, bot_factory=offline_bot, done_queue=done)
+    supervisor.start()
+
+    # прогрев: дожидаемся, пока все воркеры поднимутся
+    for user_id in range(workers):
+        supervisor.route(make_message_update(user_id, "/start"))
+    for _ in range(workers):
+        done.get()
+
+    payloads = [make_message_update(1000 + i % users, TEXTS[i % len(TEXTS)]) for i in range(updates)]
+    started = time.perf_counter()
+    for payload in payloads:
+        supervisor.route(payload)
+    for _ in range(updates):
+        done.get()
+    elapsed = time.perf_counter() - started
+    supervisor.stop()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=4000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    for workers in sorted({1, args.workers}):
+        elapsed = measure(workers, args.updates, args.users)
+        print(f"workers={workers} updates={args.updates} elapsed={elapsed:.2f}s "
+              f"throughput={args.updates / elapsed:.0f} updates/s")
+
+
+if __name__ == "__main__":
+    main()
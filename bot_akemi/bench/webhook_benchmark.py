@@ -0,0 +1,50 @@
+"""Пропускная способность webhook-режима на фейковом Telegram.
+
+Запуск из каталога bot_akemi:  python -m bench.webhook_benchmark --updates 2000 --users 200
+"""
+import time
+import asyncio
+import argparse
+import aiohttp
+from aiohttp.test_utils import TestServer
+from app.bootstrap import create_dispatcher
+from app.webhook import create_app
+from bench.fake_telegram import create_fake_bot, make_message_update
+from bench.offline import prepare_offline_app
+
+TEXTS = ["Какой сегодня праздник?", "Посмотреть личный календарь", "/start"]
+
+
+async def run(updates, users, concurrency, latency):
+    prepare_offline_app()
+    bot = create_fake_bot(latency)
+    dp = create_dispatcher(max_concurrent_updates=concurrency, background_jobs=False)
+    server = TestServer(create_app(bot, dp, path="/webhook"))
+    await server.start_server()
+    url = str(server.make_url("/webhook"))
+
+    payloads = [make_message_update(1000 + i % users, TEXTS[i % len(TEXTS)]) for i in range(updates)]
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as client:
+        await asyncio.gather(*(client.post(url, json=payload) for payload in payloads))
+    while len(bot.session.sent("SendMessage")) < updates:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    await server.close()
+
+    print(f"updates={updates} users={users} concurrency={concurrency} api_latency={latency * 1000:.0f}ms")
+    print(f"elapsed={elapsed:.2f}s throughput={updates / elapsed:.0f} updates/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02, help="задержка фейкового Bot API, с")
+    args = parser.parse_args()
+    asyncio.run(run(args.updates, args.users, args.concurrency, args.latency))
+
+
+if __name__ == "__main__":
+    main()
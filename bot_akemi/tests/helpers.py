@@ -0,0 +1,48 @@
+import os
+import datetime
+import tempfile
+from unittest.mock import patch
+
+import app.database as db
+from app.async_requests import AsyncDatabase
+
+
+class FakeClock:
+    """Управляемые часы: время двигается только через sleep или присваиванием now."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        if isinstance(self.now, datetime.datetime):
+            self.now += datetime.timedelta(seconds=seconds)
+        else:
+            self.now += seconds
+
+
+class TempDatabaseMixin:
+    """Временная holidays.db со всеми миграциями для IsolatedAsyncioTestCase.
+
+    По умолчанию app.async_requests.database подменяется на соединение с ней.
+    """
+
+    readers = 2
+    patch_requests = True
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "holidays.db")
+        with patch("app.database.db_path", self.path):
+            db.create_db()
+        self.database = AsyncDatabase(self.path, readers=self.readers)
+        if self.patch_requests:
+            patcher = patch("app.async_requests.database", self.database)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.database.close()
+        self.tmp_dir.cleanup()
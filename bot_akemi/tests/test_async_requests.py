@@ -0,0 +1,95 @@
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.config as config
+import app.async_requests as rq
+from tests.helpers import TempDatabaseMixin
+
+
+class TestAsyncRequests(TempDatabaseMixin, unittest.IsolatedAsyncioTestCase):
+    async def test_add_and_get_personal_holiday(self):
+        await rq.add_user(1, "Alice")
+        await rq.add_personal_holiday(1, "Birthday", "2025-06-01")
+        holidays = await rq.get_personal_holidays(1)
+        self.assertEqual(holidays, [("Birthday", "2025-06-01")])
+
+    async def test_delete_personal_holiday(self):
+        await rq.add_personal_holiday(2, "Test Day", "2025-01-01")
+        await rq.add_personal_holiday(2, "Other Day", "2025-01-02")
+        await rq.delete_personal_holiday(2, "Test Day")
+        self.assertEqual(await rq.get_personal_holidays(2), [("Other Day", "2025-01-02")])
+        await rq.delete_all_personal_holidays(2)
+        self.assertEqual(await rq.get_personal_holidays(2), [])
+
+    async def test_concurrent_writes_share_connections(self):
+        await asyncio.gather(*(rq.add_personal_holiday(3, f"Day {i}", "2025-01-01") for i in range(50)))
+        results = await asyncio.gather(*(rq.get_personal_holidays(3) for _ in range(20)))
+        self.assertTrue(all(len(holidays) == 50 for holidays in results))
+        self.assertLessEqual(len(self.database._connections), 3)
+
+    async def test_holiday_year_roundtrip(self):
+        await rq.save_holiday_year("KZ", 2025, [{"name": "Nauryz", "date": {"iso": "2025-03-21"}}], fetched_at=1.0)
+        fetched_at, holidays = await rq.get_holiday_year("KZ", 2025)
+        self.assertEqual(fetched_at, 1.0)
+        self.assertEqual(holidays[0]["name"], "Nauryz")
+
+    async def test_translations_roundtrip(self):
+        await rq.save_translations([("New Year", "Новый год")], "ru")
+        self.assertEqual(await rq.get_translations(["New Year", "Unknown"], "ru"), {"New Year": "Новый год"})
+
+    async def test_personal_holidays_keyset_pages(self):
+        for i in range(7):
+            await rq.add_personal_holiday(4, f"Day {i}", f"2025-01-0{7 - i}")
+        await rq.add_personal_holiday(5, "Foreign", "2025-01-01")
+
+        first, has_prev, has_next = await rq.get_personal_holidays_page(4, limit=3)
+        self.assertEqual([row[1] for row in first], ["Day 6", "Day 5", "Day 4"])
+        self.assertEqual((has_prev, has_next), (False, True))
+
+        last_row = first[-1]
+        second, has_prev, has_next = await rq.get_personal_holidays_page(4, after=(last_row[2], last_row[0]), limit=3)
+        self.assertEqual([row[1] for row in second], ["Day 3", "Day 2", "Day 1"])
+        self.assertEqual((has_prev, has_next), (True, True))
+
+        first_row = second[0]
+        back, has_prev, has_next = await rq.get_personal_holidays_page(4, before=(first_row[2], first_row[0]), limit=3)
+        self.assertEqual(back, first)
+        self.assertEqual((has_prev, has_next), (False, True))
+
+    async def test_delete_personal_holiday_by_id_checks_owner(self):
+        await rq.add_personal_holiday(6, "Same", "2025-01-01")
+        await rq.add_personal_holiday(6, "Same", "2025-02-01")
+        rows, _, _ = await rq.get_personal_holidays_page(6)
+        self.assertEqual(await rq.delete_personal_holiday_by_id(7, rows[0][0]), 0)
+        self.assertEqual(await rq.delete_personal_holiday_by_id(6, rows[0][0]), 1)
+        self.assertEqual(await rq.get_personal_holidays(6), [("Same", "2025-02-01")])
+
+        start = (rows[1][2], rows[1][0])
+        page, has_prev, _ = await rq.get_personal_holidays_page(6, start=start)
+        self.assertEqual(page, [rows[1]])
+        self.assertTrue(has_prev)
+
+    async def test_user_country_and_language(self):
+        await rq.add_user(8, "Alice")
+        self.assertEqual(await rq.get_user_settings(8), ("KZ", "ru"))
+        self.assertEqual(await rq.get_user_settings(9, ("US", "en")), ("US", "en"))
+        await rq.set_user_country(8, "DE")
+        await rq.set_user_language(8, "en")
+        await rq.set_user_country(9, "US")
+        self.assertEqual(await rq.get_user_settings(8), ("DE", "en"))
+        self.assertEqual(sorted(await rq.get_active_countries()), ["DE", "US"])
+
+    async def test_new_user_gets_configured_defaults(self):
+        with patch.object(config, "DEFAULT_COUNTRY", "US"), patch.object(config, "DEFAULT_LANGUAGE", "en"):
+            await rq.add_user(10, "Bob")
+            self.assertEqual(await rq.get_user_settings(11), ("US", "en"))
+        self.assertEqual(await rq.get_user_settings(10), ("US", "en"))
+
+
+if __name__ == "__main__":
+    unittest.main()
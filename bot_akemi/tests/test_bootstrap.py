@@ -0,0 +1,80 @@
+import sys
+import os
+import tempfile
+import subprocess
+import unittest
+from unittest.mock import patch, AsyncMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.bootstrap import create_dispatcher, on_startup, on_shutdown
+
+BOT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Доля собственного времени импорта модулей app.* во всём импорте app.bootstrap (сейчас около 2%).
+# Доля, а не абсолютное время: на медленной машине одинаково замедляются и app.*, и aiogram с aiohttp
+IMPORT_SHARE_BUDGET = 0.10
+
+
+def run_python(code, cwd, *flags):
+    env = dict(os.environ, PYTHONPATH=BOT_ROOT)
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=120, check=True,
+    )
+
+
+class TestColdStart(unittest.TestCase):
+    def test_import_has_no_side_effects(self):
+        with tempfile.TemporaryDirectory() as cwd:
+            run_python("import app.handlers, app.bootstrap, app.keyboards", cwd)
+            self.assertEqual(os.listdir(cwd), [])
+
+    def test_import_time_budget(self):
+        with tempfile.TemporaryDirectory() as cwd:
+            result = run_python("import app.bootstrap", cwd, "-X", "importtime")
+        app_us = total_us = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            self_us, _, module = line[len("import time:"):].split("|")
+            if not self_us.strip().isdigit():
+                continue
+            total_us += int(self_us)
+            if module.strip().split(".")[0] == "app":
+                app_us += int(self_us)
+        self.assertGreater(app_us, 0)
+        self.assertLess(app_us / total_us, IMPORT_SHARE_BUDGET)
+
+
+class TestLifecycle(unittest.IsolatedAsyncioTestCase):
+    def test_hooks_registered(self):
+        dp = create_dispatcher()
+        self.assertIn(on_startup, [h.callback for h in dp.startup.handlers])
+        self.assertIn(on_shutdown, [h.callback for h in dp.shutdown.handlers])
+
+    def test_each_dispatcher_gets_own_router(self):
+        first, second = create_dispatcher(), create_dispatcher()
+        self.assertEqual(len(first.sub_routers), 1)
+        self.assertEqual(len(second.sub_routers), 1)
+        self.assertIsNot(first.sub_routers[0], second.sub_routers[0])
+        self.assertIs(second.sub_routers[0].parent_router, second)
+
+    async def test_startup_creates_database(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "database", "holidays.db")
+            with patch("app.database.db_path", path):
+                await on_startup()
+            self.assertTrue(os.path.exists(path))
+
+    @patch("app.bootstrap.generate_html_report")
+    @patch("app.bootstrap.rq.database.close", new_callable=AsyncMock)
+    @patch("app.bootstrap.calendarific.close_session", new_callable=AsyncMock)
+    async def test_shutdown_releases_resources(self, close_session, close_db, report):
+        await on_shutdown()
+        close_session.assert_awaited_once()
+        close_db.assert_awaited_once()
+        report.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
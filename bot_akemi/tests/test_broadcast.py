@@ -0,0 +1,156 @@
+import sys
+import os
+import asyncio
+import datetime
+import unittest
+from unittest.mock import patch, AsyncMock
+from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError
+from aiogram.methods import SendMessage
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.async_requests as rq
+from app.broadcast import (
+    run_broadcast, run_daily_broadcast, send_with_retry, next_run_at, broadcast_scheduler, HolidaysUnavailable
+)
+from app.handlers import get_holidays_by_date
+from app.holiday_cache import holiday_cache
+from app.ratelimit import TokenBucket
+from app.translation import translation_memo
+from bench.fake_telegram import create_fake_bot
+from tests.helpers import FakeClock, TempDatabaseMixin
+
+DATE = datetime.date(2025, 3, 22)
+
+
+class TestBroadcast(TempDatabaseMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        for user_id in range(1, 26):
+            await rq.add_user(user_id, f"user{user_id}")
+
+        holiday_cache.clear()
+        holiday_cache.put("KZ", DATE.year, [{"name": "Nauryz", "date": {"iso": DATE.isoformat()}}])
+        translation_memo.put("Nauryz", "ru", "Наурыз")
+        self.bot = create_fake_bot()
+        self.bucket = TokenBucket(rate=10_000)
+
+    async def asyncTearDown(self):
+        await super().asyncTearDown()
+        holiday_cache.clear()
+        translation_memo.clear()
+
+    def recipients(self):
+        return [m.chat_id for m in self.bot.session.sent("SendMessage")]
+
+    async def test_everyone_receives_one_message(self):
+        cursor = await run_broadcast(self.bot, DATE, bucket=self.bucket, chunk_size=10)
+        self.assertEqual(sorted(self.recipients()), list(range(1, 26)))
+        self.assertIn("Наурыз", self.bot.session.sent("SendMessage")[0].text)
+        self.assertEqual(cursor["sent"], 25)
+        again = await run_broadcast(self.bot, DATE, bucket=self.bucket, chunk_size=10)
+        self.assertTrue(again["finished"])
+        self.assertEqual(len(self.recipients()), 25)
+
+    async def test_resume_after_crash(self):
+        self.bot.session.failures[15] = [RuntimeError("процесс упал")]
+        with self.assertRaises(RuntimeError):
+            await run_broadcast(self.bot, DATE, bucket=self.bucket, chunk_size=10)
+        first_run = set(self.recipients())
+        self.assertTrue(set(range(1, 11)) <= first_run)
+
+        await run_broadcast(self.bot, DATE, bucket=self.bucket, chunk_size=10)
+        recipients = self.recipients()
+        self.assertEqual(set(recipients), set(range(1, 26)))
+        # повторно могли уйти только сообщения из упавшего чанка
+        duplicates = {user_id for user_id in recipients if recipients.count(user_id) > 1}
+        self.assertTrue(duplicates <= set(range(11, 21)))
+
+    async def test_no_holidays_skips_broadcast(self):
+        other_day = DATE + datetime.timedelta(days=1)
+        cursor = await run_broadcast(self.bot, other_day, bucket=self.bucket)
+        self.assertTrue(cursor["finished"])
+        self.assertEqual(self.recipients(), [])
+
+    async def test_fetch_failure_keeps_cursor_open(self):
+        other_day = DATE + datetime.timedelta(days=1)
+        with patch("app.broadcast.get_holidays_by_date", new_callable=AsyncMock, return_value=None):
+            with self.assertRaises(HolidaysUnavailable):
+                await run_broadcast(self.bot, other_day, bucket=self.bucket)
+        self.assertFalse((await rq.get_broadcast_cursor(other_day.isoformat(), "KZ"))["finished"])
+
+        holiday_cache.put("KZ", DATE.year, [{"name": "Nauryz", "date": {"iso": other_day.isoformat()}}])
+        cursor = await run_broadcast(self.bot, other_day, bucket=self.bucket)
+        self.assertTrue(cursor["finished"])
+        self.assertEqual(len(self.recipients()), 25)
+
+    async def test_recipients_grouped_by_country_and_language(self):
+        await rq.set_user_language(3, "en")
+        await rq.set_user_country(4, "DE")
+        holiday_cache.put("DE", DATE.year, [{"name": "Frühlingsfest", "date": {"iso": DATE.isoformat()}}])
+        translation_memo.put("Frühlingsfest", "ru", "Весенний праздник")
+        failed = await run_daily_broadcast(self.bot, DATE, bucket=self.bucket, chunk_size=10)
+        self.assertEqual(failed, [])
+        texts = {message.chat_id: message.text for message in self.bot.session.sent("SendMessage")}
+        self.assertEqual(len(texts), 25)
+        self.assertIn("Наурыз", texts[1])
+        self.assertIn("Nauryz", texts[3])
+        self.assertIn("Весенний праздник", texts[4])
+        self.assertTrue((await rq.get_broadcast_cursor(DATE.isoformat(), "DE"))["finished"])
+
+    async def test_failed_country_does_not_block_others(self):
+        await rq.set_user_country(4, "US")
+
+        async def fetch(date, country_code='KZ'):
+            return None if country_code == "US" else await get_holidays_by_date(date, country_code)
+
+        with patch("app.broadcast.get_holidays_by_date", fetch):
+            failed = await run_daily_broadcast(self.bot, DATE, bucket=self.bucket)
+        self.assertEqual(failed, ["US"])
+        self.assertEqual(len(self.recipients()), 24)
+
+    async def test_retry_after_and_forbidden(self):
+        method = SendMessage(chat_id=1, text="x")
+        self.bot.session.failures[1] = [TelegramRetryAfter(method, "flood", 3)]
+        self.bot.session.failures[2] = [TelegramForbiddenError(method, "blocked")]
+        sleep = AsyncMock()
+        self.assertTrue(await send_with_retry(self.bot, 1, "text", self.bucket, sleep=sleep))
+        sleep.assert_awaited_once_with(3)
+        self.assertFalse(await send_with_retry(self.bot, 2, "text", self.bucket, sleep=sleep))
+
+
+class TestScheduling(unittest.IsolatedAsyncioTestCase):
+    def test_next_run_at(self):
+        at = datetime.time(9, 0)
+        self.assertEqual(next_run_at(datetime.datetime(2025, 1, 1, 8, 0), at), datetime.datetime(2025, 1, 1, 9, 0))
+        self.assertEqual(next_run_at(datetime.datetime(2025, 1, 1, 9, 0), at), datetime.datetime(2025, 1, 2, 9, 0))
+
+    async def test_scheduler_retries_same_day_after_failure(self):
+        run = AsyncMock(side_effect=[["KZ"], []])
+        sleep = AsyncMock(side_effect=[None, asyncio.CancelledError()])
+        now = lambda: datetime.datetime(2025, 3, 22, 10, 0)
+        with patch("app.broadcast.config.BROADCAST_TIME", "09:00"), patch("app.broadcast.run_daily_broadcast", run):
+            with self.assertRaises(asyncio.CancelledError):
+                await broadcast_scheduler(None, now=now, sleep=sleep)
+        self.assertEqual([call.args[1] for call in run.await_args_list], [DATE, DATE])
+
+    async def test_token_bucket_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        self.assertAlmostEqual(bucket.delay(), 0.5)
+        clock.now += 0.5
+        self.assertTrue(bucket.try_acquire())
+
+    async def test_token_bucket_acquire_waits(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        started = asyncio.get_running_loop().time()
+        for _ in range(6):
+            await bucket.acquire()
+        self.assertGreaterEqual(asyncio.get_running_loop().time() - started, 0.04)
+
+
+if __name__ == "__main__":
+    unittest.main()
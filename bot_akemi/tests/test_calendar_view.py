@@ -0,0 +1,119 @@
+import sys
+import os
+import unittest
+from unittest.mock import patch, AsyncMock, MagicMock
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Update
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.keyboards as kb
+from app.bootstrap import create_dispatcher
+from app.calendar_view import CalendarView, CalendarViewStore, create_delete_holiday_keyboard
+from app.handlers import delete_personal_holiday_by_id, confirm_delete_all_personal_holidays
+from bench.fake_telegram import create_fake_bot, make_callback_update
+
+ROWS = [(1, "Birthday", "2025-06-01"), (2, "Anniversary", "2025-07-01"), (3, "Name day", "2025-08-01")]
+
+
+def make_message(chat_id=10, message_id=20):
+    message = MagicMock()
+    message.chat.id = chat_id
+    message.message_id = message_id
+    message.edit_text = AsyncMock()
+    message.edit_reply_markup = AsyncMock()
+    sent = MagicMock()
+    sent.chat.id, sent.message_id = chat_id, message_id
+    message.answer = AsyncMock(return_value=sent)
+    return message
+
+
+class TestCalendarViewStore(unittest.IsolatedAsyncioTestCase):
+    async def test_show_edits_only_on_changes(self):
+        store = CalendarViewStore()
+        message = make_message()
+        view = CalendarView(1, ROWS)
+        await store.send(message, view)
+
+        self.assertFalse(await store.show(message, CalendarView(1, ROWS)))
+        message.edit_text.assert_not_awaited()
+
+        view = store.get(10, 20)
+        self.assertTrue(view.remove(2))
+        self.assertTrue(await store.show(message, view))
+        message.edit_text.assert_awaited_once()
+        self.assertEqual(store.stats(), {"views": 1, "edits": 1, "skipped": 1})
+
+    async def test_keyboard_only_change_uses_edit_reply_markup(self):
+        store = CalendarViewStore()
+        message = make_message()
+        await store.send(message, CalendarView(1, ROWS, has_next=False))
+        await store.show(message, CalendarView(1, ROWS, has_next=True))
+        message.edit_reply_markup.assert_awaited_once()
+        message.edit_text.assert_not_awaited()
+
+    def test_store_is_bounded_and_forgets_users(self):
+        store = CalendarViewStore(max_size=2)
+        for message_id in range(3):
+            store.remember(10, message_id, CalendarView(message_id % 2, ROWS), ("text", None))
+        self.assertIsNone(store.get(10, 0))
+        store.forget_user(1)
+        self.assertIsNone(store.get(10, 1))
+        self.assertIsNotNone(store.get(10, 2))
+
+
+class TestCalendarHandlers(unittest.IsolatedAsyncioTestCase):
+    def make_callback(self, store):
+        callback = MagicMock()
+        callback.from_user.id = 1
+        callback.answer = AsyncMock()
+        callback.message = make_message()
+        store.remember(10, 20, CalendarView(1, ROWS), CalendarView(1, ROWS).render())
+        return callback
+
+    async def test_delete_applies_locally_without_reading(self):
+        store = CalendarViewStore()
+        callback = self.make_callback(store)
+        with patch("app.handlers.calendar_views", store), \
+             patch("app.handlers.rq.delete_personal_holiday_by_id", new_callable=AsyncMock, return_value=1), \
+             patch("app.handlers.rq.get_personal_holidays_page", new_callable=AsyncMock) as mock_page:
+            await delete_personal_holiday_by_id(callback, kb.DeleteHoliday(id=2))
+        mock_page.assert_not_awaited()
+        callback.message.edit_text.assert_awaited_once()
+        self.assertEqual([row[0] for row in store.get(10, 20).holidays], [1, 3])
+
+    async def test_delete_all_edits_once(self):
+        store = CalendarViewStore()
+        callback = self.make_callback(store)
+        with patch("app.handlers.calendar_views", store), \
+             patch("app.handlers.rq.delete_all_personal_holidays", new_callable=AsyncMock) as mock_delete:
+            await confirm_delete_all_personal_holidays(callback)
+        mock_delete.assert_awaited_once_with(1)
+        callback.message.edit_text.assert_awaited_once()
+        callback.message.answer.assert_not_awaited()
+
+
+class TestDeleteButtonDispatch(unittest.IsolatedAsyncioTestCase):
+    async def test_first_page_button_is_dispatched(self):
+        # Кнопка первой страницы пакуется без токена страницы ("del:3::") и должна доходить до хендлера
+        button = create_delete_holiday_keyboard(ROWS, has_prev=False).inline_keyboard[2][0]
+        self.assertEqual(kb.DeleteHoliday.unpack(button.callback_data), kb.DeleteHoliday(id=3))
+        bot = create_fake_bot()
+        dp = create_dispatcher(storage=MemoryStorage())
+        with patch("app.handlers.calendar_views", CalendarViewStore()), \
+             patch("app.handlers.rq.delete_personal_holiday_by_id", new_callable=AsyncMock, return_value=1) as mock_delete, \
+             patch("app.handlers.rq.get_personal_holidays_page", new_callable=AsyncMock,
+                   return_value=(ROWS[:2], False, False)) as mock_page:
+            await dp.feed_update(bot, Update.model_validate(make_callback_update(1, button.callback_data)))
+        mock_delete.assert_awaited_once_with(1, 3)
+        self.assertIsNone(mock_page.await_args.kwargs["start"])
+        self.assertEqual(len(bot.session.sent("AnswerCallbackQuery")), 1)
+
+    def test_legacy_first_page_token_still_unpacks(self):
+        # Кнопки, собранные до исправления, несут page_id=0
+        callback_data = kb.DeleteHoliday.unpack("del:3::0")
+        self.assertEqual((callback_data.id, callback_data.page_date), (3, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
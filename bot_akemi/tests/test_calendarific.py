@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+import asyncio
+import unittest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.calendarific as calendarific
+
+
+class TestCalendarificClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+
+        async def holidays(request):
+            self.requests.append(dict(request.query))
+            await asyncio.sleep(0.2)
+            return web.json_response({"response": {"holidays": [{"name": "New Year"}]}})
+
+        app = web.Application()
+        app.router.add_get("/holidays", holidays)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.original_url = calendarific.API_URL
+        calendarific.API_URL = str(self.server.make_url("/holidays"))
+
+    async def asyncTearDown(self):
+        await calendarific.close_session()
+        calendarific.API_URL = self.original_url
+        await self.server.close()
+
+    async def test_fetch_holidays_params(self):
+        holidays = await calendarific.fetch_holidays("KZ", 2024, 1, 1)
+        self.assertEqual(holidays, [{"name": "New Year"}])
+        self.assertEqual(self.requests[0]["country"], "KZ")
+        self.assertEqual(self.requests[0]["year"], "2024")
+        self.assertEqual(self.requests[0]["day"], "1")
+
+    async def test_session_is_reused(self):
+        first = await calendarific.get_session()
+        second = await calendarific.get_session()
+        self.assertIs(first, second)
+
+    async def test_concurrent_requests_run_in_parallel(self):
+        start = time.monotonic()
+        results = await asyncio.gather(*(calendarific.fetch_holidays("KZ", 2024, 1, 1) for _ in range(20)))
+        elapsed = time.monotonic() - start
+        self.assertEqual(len(results), 20)
+        self.assertLess(elapsed, 1.5)
+
+    async def test_request_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await calendarific.fetch_holidays("KZ", 2024, timeout=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
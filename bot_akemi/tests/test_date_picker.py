@@ -0,0 +1,137 @@
+import sys
+import os
+import unittest
+from unittest.mock import patch, AsyncMock, MagicMock
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Update
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.keyboards as kb
+from app.bootstrap import create_dispatcher
+from app.handlers import (
+    cb_date_picker_nav, cb_personal_date_picked, cb_public_date_picked, holiday_marks, HolidayDate, STALE_PICKER_TEXT
+)
+from app.holiday_cache import holiday_cache
+from bench.fake_telegram import create_fake_bot, make_callback_update
+
+
+class TestDatePickerKeyboard(unittest.TestCase):
+    def test_month_grid(self):
+        keyboard = kb.date_picker("public", 2025, 2)
+        header, weekdays, *weeks = keyboard.inline_keyboard
+        self.assertEqual(header[1].text, "Февраль 2025")
+        self.assertEqual([button.text for button in weekdays], kb.WEEKDAY_NAMES)
+        self.assertEqual(len(weeks), 5)
+        # 1 февраля 2025 — суббота
+        self.assertEqual([button.text for button in weeks[0]], [" "] * 5 + ["1", "2"])
+        self.assertEqual(kb.DatePick.unpack(weeks[0][5].callback_data),
+                         kb.DatePick(action="day", purpose="public", year=2025, month=2, day=1))
+
+    def test_navigation_wraps_years_and_fits_limit(self):
+        header = kb.date_picker("personal", 2025, 1).inline_keyboard[0]
+        self.assertEqual(kb.DatePick.unpack(header[0].callback_data).year, 2024)
+        self.assertEqual(kb.DatePick.unpack(header[0].callback_data).month, 12)
+        header = kb.date_picker("personal", 2025, 12).inline_keyboard[0]
+        self.assertEqual((kb.DatePick.unpack(header[2].callback_data).year, kb.DatePick.unpack(header[2].callback_data).month), (2026, 1))
+        for row in kb.date_picker("personal", 2025, 12).inline_keyboard:
+            for button in row:
+                self.assertLessEqual(len(button.callback_data.encode("utf-8")), 64)
+
+    def test_keyboards_are_memoized_with_markers(self):
+        marked = kb.date_picker("public", 2025, 3, frozenset({21, 22}))
+        self.assertIs(marked, kb.date_picker("public", 2025, 3, frozenset({22, 21})))
+        self.assertIsNot(marked, kb.date_picker("public", 2025, 3))
+        texts = [button.text for row in marked.inline_keyboard[2:] for button in row]
+        self.assertIn("21•", texts)
+        self.assertIn("20", texts)
+
+    def test_navigation_stops_at_year_window(self):
+        header = kb.date_picker("public", kb.PICKER_MIN_YEAR, 1).inline_keyboard[0]
+        self.assertEqual(kb.DatePick.unpack(header[0].callback_data).action, "noop")
+        self.assertEqual(kb.DatePick.unpack(header[2].callback_data).action, "nav")
+        header = kb.date_picker("public", kb.PICKER_MAX_YEAR, 12).inline_keyboard[0]
+        self.assertEqual(kb.DatePick.unpack(header[2].callback_data).action, "noop")
+
+
+class TestDatePickerHandlers(unittest.IsolatedAsyncioTestCase):
+    def make_callback(self):
+        callback = MagicMock()
+        callback.from_user.id = 1
+        callback.answer = AsyncMock()
+        callback.message.edit_reply_markup = AsyncMock()
+        callback.message.edit_text = AsyncMock()
+        callback.message.answer = AsyncMock()
+        return callback
+
+    @patch("app.handlers.holiday_marks", new_callable=AsyncMock, return_value=frozenset({21}))
+    async def test_navigation_edits_only_markup(self, mock_marks):
+        callback = self.make_callback()
+        await cb_date_picker_nav(callback, kb.DatePick(action="nav", purpose="public", year=2025, month=3))
+        callback.message.edit_reply_markup.assert_awaited_once_with(
+            reply_markup=kb.date_picker("public", 2025, 3, frozenset({21}))
+        )
+        callback.message.edit_text.assert_not_awaited()
+        callback.message.answer.assert_not_awaited()
+
+    async def test_personal_day_pick_moves_to_name(self):
+        callback = self.make_callback()
+        state = AsyncMock()
+        await cb_personal_date_picked(callback, kb.DatePick(action="day", purpose="personal", year=2025, month=6, day=1), state)
+        state.update_data.assert_awaited_once()
+        state.set_state.assert_awaited_with(HolidayDate.waiting_for_custom_name)
+        callback.message.answer.assert_awaited_with("Введите название праздника:")
+
+    async def test_crafted_callback_data_is_rejected(self):
+        callback = self.make_callback()
+        for year, month in ((0, 12), (2025, 13), (kb.PICKER_MAX_YEAR + 1, 1)):
+            await cb_date_picker_nav(callback, kb.DatePick(action="nav", purpose="public", year=year, month=month))
+        callback.message.edit_reply_markup.assert_not_awaited()
+        state = AsyncMock()
+        await cb_personal_date_picked(callback, kb.DatePick(action="day", purpose="personal", year=2025, month=2, day=30), state)
+        await cb_public_date_picked(callback, kb.DatePick(action="day", purpose="public", year=0, month=1, day=1), state)
+        state.set_state.assert_not_awaited()
+        state.clear.assert_not_awaited()
+        callback.answer.assert_awaited_with(STALE_PICKER_TEXT)
+
+    @patch("app.handlers.rq.get_user_settings", new_callable=AsyncMock, return_value=("US", "en"))
+    @patch("app.holiday_cache.calendarific.fetch_holidays", new_callable=AsyncMock)
+    async def test_marks_come_from_cache_only(self, mock_fetch, mock_settings):
+        holiday_cache.clear()
+        self.addCleanup(holiday_cache.clear)
+        self.assertEqual(await holiday_marks(1, 2031, 7), frozenset())
+        mock_fetch.assert_not_awaited()
+        holiday_cache.put("US", 2031, [{"name": "Independence Day", "date": {"iso": "2031-07-04"}}])
+        self.assertEqual(await holiday_marks(1, 2031, 7), frozenset({4}))
+
+
+class TestDatePickerStates(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.bot = create_fake_bot()
+        self.dp = create_dispatcher(storage=MemoryStorage())
+        self.state = self.dp.fsm.get_context(self.bot, chat_id=1, user_id=1)
+
+    async def tap(self, purpose):
+        data = kb.DatePick(action="day", purpose=purpose, year=2025, month=6, day=1).pack()
+        await self.dp.feed_update(self.bot, Update.model_validate(make_callback_update(1, data)))
+
+    async def test_stale_tap_does_not_touch_other_flow(self):
+        await self.state.set_state(HolidayDate.waiting_for_custom_name)
+        await self.state.update_data(holiday_date="2025-01-01")
+        for purpose in ("public", "personal"):
+            await self.tap(purpose)
+        self.assertEqual(await self.state.get_state(), HolidayDate.waiting_for_custom_name)
+        self.assertEqual(await self.state.get_data(), {"holiday_date": "2025-01-01"})
+        answers = self.bot.session.sent("AnswerCallbackQuery")
+        self.assertEqual([answer.text for answer in answers], [STALE_PICKER_TEXT, STALE_PICKER_TEXT])
+        self.assertEqual(self.bot.session.sent("SendMessage"), [])
+
+    async def test_tap_in_matching_state_is_handled(self):
+        await self.state.set_state(HolidayDate.waiting_for_custom_date)
+        await self.tap("personal")
+        self.assertEqual(await self.state.get_state(), HolidayDate.waiting_for_custom_name)
+        self.assertEqual(self.bot.session.sent("SendMessage")[0].text, "Введите название праздника:")
+
+
+if __name__ == "__main__":
+    unittest.main()
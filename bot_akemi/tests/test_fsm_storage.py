@@ -0,0 +1,58 @@
+import sys
+import os
+import datetime
+import unittest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.fsm_storage import SQLiteStorage, dumps_data, loads_data
+from app.handlers import HolidayDate
+from tests.helpers import FakeClock, TempDatabaseMixin
+
+
+class TestSQLiteStorage(TempDatabaseMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.clock = FakeClock(1000.0)
+        self.storage = SQLiteStorage(ttl=60, database=self.database, clock=self.clock)
+        self.key = StorageKey(bot_id=42, chat_id=7, user_id=7)
+
+    def test_compact_serialization(self):
+        raw = dumps_data({"holiday_date": datetime.date(2025, 1, 1)})
+        self.assertEqual(raw, '{"holiday_date":{"$d":"2025-01-01"}}')
+        self.assertEqual(loads_data(raw), {"holiday_date": datetime.date(2025, 1, 1)})
+        self.assertIsNone(dumps_data({}))
+
+    async def test_state_survives_restart(self):
+        context = FSMContext(storage=self.storage, key=self.key)
+        await context.set_state(HolidayDate.waiting_for_custom_name)
+        await context.update_data(holiday_date=datetime.date(2025, 3, 8))
+
+        other_worker = SQLiteStorage(ttl=60, database=self.database, clock=self.clock)
+        context = FSMContext(storage=other_worker, key=self.key)
+        self.assertEqual(await context.get_state(), HolidayDate.waiting_for_custom_name.state)
+        self.assertEqual(await context.get_data(), {"holiday_date": datetime.date(2025, 3, 8)})
+
+    async def test_abandoned_dialog_expires(self):
+        await self.storage.set_state(self.key, HolidayDate.waiting_for_date)
+        self.clock.now += 61
+        self.assertIsNone(await self.storage.get_state(self.key))
+        self.assertEqual(await self.storage.purge_expired(), 1)
+
+    async def test_clear_removes_row_on_purge(self):
+        context = FSMContext(storage=self.storage, key=self.key)
+        await context.set_state(HolidayDate.waiting_for_date)
+        await context.clear()
+        self.assertIsNone(await context.get_state())
+        self.assertEqual(await self.storage.purge_expired(), 1)
+
+    async def test_keys_are_isolated(self):
+        other = StorageKey(bot_id=42, chat_id=8, user_id=8)
+        await self.storage.set_state(self.key, HolidayDate.waiting_for_date)
+        self.assertIsNone(await self.storage.get_state(other))
+
+
+if __name__ == "__main__":
+    unittest.main()
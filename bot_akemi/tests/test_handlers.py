@@ -3,43 +3,54 @@ import os
 import unittest
 from unittest.mock import patch, AsyncMock, MagicMock
 import datetime
-import requests  
+import aiohttp
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from app.handlers import (
     get_holidays_by_date,
-    translate_to_russian,
     handle_personal_date,
+    cmd_today,
+    cmd_country,
+    THROTTLED_TEXT,
     HolidayDate,
 )
+import app.keyboards as kb
+from app.calendar_view import create_delete_holiday_keyboard
+from app.holiday_cache import holiday_cache
 
 class TestHandlers(unittest.IsolatedAsyncioTestCase):
-    @patch("app.handlers.requests.get")
-    def test_get_holidays_by_date_success(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = {
-            "response": {
-                "holidays": [{"name": "Some Holiday"}]
-            }
-        }
+    def setUp(self):
+        holiday_cache.clear()
+        for target in ("get_holiday_year", "save_holiday_year"):
+            patcher = patch(f"app.holiday_cache.rq.{target}", new_callable=AsyncMock, return_value=None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Эти тесты проверяют путь через API, локальные правила для KZ отключены
+        patcher = patch("app.holiday_cache.config.HOLIDAY_RULES_ENABLED", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("app.holiday_cache.calendarific.fetch_holidays", new_callable=AsyncMock)
+    async def test_get_holidays_by_date_success(self, mock_fetch):
+        mock_fetch.return_value = [
+            {"name": "Some Holiday", "date": {"iso": "2024-01-01"}},
+            {"name": "Other Holiday", "date": {"iso": "2024-01-02"}},
+        ]
 
         date = datetime.date(2024, 1, 1)
-        holidays = get_holidays_by_date(date)
+        holidays = await get_holidays_by_date(date)
         self.assertEqual(len(holidays), 1)
         self.assertEqual(holidays[0]["name"], "Some Holiday")
+        mock_fetch.assert_awaited_with("KZ", 2024)
 
-    @patch("app.handlers.requests.get")
-    def test_get_holidays_by_date_failure(self, mock_get):
-        mock_get.side_effect = requests.RequestException("API error")
+    @patch("app.holiday_cache.calendarific.fetch_holidays", new_callable=AsyncMock)
+    async def test_get_holidays_by_date_failure(self, mock_fetch):
+        mock_fetch.side_effect = aiohttp.ClientError("API error")
         date = datetime.date(2024, 1, 1)
-        holidays = get_holidays_by_date(date)
+        holidays = await get_holidays_by_date(date)
         self.assertIsNone(holidays)
 
-    def test_translate_to_russian(self):
-        result = translate_to_russian("Hello")
-        self.assertIsInstance(result, str)
-
     @patch("app.handlers.rq.add_personal_holiday")
     async def test_handle_personal_date_valid(self, mock_add):
         message = MagicMock()
@@ -58,5 +69,61 @@ class TestHandlers(unittest.IsolatedAsyncioTestCase):
         await handle_personal_date(message, state)
         message.reply.assert_awaited_with("❌ Неверный формат даты. Попробуйте снова: дд.мм.гггг")
 
+    def test_delete_keyboard_navigation(self):
+        rows = [(1, "Birthday", "2025-06-01"), (2, "Anniversary", "2025-07-01")]
+        keyboard = create_delete_holiday_keyboard(rows, has_prev=True, has_next=True)
+        navigation = keyboard.inline_keyboard[len(rows)]
+        self.assertEqual([button.text for button in navigation], ["◀", "▶"])
+        self.assertEqual(kb.CalendarPage.unpack(navigation[0].callback_data),
+                         kb.CalendarPage(direction="prev", date="2025-06-01", id=1))
+        self.assertEqual(kb.CalendarPage.unpack(navigation[1].callback_data),
+                         kb.CalendarPage(direction="next", date="2025-07-01", id=2))
+
+    def test_delete_keyboard_callback_fits_telegram_limit(self):
+        rows = [(123456789, "Очень длинное название личного праздника " * 3, "2025-06-01")]
+        keyboard = create_delete_holiday_keyboard(rows, has_prev=True)
+        callback_data = keyboard.inline_keyboard[0][0].callback_data
+        self.assertLessEqual(len(callback_data.encode("utf-8")), 64)
+        self.assertEqual(kb.DeleteHoliday.unpack(callback_data),
+                         kb.DeleteHoliday(id=123456789, page_date="2025-06-01", page_id=123456789))
+
+    @patch("app.handlers.rq.get_user_settings", new_callable=AsyncMock, return_value=("KZ", "ru"))
+    @patch("app.holiday_cache.calendarific.fetch_holidays", new_callable=AsyncMock)
+    async def test_throttled_today_skips_network_on_cache_miss(self, mock_fetch, mock_settings):
+        message = MagicMock()
+        message.answer = AsyncMock()
+        await cmd_today(message, throttled=True)
+        mock_fetch.assert_not_awaited()
+        self.assertEqual(message.answer.await_args.args[0], THROTTLED_TEXT)
+
+    @patch("app.handlers.rq.set_user_country", new_callable=AsyncMock)
+    @patch("app.holiday_cache.calendarific.fetch_holidays", new_callable=AsyncMock, return_value=[])
+    async def test_unknown_country_keeps_old_setting(self, mock_fetch, mock_set):
+        message = MagicMock()
+        message.answer = AsyncMock()
+        await cmd_country(message, MagicMock(args="xx"))
+        mock_set.assert_not_awaited()
+        self.assertIn("не найдены", message.answer.await_args.args[0])
+        self.assertEqual(holiday_cache.stats()["size"], 0)
+
+    @patch("app.handlers.rq.set_user_country", new_callable=AsyncMock)
+    @patch("app.holiday_cache.calendarific.fetch_holidays", new_callable=AsyncMock)
+    async def test_known_country_is_saved(self, mock_fetch, mock_set):
+        mock_fetch.return_value = [{"name": "Independence Day", "date": {"iso": "2024-07-04"}}]
+        message = MagicMock()
+        message.answer = AsyncMock()
+        await cmd_country(message, MagicMock(args="us"))
+        mock_set.assert_awaited_once_with(message.from_user.id, "US")
+
+    @patch("app.handlers.rq.set_user_country", new_callable=AsyncMock)
+    @patch("app.holiday_cache.calendarific.fetch_holidays", new_callable=AsyncMock)
+    async def test_country_check_api_error(self, mock_fetch, mock_set):
+        mock_fetch.side_effect = aiohttp.ClientError("API error")
+        message = MagicMock()
+        message.answer = AsyncMock()
+        await cmd_country(message, MagicMock(args="US"))
+        mock_set.assert_not_awaited()
+        message.answer.assert_awaited_with("Не удалось проверить страну. Попробуйте позже.")
+
 if __name__ == "__main__":
     unittest.main()
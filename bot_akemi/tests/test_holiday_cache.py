@@ -0,0 +1,161 @@
+import sys
+import os
+import asyncio
+import datetime
+import time
+import unittest
+import aiohttp
+from unittest.mock import AsyncMock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.holiday_cache import (
+    HolidayCache, build_date_index, _fetch_year, reconcile_year, rules_reconciler, calendar_preloader, STORE_TTL
+)
+from app.holiday_rules import compute_year
+from tests.helpers import FakeClock
+
+HOLIDAYS_2024 = [
+    {"name": "New Year's Day", "date": {"iso": "2024-01-01"}},
+    {"name": "Nauryz", "date": {"iso": "2024-03-21"}},
+    {"name": "March Equinox", "date": {"iso": "2024-03-20T09:06:24+05:00"}},
+    {"name": "Nauryz Holiday", "date": {"iso": "2024-03-21"}},
+]
+
+
+class TestHolidayCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.fetch = AsyncMock(return_value=HOLIDAYS_2024)
+        self.cache = HolidayCache(self.fetch, ttl=60, max_years=2, clock=self.clock)
+
+    def test_build_date_index(self):
+        index = build_date_index(HOLIDAYS_2024)
+        self.assertEqual(len(index["2024-03-21"]), 2)
+        self.assertEqual(index["2024-03-20"][0]["name"], "March Equinox")
+
+    async def test_year_is_fetched_once(self):
+        first = await self.cache.get(datetime.date(2024, 1, 1), "KZ")
+        second = await self.cache.get(datetime.date(2024, 3, 21), "KZ")
+        empty = await self.cache.get(datetime.date(2024, 7, 7), "KZ")
+        self.assertEqual(first[0]["name"], "New Year's Day")
+        self.assertEqual(len(second), 2)
+        self.assertEqual(empty, [])
+        self.fetch.assert_awaited_once_with("KZ", 2024)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    async def test_ttl_expiry(self):
+        await self.cache.get(datetime.date(2024, 1, 1), "KZ")
+        self.clock.now = 61
+        await self.cache.get(datetime.date(2024, 1, 1), "KZ")
+        self.assertEqual(self.fetch.await_count, 2)
+
+    async def test_lru_eviction(self):
+        await self.cache.get_year("KZ", 2024)
+        await self.cache.get_year("KZ", 2025)
+        await self.cache.get_year("KZ", 2024)
+        await self.cache.get_year("RU", 2024)
+        self.assertEqual(self.cache.stats()["size"], 2)
+        await self.cache.get_year("KZ", 2024)
+        self.assertEqual(self.fetch.await_count, 3)
+        await self.cache.get_year("KZ", 2025)
+        self.assertEqual(self.fetch.await_count, 4)
+
+    async def test_preload_and_memory_report(self):
+        self.fetch.side_effect = [HOLIDAYS_2024, HOLIDAYS_2024, aiohttp.ClientError("down")]
+        loaded = await self.cache.preload(["KZ", "RU"], (2024,))
+        self.assertEqual(loaded, 2)
+        self.assertEqual(await self.cache.preload(["DE"], (2024,)), 0)
+
+        self.assertEqual(self.cache.peek(datetime.date(2024, 3, 21), "RU")[0]["name"], "Nauryz")
+        report = self.cache.memory_by_country()
+        self.assertEqual(set(report), {"KZ", "RU"})
+        self.assertEqual(report["KZ"]["years"], 1)
+        self.assertEqual(report["KZ"]["holidays"], 4)
+        self.assertGreater(report["KZ"]["bytes"], 0)
+
+    async def test_preload_skips_countries_that_do_not_fit(self):
+        cache = HolidayCache(self.fetch, ttl=60, max_years=8, clock=self.clock)
+        with self.assertLogs("app.holiday_cache", "WARNING") as logs:
+            loaded = await cache.preload(["KZ", "RU", "DE", "US", "TR"], (2024, 2025))
+        self.assertEqual(loaded, 6)
+        self.assertEqual(set(cache.memory_by_country()), {"KZ", "RU", "DE"})
+        self.assertIn("US, TR", logs.output[0])
+        # Оставшаяся четверть кэша не занята прогревом
+        self.assertEqual(cache.stats()["size"], 6)
+
+
+@patch("app.holiday_cache.rq.save_holiday_year", new_callable=AsyncMock)
+@patch("app.holiday_cache.calendarific.fetch_holidays", new_callable=AsyncMock)
+@patch("app.holiday_cache.rq.get_holiday_year", new_callable=AsyncMock)
+class TestPersistentStore(unittest.IsolatedAsyncioTestCase):
+    async def test_fresh_year_served_from_store(self, mock_get, mock_fetch, mock_save):
+        mock_get.return_value = (time.time(), HOLIDAYS_2024)
+        holidays = await _fetch_year("KZ", 2024)
+        self.assertEqual(holidays, HOLIDAYS_2024)
+        mock_fetch.assert_not_awaited()
+
+    async def test_missing_year_fetched_and_saved(self, mock_get, mock_fetch, mock_save):
+        mock_get.return_value = None
+        mock_fetch.return_value = HOLIDAYS_2024
+        holidays = await _fetch_year("US", 2024)
+        self.assertEqual(holidays, HOLIDAYS_2024)
+        mock_save.assert_awaited_once_with("US", 2024, HOLIDAYS_2024)
+
+    async def test_rules_country_served_without_api(self, mock_get, mock_fetch, mock_save):
+        mock_get.return_value = None
+        holidays = await _fetch_year("KZ", 2024)
+        self.assertIn({"name": "Nauryz", "date": {"iso": "2024-03-21"}, "source": "rules"}, holidays)
+        mock_fetch.assert_not_awaited()
+
+    async def test_reconciled_year_replaces_rules(self, mock_get, mock_fetch, mock_save):
+        # За пределами таблицы официальных дат API уточняет табличную дату Курбан айта (14.04.2030)
+        remote = []
+        for holiday in compute_year("KZ", 2030):
+            iso = "2030-04-13" if holiday["name"] == "Kurban Ait" else holiday["date"]["iso"]
+            remote.append({"name": holiday["name"], "date": {"iso": iso}})
+        mock_fetch.return_value = remote
+        self.assertTrue(await reconcile_year("KZ", 2030))
+        mock_save.assert_awaited_once_with("KZ", 2030, remote)
+        mock_get.return_value = (time.time(), remote)
+        self.assertEqual(await _fetch_year("KZ", 2030), remote)
+
+    async def test_empty_or_partial_api_year_does_not_replace_rules(self, mock_get, mock_fetch, mock_save):
+        for remote in ([], HOLIDAYS_2024):
+            mock_fetch.return_value = remote
+            self.assertFalse(await reconcile_year("KZ", 2024))
+        mock_save.assert_not_awaited()
+
+    async def test_stale_year_used_when_api_fails(self, mock_get, mock_fetch, mock_save):
+        mock_get.return_value = (time.time() - STORE_TTL - 1, HOLIDAYS_2024)
+        mock_fetch.side_effect = aiohttp.ClientError("down")
+        holidays = await _fetch_year("KZ", 2024)
+        self.assertEqual(holidays, HOLIDAYS_2024)
+        mock_save.assert_not_awaited()
+
+
+
+class TestBackgroundJobs(unittest.IsolatedAsyncioTestCase):
+    @patch("app.holiday_cache.rq.get_active_countries", new_callable=AsyncMock, return_value=["KZ"])
+    async def test_reconciler_survives_unexpected_error(self, mock_countries):
+        reconcile = AsyncMock(side_effect=[KeyError("date"), True, True])
+        sleep = AsyncMock(side_effect=[None, asyncio.CancelledError()])
+        with patch("app.holiday_cache.reconcile_year", reconcile), self.assertLogs("app.holiday_cache", "ERROR"):
+            with self.assertRaises(asyncio.CancelledError):
+                await rules_reconciler(interval=1, now=lambda: datetime.date(2024, 1, 1), sleep=sleep)
+        self.assertEqual(reconcile.await_count, 3)
+        self.assertEqual(sleep.await_count, 2)
+
+    @patch("app.holiday_cache.rq.get_active_countries", new_callable=AsyncMock, return_value=["KZ"])
+    async def test_preloader_survives_unexpected_error(self, mock_countries):
+        preload = AsyncMock(side_effect=[RuntimeError("db locked"), 2])
+        sleep = AsyncMock(side_effect=[None, asyncio.CancelledError()])
+        with patch("app.holiday_cache.holiday_cache.preload", preload), self.assertLogs("app.holiday_cache", "ERROR"):
+            with self.assertRaises(asyncio.CancelledError):
+                await calendar_preloader(interval=1, sleep=sleep)
+        self.assertEqual(preload.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import os
+import datetime
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.holiday_rules import (
+    western_easter,
+    orthodox_easter,
+    hijri_to_gregorian,
+    hijri_dates_in_year,
+    observed_hijri_dates,
+    compute_year,
+    has_rules,
+)
+
+
+class TestHolidayRules(unittest.TestCase):
+    def test_western_easter(self):
+        self.assertEqual(western_easter(2024), datetime.date(2024, 3, 31))
+        self.assertEqual(western_easter(2025), datetime.date(2025, 4, 20))
+        self.assertEqual(western_easter(2026), datetime.date(2026, 4, 5))
+
+    def test_orthodox_easter(self):
+        self.assertEqual(orthodox_easter(2024), datetime.date(2024, 5, 5))
+        self.assertEqual(orthodox_easter(2025), datetime.date(2025, 4, 20))
+        self.assertEqual(orthodox_easter(2026), datetime.date(2026, 4, 12))
+
+    def test_tabular_hijri_calendar(self):
+        self.assertEqual(hijri_to_gregorian(1, 1, 1), datetime.date(622, 7, 19))
+        # Табличный календарь расходится с наблюдаемым не больше чем на день
+        kurban_2024 = list(hijri_dates_in_year(2024, 12, 10))
+        self.assertEqual(len(kurban_2024), 1)
+        self.assertLessEqual(abs((kurban_2024[0] - datetime.date(2024, 6, 16)).days), 1)
+        self.assertEqual(len(list(hijri_dates_in_year(2006, 12, 10))), 2)
+
+    def test_kurban_ait_uses_official_dates(self):
+        official = {
+            2018: "2018-08-21", 2019: "2019-08-11", 2020: "2020-07-31", 2021: "2021-07-20",
+            2022: "2022-07-09", 2023: "2023-06-28", 2024: "2024-06-16", 2025: "2025-06-06",
+        }
+        for year, iso in official.items():
+            kurban = [h["date"]["iso"] for h in compute_year("KZ", year) if h["name"] == "Kurban Ait"]
+            self.assertEqual(kurban, [iso], year)
+        # Вне таблицы — табличный календарь
+        self.assertEqual(observed_hijri_dates("KZ", "Kurban Ait", 2030, 12, 10), [datetime.date(2030, 4, 14)])
+
+    def test_compute_year_for_kz(self):
+        holidays = compute_year("KZ", 2025)
+        names = {holiday["date"]["iso"]: holiday["name"] for holiday in holidays}
+        self.assertEqual(names["2025-03-21"], "Nauryz")
+        self.assertEqual(names["2025-12-16"], "Independence Day")
+        self.assertIn("Kurban Ait", names.values())
+        self.assertEqual([h["date"]["iso"] for h in holidays], sorted(h["date"]["iso"] for h in holidays))
+
+    def test_compute_year_returns_copy(self):
+        compute_year("DE", 2025).clear()
+        self.assertTrue(compute_year("DE", 2025))
+        self.assertFalse(has_rules("US"))
+        self.assertEqual(compute_year("US", 2025), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
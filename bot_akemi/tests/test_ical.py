@@ -0,0 +1,122 @@
+import sys
+import os
+import io
+import datetime
+import unittest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.async_requests as rq
+from app.ical import parse_ics, parse_csv, parse_calendar, iter_ics, unfold_lines, CalendarParseError
+from app.handlers import import_personal_calendar
+from tests.helpers import TempDatabaseMixin
+
+
+ICS = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\n"
+    "DTSTART;VALUE=DATE:20250601\r\n"
+    "SUMMARY:День рожде\r\n"
+    " ния\\, мамы\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "DTSTART:20251231T180000Z\r\n"
+    "SUMMARY:New Year Eve\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "SUMMARY:Без даты\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+class TestIcalParsing(unittest.TestCase):
+    def test_unfold_lines(self):
+        self.assertEqual(list(unfold_lines(["A:1\r\n", " 2\r\n", "B:3"])), ["A:12", "B:3"])
+
+    def test_parse_ics(self):
+        self.assertEqual(list(parse_ics(ICS.splitlines(True))), [
+            ("День рождения, мамы", datetime.date(2025, 6, 1)),
+            ("New Year Eve", datetime.date(2025, 12, 31)),
+        ])
+
+    def test_parse_csv_both_column_orders(self):
+        lines = ["name,date\n", "Birthday,01.06.2025\n", "2025-03-08;x\n", "2025-07-01,Anniversary\n", "bad,row\n"]
+        self.assertEqual(list(parse_csv(lines)), [
+            ("Birthday", datetime.date(2025, 6, 1)),
+            ("Anniversary", datetime.date(2025, 7, 1)),
+        ])
+
+    def test_parse_calendar_detects_format(self):
+        stream = io.BytesIO(ICS.encode("utf-8"))
+        self.assertEqual(len(list(parse_calendar(stream, "calendar.txt"))), 2)
+        stream = io.BytesIO("﻿Birthday;01.06.2025\n".encode("utf-8"))
+        self.assertEqual(list(parse_calendar(stream, "x.csv")), [("Birthday", datetime.date(2025, 6, 1))])
+
+    def test_parse_calendar_limit_and_errors(self):
+        parsed = parse_calendar(io.BytesIO(ICS.encode("utf-8")), "calendar.ics", limit=1)
+        self.assertEqual(len(list(parsed)), 1)
+        self.assertTrue(parsed.truncated)
+        parsed = parse_calendar(io.BytesIO(ICS.encode("utf-8")), "calendar.ics", limit=2)
+        self.assertEqual(len(list(parsed)), 2)
+        self.assertFalse(parsed.truncated)
+
+        huge = f'"{"x" * 200_000}",01.06.2025\n'.encode("utf-8")
+        with self.assertRaises(CalendarParseError):
+            list(parse_calendar(io.BytesIO(huge), "huge.csv"))
+
+    def test_export_roundtrip(self):
+        rows = [(1, "Очень длинное название праздника; с запятыми, " * 3, "2025-06-01"), (2, "Day", "2025-01-02")]
+        text = "".join(iter_ics(rows, stamp=datetime.datetime(2025, 1, 1)))
+        self.assertTrue(all(len(line.encode("utf-8")) <= 75 for line in text.split("\r\n")))
+        parsed = list(parse_ics(text.splitlines(True)))
+        self.assertEqual(parsed[0], (rows[0][1].strip(), datetime.date(2025, 6, 1)))
+        self.assertEqual(parsed[1], ("Day", datetime.date(2025, 1, 2)))
+
+
+class TestBulkPersonalHolidays(TempDatabaseMixin, unittest.IsolatedAsyncioTestCase):
+    async def test_bulk_import_and_chunked_export(self):
+        holidays = ((f"Day {i}", datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 10)) for i in range(25))
+        self.assertEqual(await rq.add_personal_holidays_bulk(1, holidays), 25)
+        await rq.add_personal_holiday(2, "Other", "2025-01-01")
+
+        chunks = [rows async for rows in rq.iter_personal_holidays(1, chunk_size=10)]
+        self.assertEqual([len(rows) for rows in chunks], [10, 10, 5])
+        rows = [row for chunk in chunks for row in chunk]
+        self.assertEqual(len({row[0] for row in rows}), 25)
+        self.assertEqual(rows, sorted(rows, key=lambda row: (row[2], row[0])))
+
+    def make_message(self, data, file_name):
+        message = MagicMock()
+        message.from_user.id = 1
+        message.document.file_name = file_name
+        message.document.file_size = len(data)
+        message.answer = AsyncMock()
+        message.reply = AsyncMock()
+        bot = MagicMock()
+        bot.download = AsyncMock(return_value=io.BytesIO(data))
+        return message, bot
+
+    async def test_import_reports_parse_error_and_keeps_calendar(self):
+        await rq.add_personal_holiday(1, "Existing", "2025-01-01")
+        data = ("Birthday,01.06.2025\n" + f'"{"x" * 200_000}",02.06.2025\n').encode("utf-8")
+        message, bot = self.make_message(data, "broken.csv")
+        await import_personal_calendar(message, bot)
+        self.assertIn("Не удалось разобрать файл", message.reply.await_args.args[0])
+        rows = [row async for chunk in rq.iter_personal_holidays(1) for row in chunk]
+        self.assertEqual([row[1] for row in rows], ["Existing"])
+
+    async def test_import_reports_truncation(self):
+        data = "".join(f"Day {i},01.06.2025\n" for i in range(3)).encode("utf-8")
+        message, bot = self.make_message(data, "days.csv")
+        with patch("app.handlers.parse_calendar", lambda stream, name: parse_calendar(stream, name, limit=2)):
+            await import_personal_calendar(message, bot)
+        text = message.answer.await_args.args[0]
+        self.assertIn("Импортировано праздников: 2", text)
+        self.assertIn("больше 2", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import sqlite3
 from app.database import create_db, db_path
 from app.requests import add_user, add_personal_holiday, get_personal_holidays, delete_personal_holiday, delete_all_personal_holidays
+from app.requests import get_holiday_year, save_holiday_year
 
 
 class TestDatabaseAndRequests(unittest.TestCase):
@@ -17,6 +18,8 @@ class TestDatabaseAndRequests(unittest.TestCase):
         cursor = conn.cursor()
         cursor.execute('DELETE FROM personal_holidays')
         cursor.execute('DELETE FROM users')
+        cursor.execute("DELETE FROM public_holidays WHERE country_code = 'XX'")
+        cursor.execute("DELETE FROM holiday_years WHERE country_code = 'XX'")
         conn.commit()
         conn.close()
 
@@ -93,6 +96,26 @@ class TestDatabaseAndRequests(unittest.TestCase):
 
         conn.close()
 
+    def test_save_and_get_holiday_year(self):
+        """Тестируем сохранение и чтение года публичных праздников"""
+        self.assertIsNone(get_holiday_year('XX', 2025))
+        save_holiday_year('XX', 2025, [
+            {'name': 'New Year', 'description': 'First day', 'date': {'iso': '2025-01-01'}, 'type': ['National holiday']},
+            {'name': 'Equinox', 'date': {'iso': '2025-03-20T09:01:00+05:00'}, 'type': []},
+        ], fetched_at=100.0)
+        save_holiday_year('XX', 2026, [{'name': 'Next', 'date': {'iso': '2026-01-01'}}], fetched_at=200.0)
+
+        fetched_at, holidays = get_holiday_year('XX', 2025)
+        self.assertEqual(fetched_at, 100.0)
+        self.assertEqual([h['name'] for h in holidays], ['New Year', 'Equinox'])
+        self.assertEqual(holidays[0]['type'], ['National holiday'])
+        self.assertEqual(holidays[1]['date']['iso'], '2025-03-20')
+
+        save_holiday_year('XX', 2025, [{'name': 'Only', 'date': {'iso': '2025-05-01'}}], fetched_at=300.0)
+        fetched_at, holidays = get_holiday_year('XX', 2025)
+        self.assertEqual(fetched_at, 300.0)
+        self.assertEqual([h['name'] for h in holidays], ['Only'])
+
 
 if __name__ == "__main__":
     unittest.main()
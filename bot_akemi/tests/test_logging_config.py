@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+import logging
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.logging_config as logging_config
+from app.logging_config import BufferedFileHandler
+
+
+def read(path):
+    if not os.path.exists(path):
+        return ""
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class TestBufferedFileHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "test.log")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_flush_on_capacity(self):
+        handler = BufferedFileHandler(self.path, capacity=3, flush_interval=60)
+        logger = logging.getLogger("tests.buffered")
+        logger.propagate = False
+        logger.addHandler(handler)
+        try:
+            logger.warning("one")
+            logger.warning("two")
+            self.assertEqual(read(self.path), "")
+            logger.warning("three")
+            self.assertEqual(read(self.path), "one\ntwo\nthree\n")
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+
+class TestLoggingPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_dir = os.path.join(self.tmp_dir.name, "logs")
+        self.report_dir = os.path.join(self.tmp_dir.name, "reports")
+        logging_config.setup_logging(log_dir=self.log_dir, report_dir=self.report_dir, console=False)
+
+    def tearDown(self):
+        logging_config.shutdown_logging()
+        self.tmp_dir.cleanup()
+
+    def test_records_routed_to_all_sinks(self):
+        logging.getLogger("app.handlers").info("Команда /start")
+        logging.getLogger("app.other").info("Другое сообщение")
+        logging_config.flush_logging()
+
+        main_log = read(os.path.join(self.log_dir, "main.log"))
+        handlers_log = read(os.path.join(self.log_dir, "handlers.log"))
+        report = read(os.path.join(self.report_dir, "report.html"))
+        self.assertIn("app.handlers: Команда /start", main_log)
+        self.assertIn("Другое сообщение", main_log)
+        self.assertIn("[INFO] Команда /start", handlers_log)
+        self.assertNotIn("Другое сообщение", handlers_log)
+        self.assertIn("<i>app.handlers</i>: Команда /start<br>", report)
+
+    def test_idle_queue_flushes_by_time(self):
+        logging.getLogger("app.database").info("Запись")
+        deadline = time.monotonic() + logging_config.FLUSH_INTERVAL * 5
+        while "Запись" not in read(os.path.join(self.log_dir, "database.log")) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertIn("Запись", read(os.path.join(self.log_dir, "database.log")))
+
+    def test_setup_is_idempotent(self):
+        listener = logging_config.setup_logging(log_dir=self.log_dir, report_dir=self.report_dir, console=False)
+        self.assertIs(listener, logging_config._listener)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.database as db
+import app.migrations as migrations
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "holidays.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_existing_database_upgraded_in_place(self):
+        """Старая база без индексов обновляется, данные сохраняются"""
+        conn = sqlite3.connect(self.path)
+        conn.execute('''
+            CREATE TABLE personal_holidays (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                holiday_name TEXT NOT NULL,
+                holiday_date DATE NOT NULL
+            )
+        ''')
+        conn.execute("INSERT INTO personal_holidays (user_id, holiday_name, holiday_date) VALUES (1, 'Day', '2025-01-01')")
+        conn.commit()
+        conn.close()
+
+        with patch("app.database.db_path", self.path):
+            db.create_db()
+
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(migrations.schema_version(conn), len(migrations.MIGRATIONS))
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM personal_holidays").fetchone()[0], 1)
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM personal_holidays WHERE user_id = ? AND holiday_name = ?", (1, "Day")
+        ).fetchall()
+        self.assertIn("idx_personal_holidays_user_name", str(plan))
+        conn.close()
+
+    def test_migrate_is_idempotent(self):
+        with patch("app.database.db_path", self.path):
+            db.create_db()
+            db.create_db()
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(migrations.migrate(conn), len(migrations.MIGRATIONS))
+        conn.close()
+
+    def test_failed_migration_rolls_back(self):
+        conn = sqlite3.connect(self.path)
+        with patch.object(migrations, "MIGRATIONS", [["CREATE TABLE t (x)", "CREATE TABLE t (x)"]]):
+            with self.assertRaises(sqlite3.Error):
+                migrations.migrate(conn)
+        self.assertEqual(migrations.schema_version(conn), 0)
+        self.assertIsNone(conn.execute("SELECT name FROM sqlite_master WHERE name = 't'").fetchone())
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import sys
+import os
+import datetime
+import unittest
+from unittest.mock import patch, AsyncMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.async_requests as rq
+from app.range_index import RangeIndex, PersonalRanges, PersonalVersions
+from app.holiday_cache import HolidayCache
+from tests.helpers import FakeClock, TempDatabaseMixin
+
+HOLIDAYS = {
+    2024: [
+        {"name": "Nauryz", "date": {"iso": "2024-03-21"}},
+        {"name": "Independence Day", "date": {"iso": "2024-12-16"}},
+        {"name": "New Year Eve", "date": {"iso": "2024-12-31"}},
+    ],
+    2025: [
+        {"name": "New Year's Day", "date": {"iso": "2025-01-01"}},
+        {"name": "New Year Holiday", "date": {"iso": "2025-01-02"}},
+    ],
+}
+
+
+class TestRangeIndex(unittest.TestCase):
+    def test_range_after_and_updates(self):
+        index = RangeIndex([("03-21", "b"), ("01-01", "a"), ("12-16", "c")])
+        self.assertEqual(index.range("01-01", "03-31"), [("01-01", "a"), ("03-21", "b")])
+        self.assertEqual(index.after("03-22", 5), [("12-16", "c")])
+        index.add("03-21", "b2")
+        self.assertEqual([value for _, value in index.range("03-21", "03-21")], ["b", "b2"])
+        self.assertTrue(index.remove("03-21", "b"))
+        self.assertFalse(index.remove("03-21", "missing"))
+        self.assertEqual(len(index), 3)
+
+
+class TestHolidayCacheRanges(unittest.IsolatedAsyncioTestCase):
+    async def test_range_spans_years(self):
+        cache = HolidayCache(AsyncMock(side_effect=lambda country, year: HOLIDAYS[year]))
+        result = await cache.get_range(datetime.date(2024, 12, 10), datetime.date(2025, 1, 1), "KZ")
+        self.assertEqual([holiday["name"] for _, holiday in result], ["Independence Day", "New Year Eve", "New Year's Day"])
+        upcoming = await cache.upcoming(datetime.date(2024, 12, 20), 2, "KZ")
+        self.assertEqual([iso for iso, _ in upcoming], ["2024-12-31", "2025-01-01"])
+
+
+class TestPersonalRanges(TempDatabaseMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.ranges = PersonalRanges()
+
+    async def test_yearly_ranges_with_incremental_updates(self):
+        birthday = await rq.add_personal_holiday(1, "Birthday", "1990-12-30")
+        await rq.add_personal_holiday(1, "Anniversary", "2015-01-03")
+        await rq.add_personal_holiday(2, "Foreign", "2015-01-01")
+
+        week = await self.ranges.between(1, datetime.date(2024, 12, 28), datetime.date(2025, 1, 3))
+        self.assertEqual([(date, row[1]) for date, row in week], [
+            (datetime.date(2024, 12, 30), "Birthday"),
+            (datetime.date(2025, 1, 3), "Anniversary"),
+        ])
+
+        holiday_id = await rq.add_personal_holiday(1, "Name day", "2000-12-31")
+        self.ranges.add(1, (holiday_id, "Name day", "2000-12-31"))
+        self.ranges.remove(1, birthday)
+        with patch("app.range_index.rq.iter_personal_holidays") as mock_iter:
+            upcoming = await self.ranges.upcoming(1, datetime.date(2024, 12, 31), 3)
+        mock_iter.assert_not_called()
+        self.assertEqual([(date, row[1]) for date, row in upcoming], [
+            (datetime.date(2024, 12, 31), "Name day"),
+            (datetime.date(2025, 1, 3), "Anniversary"),
+            (datetime.date(2025, 12, 31), "Name day"),
+        ])
+
+    async def test_changes_from_other_process_seen_after_recheck_interval(self):
+        clock = FakeClock()
+        ranges = PersonalRanges(versions=PersonalVersions(interval=5, clock=clock))
+        await rq.add_personal_holiday(1, "Birthday", "1990-12-30")
+        holiday_id = await rq.add_personal_holiday(1, "Anniversary", "2015-12-31")
+        window = (datetime.date(2024, 12, 1), datetime.date(2024, 12, 31))
+        self.assertEqual(len(await ranges.between(1, *window)), 2)
+
+        # Другой воркер удаляет один праздник и добавляет другой прямо в БД
+        await rq.delete_personal_holiday_by_id(1, holiday_id)
+        await rq.add_personal_holiday(1, "Name day", "2000-12-01")
+        self.assertEqual(len(await ranges.between(1, *window)), 2)
+        clock.now = 5
+        names = [row[1] for _, row in await ranges.between(1, *window)]
+        self.assertEqual(names, ["Name day", "Birthday"])
+
+        # Свои правки не считаются чужими и не вызывают перечитывания
+        own_id = await rq.add_personal_holiday(1, "Own", "2001-12-02")
+        ranges.add(1, (own_id, "Own", "2001-12-02"))
+        clock.now = 10
+        with patch("app.range_index.rq.iter_personal_holidays") as mock_iter:
+            self.assertEqual(len(await ranges.between(1, *window)), 3)
+        mock_iter.assert_not_called()
+
+    async def test_leap_day_shown_on_28_february(self):
+        await rq.add_personal_holiday(1, "Leap birthday", "2000-02-29")
+        february = await self.ranges.between(1, datetime.date(2025, 2, 1), datetime.date(2025, 2, 28))
+        self.assertEqual([(date, row[1]) for date, row in february], [(datetime.date(2025, 2, 28), "Leap birthday")])
+        leap_february = await self.ranges.between(1, datetime.date(2024, 2, 1), datetime.date(2024, 2, 28))
+        self.assertEqual(leap_february, [])
+        leap_day = await self.ranges.between(1, datetime.date(2024, 2, 29), datetime.date(2024, 2, 29))
+        self.assertEqual([date for date, _ in leap_day], [datetime.date(2024, 2, 29)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import sys
+import os
+import sqlite3
+import datetime
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.async_requests as rq
+from app.ratelimit import TokenBucket
+from app.reminders import ReminderScheduler, send_due_reminders, month_days_for
+from bench.fake_telegram import create_fake_bot
+from tests.helpers import FakeClock, TempDatabaseMixin
+
+
+class TestReminders(TempDatabaseMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        await rq.add_personal_holiday(1, "День рождения", datetime.date(1990, 5, 20))
+        await rq.add_personal_holiday(1, "Годовщина", datetime.date(2015, 5, 20))
+        await rq.add_personal_holiday(2, "Именины", datetime.date(2001, 5, 21))
+        await rq.add_personal_holiday(3, "Високосный", datetime.date(2000, 2, 29))
+        self.bot = create_fake_bot()
+        self.bucket = TokenBucket(rate=10_000)
+
+    def test_query_uses_month_day_index(self):
+        conn = sqlite3.connect(self.path)
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT user_id FROM personal_holidays WHERE substr(holiday_date, 6, 5) IN (?, ?)",
+            ("05-20", "05-21"),
+        ).fetchall()
+        conn.close()
+        self.assertIn("idx_personal_holidays_month_day", str(plan))
+
+    def test_month_days_for_leap_day(self):
+        self.assertEqual(month_days_for(datetime.date(2025, 2, 28)), ["02-28", "02-29"])
+        self.assertEqual(month_days_for(datetime.date(2024, 2, 28)), ["02-28"])
+
+    async def test_one_message_per_user(self):
+        sent = await send_due_reminders(self.bot, datetime.date(2030, 5, 20), 0, bucket=self.bucket)
+        self.assertEqual(sent, 1)
+        message = self.bot.session.sent("SendMessage")[0]
+        self.assertEqual(message.chat_id, 1)
+        self.assertIn("«День рождения», «Годовщина»", message.text)
+
+    async def test_leap_day_reminded_on_feb_28(self):
+        await send_due_reminders(self.bot, datetime.date(2025, 2, 28), 0, bucket=self.bucket)
+        self.assertEqual([m.chat_id for m in self.bot.session.sent("SendMessage")], [3])
+
+    async def test_chunks_keep_user_holidays_together(self):
+        await rq.add_personal_holiday(4, "Свадьба", datetime.date(2010, 5, 20))
+        chunks = [chunk async for chunk in rq.iter_personal_holidays_by_month_day(["05-20"], chunk_size=1)]
+        self.assertEqual([[row[0] for row in chunk] for chunk in chunks], [[1, 1], [4]])
+
+    async def test_cursor_prevents_resend_and_resumes(self):
+        await rq.add_personal_holiday(4, "Свадьба", datetime.date(2010, 5, 20))
+        await rq.save_reminder_cursor("2030-05-20", 0, 1, 1, 0)
+        sent = await send_due_reminders(self.bot, datetime.date(2030, 5, 20), 0, bucket=self.bucket, chunk_size=1)
+        self.assertEqual(sent, 2)
+        self.assertEqual([m.chat_id for m in self.bot.session.sent("SendMessage")], [4])
+        self.assertTrue((await rq.get_reminder_cursor("2030-05-20", 0))["finished"])
+
+        await send_due_reminders(self.bot, datetime.date(2030, 5, 20), 0, bucket=self.bucket)
+        self.assertEqual(len(self.bot.session.sent("SendMessage")), 1)
+
+    async def test_scheduler_catches_up_after_restart(self):
+        clock = FakeClock(datetime.datetime(2030, 5, 20, 12, 0))
+        scheduler = ReminderScheduler(self.bot, at=datetime.time(10, 0), lead_days=[0], now=clock, sleep=clock.sleep)
+        scheduler.start()
+        await scheduler.run_pending()
+        self.assertEqual([m.chat_id for m in self.bot.session.sent("SendMessage")], [1])
+        self.assertEqual(scheduler._heap[0][0], datetime.datetime(2030, 5, 21, 10, 0))
+
+    async def test_scheduler_fires_each_lead_once_per_day(self):
+        clock = FakeClock(datetime.datetime(2030, 5, 19, 8, 0))
+        scheduler = ReminderScheduler(self.bot, at=datetime.time(10, 0), lead_days=[0, 1], now=clock, sleep=clock.sleep)
+        scheduler.start()
+        self.assertEqual(len(scheduler._heap), 2)
+
+        for _ in range(2):
+            await clock.sleep((scheduler._heap[0][0] - clock()).total_seconds())
+            await scheduler.run_pending()
+
+        texts = [(m.chat_id, m.text.split(":")[0]) for m in self.bot.session.sent("SendMessage")]
+        # 19.05: за день — пользователь 1 (20.05); 20.05: сегодня — пользователь 1, за день — пользователь 2
+        self.assertEqual(texts, [
+            (1, "🔔 Завтра ваш праздник"),
+            (1, "🔔 Сегодня ваш праздник"),
+            (2, "🔔 Завтра ваш праздник"),
+        ])
+        self.assertEqual(len(scheduler._heap), 2)
+        self.assertEqual(scheduler._heap[0][0], datetime.datetime(2030, 5, 21, 10, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
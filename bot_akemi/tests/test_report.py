@@ -0,0 +1,77 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.report as report
+from app.report import generate_html_report, FOOTER
+
+
+class TestReport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp_dir.name, "main.log")
+        self.output_path = os.path.join(self.tmp_dir.name, "final_report.html")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def append_log(self, text):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def read_report(self):
+        with open(self.output_path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_full_report(self):
+        self.append_log("2025-04-19 12:00:00,001 [INFO] app.handlers: Команда <b>/start</b>\n")
+        self.append_log("2025-04-19 12:00:01,002 [ERROR] __main__: Ошибка\n")
+        self.append_log("Traceback (most recent call last):\n")
+        generate_html_report(self.log_path, self.output_path)
+
+        content = self.read_report()
+        self.assertTrue(content.endswith(FOOTER))
+        self.assertIn("<td>2025-04-19 12:00:00,001</td><td class='INFO'>INFO</td>", content)
+        self.assertIn("Команда &lt;b&gt;/start&lt;/b&gt;", content)
+        self.assertIn("<pre>Traceback (most recent call last):</pre>", content)
+
+    def test_incremental_run_renders_only_new_lines(self):
+        self.append_log("2025-04-19 12:00:00,001 [INFO] a: first\n")
+        generate_html_report(self.log_path, self.output_path)
+        self.append_log("2025-04-19 12:00:02,001 [INFO] a: second\n2025-04-19 12:00:03,001 [WARNING] a: par")
+
+        with patch("app.report.render_row", wraps=report.render_row) as render_row:
+            generate_html_report(self.log_path, self.output_path)
+        self.assertEqual(render_row.call_count, 1)
+
+        self.append_log("tial\n")
+        generate_html_report(self.log_path, self.output_path)
+
+        incremental = self.read_report()
+        os.remove(self.output_path + ".offset")
+        generate_html_report(self.log_path, self.output_path)
+        self.assertEqual(incremental, self.read_report())
+        self.assertIn("partial", incremental)
+        self.assertEqual(incremental.count("<tr><td>"), 3)
+
+    def test_truncated_log_rebuilds_report(self):
+        self.append_log("2025-04-19 12:00:00,001 [INFO] a: old entry\n" * 3)
+        generate_html_report(self.log_path, self.output_path)
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            f.write("2025-04-19 13:00:00,001 [INFO] a: new\n")
+        generate_html_report(self.log_path, self.output_path)
+        content = self.read_report()
+        self.assertNotIn("old entry", content)
+        self.assertIn("new", content)
+
+    def test_missing_log(self):
+        generate_html_report(self.log_path, self.output_path)
+        self.assertFalse(os.path.exists(self.output_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import sys
+import os
+import time
+import datetime
+import unittest
+from unittest.mock import patch, AsyncMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.async_requests as rq
+from app.holiday_cache import HolidayCache
+from app.search import TrigramIndex, HolidaySearch, normalize
+from tests.helpers import FakeClock, TempDatabaseMixin
+
+HOLIDAYS = [
+    {"name": "New Year's Day", "date": {"iso": "2025-01-01"}},
+    {"name": "Nauryz", "date": {"iso": "2025-03-21"}},
+]
+TRANSLATIONS = {"New Year's Day": "Новый год", "Nauryz": "Наурыз"}
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def test_prefix_search_and_updates(self):
+        index = TrigramIndex()
+        index.add(1, "Новый год", "new_year")
+        index.add(2, "День рождения Ёлки", "birthday")
+        index.add(3, "Годовщина", "anniversary")
+        self.assertEqual(index.search("но"), ["new_year"])
+        self.assertEqual(index.search("ГОД"), ["anniversary", "new_year"])
+        self.assertEqual(index.search("елк"), ["birthday"])
+        self.assertEqual(index.search("рожд день"), ["birthday"])
+        self.assertEqual(index.search("овый"), [])
+        index.remove(1)
+        self.assertEqual(index.search("год"), ["anniversary"])
+        index.add(3, "Выпускной", "graduation")
+        self.assertEqual(index.search("годов"), [])
+        self.assertEqual(normalize("  Новый-ГОД! "), "новый год")
+
+    def test_search_is_fast_on_large_index(self):
+        index = TrigramIndex()
+        for i in range(20_000):
+            index.add(i, f"Праздник номер {i} семьи", i)
+        started = time.perf_counter()
+        result = index.search("праздник 1999")
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertIn(1999, result)
+
+
+class TestHolidaySearch(TempDatabaseMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        cache = HolidayCache(AsyncMock(return_value=HOLIDAYS))
+        translate = AsyncMock(side_effect=lambda texts, target: [TRANSLATIONS[text] for text in texts])
+        for target, value in (
+            ("app.search.holiday_cache", cache),
+            ("app.search.translate_many", translate),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.search = HolidaySearch()
+        self.today = datetime.date(2025, 6, 1)
+
+    async def test_public_and_personal_results(self):
+        await rq.add_personal_holiday(1, "Новоселье", "2025-05-05")
+        result = await self.search.search(1, "нов", today=self.today)
+        self.assertEqual(result, [("⭐", "Новоселье", "2025-05-05"), ("🎉", "Новый год", "2025-01-01")])
+        self.assertEqual(await self.search.search(1, "nauryz", today=self.today), [("🎉", "Наурыз", "2025-03-21")])
+
+    async def test_answers_cached_and_invalidated_incrementally(self):
+        await self.search.search(1, "юбилей", today=self.today)
+        self.assertEqual(await self.search.search(1, "юбилей", today=self.today), [])
+        self.assertEqual(self.search.stats()["hits"], 1)
+
+        holiday_id = await rq.add_personal_holiday(1, "Юбилей", "2025-09-09")
+        self.search.add_personal(1, holiday_id, "Юбилей", "2025-09-09")
+        with patch("app.search.rq.iter_personal_holidays") as mock_iter:
+            self.assertEqual(await self.search.search(1, "юбилей", today=self.today), [("⭐", "Юбилей", "2025-09-09")])
+            self.search.remove_personal(1, holiday_id)
+            self.assertEqual(await self.search.search(1, "юбилей", today=self.today), [])
+        mock_iter.assert_not_called()
+
+
+    async def test_changes_from_other_process_seen_after_recheck_interval(self):
+        clock = FakeClock()
+        search = HolidaySearch(clock=clock)
+        await rq.add_personal_holiday(1, "Юбилей", "2025-09-09")
+        self.assertEqual(await search.search(1, "юбилей", today=self.today), [("⭐", "Юбилей", "2025-09-09")])
+
+        # Другой воркер удаляет праздник прямо в БД: кэшированный ответ живёт не дольше интервала сверки
+        await rq.delete_all_personal_holidays(1)
+        self.assertEqual(len(await search.search(1, "юбилей", today=self.today)), 1)
+        clock.now = 5
+        self.assertEqual(await search.search(1, "юбилей", today=self.today), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
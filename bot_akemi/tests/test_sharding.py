@@ -0,0 +1,107 @@
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock, MagicMock
+from aiogram.exceptions import TelegramNetworkError, TelegramServerError
+from aiogram.methods import GetUpdates
+from aiogram.types import Update
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.sharding import (
+    update_user_id, shard_for, UserOrderedExecutor, poll_updates, run_sharded_polling, POLLING_BACKOFF_MAX
+)
+from bench.fake_telegram import make_message_update
+
+
+class TestRouting(unittest.TestCase):
+    def test_update_user_id(self):
+        self.assertEqual(update_user_id(make_message_update(77, "/start")), 77)
+        callback = {"update_id": 1, "callback_query": {"id": "1", "from": {"id": 5}, "chat_instance": "x"}}
+        self.assertEqual(update_user_id(callback), 5)
+        self.assertEqual(update_user_id({"update_id": 2}), 0)
+
+    def test_same_user_same_shard(self):
+        shards = {shard_for(update_user_id(make_message_update(123, text)), 4) for text in ("a", "b", "c")}
+        self.assertEqual(len(shards), 1)
+        self.assertEqual({shard_for(user_id, 4) for user_id in range(100)}, {0, 1, 2, 3})
+
+
+class TestUserOrderedExecutor(unittest.IsolatedAsyncioTestCase):
+    async def test_per_user_order_and_cross_user_concurrency(self):
+        executor = UserOrderedExecutor()
+        events = []
+        active = {"count": 0, "peak": 0}
+
+        async def job(user_id, n):
+            active["count"] += 1
+            active["peak"] = max(active["peak"], active["count"])
+            await asyncio.sleep(0.01 * (3 - n))
+            events.append((user_id, n))
+            active["count"] -= 1
+
+        for n in range(3):
+            for user_id in (1, 2):
+                executor.submit(user_id, lambda user_id=user_id, n=n: job(user_id, n))
+        await executor.drain()
+
+        self.assertEqual([n for user_id, n in events if user_id == 1], [0, 1, 2])
+        self.assertEqual([n for user_id, n in events if user_id == 2], [0, 1, 2])
+        self.assertEqual(active["peak"], 2)
+        self.assertEqual(executor._locks, {})
+
+    async def test_failure_does_not_block_user(self):
+        executor = UserOrderedExecutor()
+        done = []
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        async def ok():
+            done.append(True)
+
+        executor.submit(1, broken)
+        executor.submit(1, ok)
+        await executor.drain()
+        self.assertEqual(done, [True])
+
+
+class TestPolling(unittest.IsolatedAsyncioTestCase):
+    async def test_network_errors_are_retried_with_backoff(self):
+        method = GetUpdates()
+        update = Update.model_validate(make_message_update(7, "/start"))
+        bot = MagicMock()
+        bot.get_updates = AsyncMock(side_effect=[
+            TelegramNetworkError(method, "timeout"),
+            TelegramServerError(method, "bad gateway"),
+            TelegramNetworkError(method, "timeout"),
+            TelegramNetworkError(method, "timeout"),
+            [update],
+            asyncio.CancelledError(),
+        ])
+        supervisor = MagicMock()
+        sleep = AsyncMock()
+        with self.assertRaises(asyncio.CancelledError):
+            await poll_updates(bot, supervisor, sleep=sleep)
+        delays = [call.args[0] for call in sleep.await_args_list]
+        self.assertEqual(delays, [1.0, 2.0, 4.0, POLLING_BACKOFF_MAX])
+        supervisor.route.assert_called_once()
+        self.assertEqual(bot.get_updates.await_args_list[-1].kwargs["offset"], update.update_id + 1)
+
+
+    async def test_supervisor_releases_resources_on_exit(self):
+        bot = MagicMock()
+        bot.delete_webhook = AsyncMock()
+        with patch("app.sharding.db.create_db"), patch("app.sharding.Supervisor") as supervisor, \
+                patch("app.sharding.poll_updates", AsyncMock(side_effect=asyncio.CancelledError())), \
+                patch("app.bootstrap.start_background_jobs"), \
+                patch("app.bootstrap.on_shutdown", new_callable=AsyncMock) as on_shutdown:
+            with self.assertRaises(asyncio.CancelledError):
+                await run_sharded_polling(bot, 2)
+        supervisor.return_value.stop.assert_called_once()
+        on_shutdown.assert_awaited_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import os
+import asyncio
+import datetime
+import unittest
+from unittest.mock import AsyncMock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.singleflight import SingleFlight
+from app.holiday_cache import HolidayCache
+from app.translation import TranslationMemo
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_task(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flights.do("key", load) for _ in range(10)))
+        self.assertEqual(results, ["value"] * 10)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flights.stats(), {"calls": 1, "shared": 9, "in_flight": 0})
+
+    async def test_error_is_shared_and_not_cached(self):
+        flights = SingleFlight()
+        failing = AsyncMock(side_effect=ValueError("boom"))
+        results = await asyncio.gather(flights.do("key", failing), flights.do("key", failing), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        failing.side_effect = None
+        failing.return_value = 1
+        self.assertEqual(await flights.do("key", failing), 1)
+
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        flights = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.02)
+            return 42
+
+        first = asyncio.ensure_future(flights.do("key", load))
+        second = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, 42)
+
+    async def test_do_many_batches_only_missing_keys(self):
+        flights = SingleFlight()
+        batches = []
+
+        async def load(keys):
+            batches.append(list(keys))
+            await asyncio.sleep(0.01)
+            return {key: key.upper() for key in keys}
+
+        first, second = await asyncio.gather(flights.do_many(["a", "b"], load), flights.do_many(["b", "c"], load))
+        self.assertEqual(first, {"a": "A", "b": "B"})
+        self.assertEqual(second, {"b": "B", "c": "C"})
+        self.assertEqual(batches, [["a", "b"], ["c"]])
+
+
+class TestCoalescedLookups(unittest.IsolatedAsyncioTestCase):
+    async def test_holiday_year_fetched_once_under_burst(self):
+        async def fetch(country_code, year):
+            await asyncio.sleep(0.01)
+            return [{"name": "Nauryz", "date": {"iso": f"{year}-03-21"}}]
+
+        fetch_mock = AsyncMock(side_effect=fetch)
+        cache = HolidayCache(fetch_mock)
+        date = datetime.date(2025, 3, 21)
+        results = await asyncio.gather(*(cache.get(date, "KZ") for _ in range(50)))
+        self.assertTrue(all(result[0]["name"] == "Nauryz" for result in results))
+        fetch_mock.assert_awaited_once_with("KZ", 2025)
+        self.assertEqual(cache.stats()["shared"], 49)
+
+    async def test_identical_translations_share_one_batch(self):
+        calls = []
+
+        def fake_translate(texts, target):
+            calls.append(list(texts))
+            return [f"{target}:{text}" for text in texts]
+
+        memo = TranslationMemo(translate=fake_translate)
+        with patch("app.translation.rq.get_translations", new_callable=AsyncMock, return_value={}), \
+             patch("app.translation.rq.save_translations", new_callable=AsyncMock):
+            results = await asyncio.gather(*(memo.translate_many(["New Year", "Nauryz"]) for _ in range(20)))
+        self.assertTrue(all(result == ["ru:New Year", "ru:Nauryz"] for result in results))
+        self.assertEqual(calls, [["New Year", "Nauryz"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.translation import TranslationMemo, translate_batch
+
+
+class TestTranslationMemo(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.calls = []
+
+        def fake_translate(texts, target):
+            self.calls.append(list(texts))
+            return [f"{target}:{text}" for text in texts]
+
+        self.memo = TranslationMemo(max_size=2, translate=fake_translate)
+        self.stored = {}
+        get = patch("app.translation.rq.get_translations", new_callable=AsyncMock, side_effect=lambda texts, target: {
+            text: self.stored[(text, target)] for text in texts if (text, target) in self.stored
+        })
+        save = patch("app.translation.rq.save_translations", new_callable=AsyncMock, side_effect=lambda pairs, target: self.stored.update(
+            {(text, target): value for text, value in pairs}
+        ))
+        for patcher in (get, save):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_misses_are_translated_in_one_batch(self):
+        result = await self.memo.translate_many(["New Year", "Nauryz", "New Year"])
+        self.assertEqual(result, ["ru:New Year", "ru:Nauryz", "ru:New Year"])
+        self.assertEqual(self.calls, [["New Year", "Nauryz"]])
+        # Повтор во входном списке — не попадание в память
+        self.assertEqual(self.memo.stats()["hits"], 0)
+
+    async def test_repeated_lookups_hit_memo(self):
+        await self.memo.translate_many(["New Year"])
+        await self.memo.translate_many(["New Year"])
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.memo.stats()["hits"], 1)
+
+    async def test_persistent_store_survives_memo_eviction(self):
+        await self.memo.translate_many(["A", "B", "C"])
+        self.assertIsNone(self.memo.get("A", "ru"))
+        result = await self.memo.translate_many(["A"])
+        self.assertEqual(result, ["ru:A"])
+        self.assertEqual(len(self.calls), 1)
+
+    async def test_failed_translation_returns_source(self):
+        self.memo._translate = MagicMock(side_effect=RuntimeError("offline"))
+        result = await self.memo.translate_many(["Hello"])
+        self.assertEqual(result, ["Hello"])
+        self.assertNotIn(("Hello", "ru"), self.stored)
+
+
+class TestTranslateBatch(unittest.TestCase):
+    @patch("app.translation.get_translator")
+    def test_joined_request(self, mock_get):
+        translator = mock_get.return_value
+        translator.translate.return_value = "Новый год\nНаурыз"
+        self.assertEqual(translate_batch(["New Year", "Nauryz"]), ["Новый год", "Наурыз"])
+        translator.translate.assert_called_once_with("New Year\nNauryz")
+
+    @patch("app.translation.get_translator")
+    def test_fallback_when_lines_do_not_match(self, mock_get):
+        translator = mock_get.return_value
+        translator.translate.return_value = "Новый год Наурыз"
+        translator.translate_batch.return_value = ["Новый год", "Наурыз"]
+        self.assertEqual(translate_batch(["New Year", "Nauryz"]), ["Новый год", "Наурыз"])
+
+
+if __name__ == "__main__":
+    unittest.main()
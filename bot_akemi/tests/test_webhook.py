@@ -0,0 +1,105 @@
+import sys
+import os
+import asyncio
+import datetime
+import unittest
+from unittest.mock import patch
+from aiohttp.test_utils import TestServer, TestClient
+from aiogram.fsm.storage.memory import MemoryStorage
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.bootstrap import create_dispatcher
+from app.middlewares import ConcurrencyLimitMiddleware
+from app.handlers import throttling
+from app.webhook import create_app
+from app.holiday_cache import holiday_cache
+from app.translation import translation_memo
+from bench.fake_telegram import create_fake_bot, make_message_update
+
+
+class TestWebhook(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        for target in ("app.bootstrap.db.create_db", "app.bootstrap.generate_html_report"):
+            patcher = patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        today = datetime.date.today()
+        holiday_cache.clear()
+        holiday_cache.put("KZ", today.year, [{"name": "Webhook Day", "date": {"iso": today.isoformat()}}])
+        translation_memo.put("Webhook Day", "ru", "День вебхука")
+
+        self.bot = create_fake_bot(latency=0.01)
+        self.dp = create_dispatcher(max_concurrent_updates=5, storage=MemoryStorage(), background_jobs=False)
+        self.client = TestClient(TestServer(create_app(self.bot, self.dp, path="/webhook", secret_token="s3cret")))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        holiday_cache.clear()
+        translation_memo.clear()
+
+    async def wait_for_messages(self, count):
+        for _ in range(500):
+            if len(self.bot.session.sent("SendMessage")) >= count:
+                return
+            await asyncio.sleep(0.01)
+
+    async def test_update_is_handled(self):
+        response = await self.client.post(
+            "/webhook",
+            json=make_message_update(1, "Какой сегодня праздник?"),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"},
+        )
+        self.assertEqual(response.status, 200)
+        await self.wait_for_messages(1)
+        self.assertIn("День вебхука", self.bot.session.sent("SendMessage")[0].text)
+
+    async def test_wrong_secret_rejected(self):
+        response = await self.client.post("/webhook", json=make_message_update(1, "/start"))
+        self.assertEqual(response.status, 401)
+
+    async def test_concurrency_is_bounded(self):
+        middleware = next(m for m in self.dp.update.outer_middleware if isinstance(m, ConcurrencyLimitMiddleware))
+        await asyncio.gather(*(
+            self.client.post(
+                "/webhook",
+                json=make_message_update(100 + i, "Какой сегодня праздник?"),
+                headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"},
+            )
+            for i in range(30)
+        ))
+        await self.wait_for_messages(30)
+        self.assertEqual(len(self.bot.session.sent("SendMessage")), 30)
+        self.assertEqual(middleware.peak, 5)
+
+    async def post_update(self, user_id, text):
+        return await self.client.post(
+            "/webhook",
+            json=make_message_update(user_id, text),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"},
+        )
+
+    async def test_concurrent_presses_from_one_user_get_cached_answers(self):
+        coalesced, throttled = throttling.coalesced, throttling.throttled
+        await asyncio.gather(*(self.post_update(500, "Какой сегодня праздник?") for _ in range(5)))
+        await self.wait_for_messages(5)
+        # Каждое нажатие получает ответ, но повторы не тратят токены пользователя
+        messages = self.bot.session.sent("SendMessage")
+        self.assertEqual(len(messages), 5)
+        self.assertTrue(all("День вебхука" in message.text for message in messages))
+        self.assertEqual(throttling.coalesced - coalesced, 4)
+        self.assertEqual(throttling.throttled - throttled, 0)
+
+    async def test_throttled_user_gets_cached_answer(self):
+        throttled = throttling.throttled
+        presses = throttling.burst + 2
+        for count in range(1, presses + 1):
+            await self.post_update(600, "Какой сегодня праздник?")
+            await self.wait_for_messages(count)
+        self.assertEqual(throttling.throttled - throttled, 2)
+        self.assertTrue(all("День вебхука" in message.text for message in self.bot.session.sent("SendMessage")))
+
+
+if __name__ == "__main__":
+    unittest.main()